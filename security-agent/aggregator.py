@@ -0,0 +1,193 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from alert_model import parse_alert
+from fast_path import classify_alert
+
+
+class AlertGroup:
+    """
+    Running totals for one (source IP, target, attack type) key. Only the
+    first alert's text (and the caller's `meta`) is kept, so a group costs
+    the same whether it has absorbed one alert or ten thousand.
+    """
+    __slots__ = ("key", "group_id", "first_seen", "last_seen", "count", "attempts", "sample", "meta")
+
+    def __init__(self, key, group_id, now, sample, meta=None):
+        self.key = key
+        self.group_id = group_id
+        self.first_seen = now
+        self.last_seen = now
+        self.count = 0
+        self.attempts = 0
+        self.sample = sample
+        self.meta = meta
+
+    def consolidated_alert(self):
+        """
+        Renders the group as a single alert in the [ALERT] key/value format,
+        with merged counts and the time range it covers.
+        """
+        source_ip, target, attack_type = self.key
+        first = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.first_seen))
+        last = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.last_seen))
+        lines = [
+            f"[ALERT] {first} - {last}",
+            f"Aggregated {self.count} {attack_type.replace('_', ' ')} alerts.",
+            f"Source IP: {source_ip}",
+            f"Target: {target}",
+        ]
+        if self.attempts:
+            lines.append(f"Attempts: {self.attempts}")
+        lines += [
+            f"Alert Count: {self.count}",
+            f"Time Window: {first} to {last}",
+            "",
+            "First alert in group:",
+            self.sample.strip(),
+        ]
+        return "\n".join(lines)
+
+
+_WHITESPACE = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+
+
+def group_key(alert):
+    """
+    (source IP, target, attack type) for an alert (text or Alert). Attack
+    type is the fast path template name, or the alert title (first line,
+    digits masked so PIDs, ports and timestamps don't split groups) for
+    shapes it doesn't know.
+    """
+    alert = parse_alert(alert)
+    fields = alert.fields()
+    attack_type = classify_alert(alert, fields)
+    if attack_type is None:
+        title = fields.get("title") or alert.raw.strip().split("\n", 1)[0]
+        attack_type = _DIGITS.sub("#", _WHITESPACE.sub(" ", title))[:80].lower()
+    return (
+        fields.get("source_ip", "unknown"),
+        (fields.get("target") or "unknown").lower(),
+        attack_type,
+    ), fields
+
+
+class AlertAggregator:
+    """
+    Groups alerts by (source IP, target, attack type) in a sliding window.
+
+    A group stays open while alerts keep arriving less than `window` seconds
+    apart, up to `max_window` seconds after its first alert. Closed groups
+    are handed to `on_flush(group)` exactly once, so a spray of thousands of
+    identical alerts becomes one crew run. At most `max_groups` groups are
+    open at a time; past that the oldest is flushed early.
+    """
+
+    def __init__(self, on_flush, window=60.0, max_window=600.0, max_groups=10000):
+        self.on_flush = on_flush
+        self.window = window
+        self.max_window = max_window
+        self.max_groups = max_groups
+        self._groups = OrderedDict()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._alerts = 0
+        self._flushed = 0
+
+    @classmethod
+    def from_env(cls, on_flush):
+        return cls(
+            on_flush,
+            window=float(os.getenv("SOC_AGG_WINDOW", "60")),
+            max_window=float(os.getenv("SOC_AGG_MAX_WINDOW", "600")),
+            max_groups=int(os.getenv("SOC_AGG_MAX_GROUPS", "10000")),
+        )
+
+    def add(self, alert, now=None, group_id_factory=None, meta=None):
+        """
+        Adds an alert (text or Alert) and returns its (now open) group. `group_id_factory`
+        is called once when a new group is created and its return value
+        becomes the group_id (e.g. a job ID); `meta` is stored on new groups.
+        """
+        now = time.time() if now is None else now
+        alert = parse_alert(alert)
+        key, fields = group_key(alert)
+        ready = []
+        try:
+            with self._lock:
+                self._alerts += 1
+                group = self._groups.get(key)
+                if group is not None and (now - group.last_seen >= self.window
+                                          or now - group.first_seen >= self.max_window):
+                    ready.append(self._groups.pop(key))
+                    group = None
+                if group is None:
+                    self._seq += 1
+                    group_id = group_id_factory() if group_id_factory else f"group-{self._seq}"
+                    group = AlertGroup(key, group_id, now, alert.raw, meta)
+                    self._groups[key] = group
+                    while len(self._groups) > self.max_groups:
+                        ready.append(self._groups.popitem(last=False)[1])
+                group.count += 1
+                group.attempts += fields.get("attempts") or 0
+                group.last_seen = now
+                self._groups.move_to_end(key)
+        finally:
+            # Groups closed above still go out if group_id_factory raised.
+            self._emit(ready)
+        return group
+
+    def flush_expired(self, now=None):
+        """
+        Closes every group whose window has elapsed. Call periodically.
+        """
+        now = time.time() if now is None else now
+        ready = []
+        with self._lock:
+            for key in list(self._groups):
+                group = self._groups[key]
+                if now - group.last_seen >= self.window or now - group.first_seen >= self.max_window:
+                    ready.append(self._groups.pop(key))
+        self._emit(ready)
+        return len(ready)
+
+    def flush_all(self):
+        with self._lock:
+            ready = list(self._groups.values())
+            self._groups.clear()
+        self._emit(ready)
+
+    def _emit(self, groups):
+        for group in groups:
+            with self._lock:
+                self._flushed += 1
+            self.on_flush(group)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "alerts": self._alerts,
+                "open_groups": len(self._groups),
+                "flushed_groups": self._flushed,
+                "window": self.window,
+            }
+
+
+def aggregate_lines(lines, aggregator, flush_every=1.0):
+    """
+    Feeds an (endless) iterable of alert lines into `aggregator`, flushing
+    expired groups at most every `flush_every` seconds. Used by log
+    watchers, whose lines arrive one by one.
+    """
+    last_flush = time.time()
+    for line in lines:
+        if line.strip():
+            aggregator.add(line)
+        now = time.time()
+        if now - last_flush >= flush_every:
+            aggregator.flush_expired(now)
+            last_flush = now
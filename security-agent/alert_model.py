@@ -0,0 +1,348 @@
+import json
+import re
+import sys
+from pathlib import Path
+
+from ioc_extract import extract_iocs, first_ip
+from result_cache import normalize_alert, normalized_fingerprint
+
+# -------------------------------
+# Parsed alert
+# -------------------------------
+# Entry points (CLI scripts, API, dashboard, log watcher) parse an alert
+# once and hand the Alert to the fast path, router, aggregator, caches and
+# pipelines, which read its fields instead of re-scanning the text.
+FIELDS = ("timestamp", "title", "source_ip", "target", "attempts", "ports", "status", "user", "files_encrypted")
+
+
+class Alert:
+    """
+    One security alert: the raw text (what the LLM sees), the input format
+    ("alert", "json", "cef", "syslog" or "text") and the parsed fields.
+    Unparsed fields are None.
+    """
+
+    __slots__ = ("raw", "format") + FIELDS + ("_fields", "_ips", "_normalized")
+
+    def __init__(self, raw, format="text", timestamp=None, title=None, source_ip=None, target=None,
+                 attempts=None, ports=None, status=None, user=None, files_encrypted=None):
+        self.raw = raw
+        self.format = format
+        self.timestamp = timestamp
+        self.title = title
+        self.source_ip = source_ip
+        self.target = target
+        self.attempts = attempts
+        self.ports = ports
+        self.status = status
+        self.user = user
+        self.files_encrypted = files_encrypted
+        self._fields = None
+        self._ips = None
+        self._normalized = None
+
+    def __repr__(self):
+        return f"Alert(format={self.format!r}, source_ip={self.source_ip!r}, title={self.title!r})"
+
+    def fields(self):
+        """
+        The parsed fields as a dict, leaving out the ones that are missing
+        (the shape fast_path.parse_alert_fields has always returned).
+        """
+        if self._fields is None:
+            self._fields = {name: value for name in FIELDS if (value := getattr(self, name)) is not None}
+        return dict(self._fields)
+
+    @property
+    def ips(self):
+        """
+        IPv4 then IPv6 addresses in the raw text, in order of first appearance.
+        """
+        if self._ips is None:
+            found = extract_iocs(self.raw, ("ipv4", "ipv6"))
+            self._ips = found["ipv4"] + found["ipv6"]
+        return self._ips
+
+    @property
+    def normalized(self):
+        # Timestamps and counters masked (see result_cache.normalize_alert).
+        if self._normalized is None:
+            self._normalized = normalize_alert(self.raw)
+        return self._normalized
+
+    def fingerprint(self, model_name, temperature):
+        return normalized_fingerprint(self.normalized, model_name, temperature)
+
+    def prompt_text(self):
+        """
+        Text for the LLM. [ALERT] blocks and free text go in as written;
+        JSON, CEF and syslog alerts get the parsed fields in [ALERT] form
+        first, followed by the original line.
+        """
+        if self.format in ("alert", "text"):
+            return self.raw
+        lines = [f"[ALERT] {self.timestamp or ''}".rstrip()]
+        if self.title:
+            lines.append(self.title)
+        for label, name in (("Source IP", "source_ip"), ("Target", "target"), ("Attempts", "attempts"),
+                            ("Ports", "ports"), ("Status", "status"), ("User", "user"),
+                            ("Files Encrypted", "files_encrypted")):
+            value = getattr(self, name)
+            if value is not None:
+                lines.append(f"{label}: {value}")
+        lines.append(f"Original ({self.format}): {self.raw.strip()}")
+        return "\n".join(lines)
+
+
+def _alert(raw, format, fields):
+    # Parsers already hold the fields dict; keep it so fields() is a copy.
+    alert = Alert(raw, format, **fields)
+    alert._fields = {name: value for name, value in fields.items() if value is not None}
+    return alert
+
+
+# -------------------------------
+# [ALERT] key/value blocks
+# -------------------------------
+# Structured alerts look like alerts.txt:
+#   [ALERT] 2025-11-29 19:57 IST
+#   Multiple failed SSH login attempts detected.
+#   Source IP: 45.12.34.7
+#   Target: Ubuntu-Prod-Server-04
+#   Attempts: 56
+#   Status: Blocked by Fail2Ban
+#
+# The header usually carries the time; when it doesn't look like a date or
+# time ("[ALERT] SSH Brute Force detected from ...") it is the title.
+_HEADER = re.compile(r"\[ALERT\][ \t]*(?P<header>[^\n]*)$", re.MULTILINE)
+_TIMESTAMP = re.compile(
+    r"\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}:\d{2}"
+    r"|(?:Mon|Fri|Sun|Tue(?:s)?|Wed(?:nes)?|Thu(?:rs)?|Sat(?:ur)?)(?:day)?\b"
+    r"|(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sep(?:t(?:ember)?)?"
+    r"|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.? +\d{1,2}\b"
+)
+_FIELD = re.compile(
+    r"^[ \t]*(?P<key>Source IP|Source|Target|Host|Attempts|Ports?|Status|User|Files? Encrypted)"
+    r"[ \t]*:[ \t]*(?P<value>[^\n]+?)[ \t]*$",
+    re.MULTILINE | re.IGNORECASE,
+)
+
+_FIELD_NAMES = {
+    "source ip": "source_ip",
+    "source": "source_ip",
+    "target": "target",
+    "host": "target",
+    "attempts": "attempts",
+    "port": "ports",
+    "ports": "ports",
+    "status": "status",
+    "user": "user",
+    "file encrypted": "files_encrypted",
+    "files encrypted": "files_encrypted",
+}
+_LEADING_INT = re.compile(r"\d+")
+
+
+def _to_int(value):
+    if isinstance(value, int):
+        return value
+    digits = _LEADING_INT.match(str(value).strip())
+    return int(digits.group(0)) if digits else None
+
+
+def _parse_block(text):
+    fields = {}
+    header = _HEADER.search(text)
+    if header:
+        line = header.group("header").strip()
+        if line and not _TIMESTAMP.match(line):
+            fields["title"] = line
+        else:
+            if line:
+                fields["timestamp"] = line
+            rest = text[header.end():].lstrip("\n")
+            title = rest.split("\n", 1)[0].strip()
+            if title and not _FIELD.match(title):
+                fields["title"] = title
+    for match in _FIELD.finditer(text):
+        name = _FIELD_NAMES[match.group("key").lower()]
+        fields.setdefault(name, match.group("value"))
+
+    if "source_ip" in fields:
+        ip = first_ip(fields["source_ip"])
+        if ip:
+            fields["source_ip"] = ip
+    elif (ip := first_ip(text)):
+        fields["source_ip"] = ip
+    if "attempts" in fields:
+        fields["attempts"] = _to_int(fields["attempts"])
+    return _alert(text, "alert" if header else "text", fields)
+
+
+# -------------------------------
+# JSON (flat or ECS-style nested)
+# -------------------------------
+_JSON_KEYS = {
+    "timestamp": ("timestamp", "@timestamp", "time", "event_time", "ts"),
+    "title": ("title", "message", "msg", "rule.name", "rule", "name", "signature", "description", "alert"),
+    "source_ip": ("source_ip", "src_ip", "source.ip", "src", "source", "client_ip", "ip"),
+    "target": ("target", "host", "hostname", "host.name", "dest_host", "dst_host", "destination.ip", "dest",
+               "dst"),
+    "attempts": ("attempts", "count", "failures", "event.count"),
+    "ports": ("ports", "port", "dst_port", "dest_port", "destination.port"),
+    "status": ("status", "action", "event.action", "outcome", "event.outcome"),
+    "user": ("user", "username", "user.name", "user_name"),
+    "files_encrypted": ("files_encrypted",),
+}
+
+
+def _flatten(record, prefix=""):
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _parse_json(text, record):
+    flat = _flatten(record)
+    fields = {}
+    for name, keys in _JSON_KEYS.items():
+        for key in keys:
+            value = flat.get(key)
+            if value is not None and value != "":
+                if isinstance(value, list):
+                    value = ", ".join(str(v) for v in value)
+                fields[name] = value if name == "attempts" else str(value)
+                break
+    if "source_ip" in fields:
+        fields["source_ip"] = first_ip(fields["source_ip"]) or fields["source_ip"]
+    elif (ip := first_ip(text)):
+        fields["source_ip"] = ip
+    if "attempts" in fields:
+        fields["attempts"] = _to_int(fields["attempts"])
+    return _alert(text, "json", fields)
+
+
+# -------------------------------
+# CEF (ArcSight Common Event Format)
+# -------------------------------
+#   [syslog header] CEF:0|Vendor|Product|Version|SignatureID|Name|Severity|src=1.2.3.4 dhost=web01 cnt=56
+_CEF_PIPE = re.compile(r"(?<!\\)\|")
+_CEF_EXTENSION = re.compile(r"(\w+)=((?:\\.|[^\\])*?)(?=\s+\w+=|\s*$)", re.DOTALL)
+_CEF_KEYS = {
+    "timestamp": ("rt", "start", "end"),
+    "source_ip": ("src", "c6a2", "shost"),
+    "target": ("dhost", "dst", "dvchost", "dvc"),
+    "attempts": ("cnt",),
+    "ports": ("dpt",),
+    "status": ("act", "outcome", "cat"),
+    "user": ("duser", "suser"),
+}
+
+
+def _parse_cef(text, start):
+    parts = _CEF_PIPE.split(text[start:].strip(), 7)
+    if len(parts) < 8:
+        return None
+    extension = {key: value.replace("\\=", "=").replace("\\\\", "\\")
+                 for key, value in _CEF_EXTENSION.findall(parts[7])}
+    fields = {"title": parts[5].replace("\\|", "|") or None}
+    for name, keys in _CEF_KEYS.items():
+        for key in keys:
+            if extension.get(key):
+                fields[name] = extension[key]
+                break
+    prefix = _SYSLOG_PREFIX.match(text[:start].lstrip())
+    if "timestamp" not in fields and prefix:
+        fields["timestamp"] = prefix.group("timestamp")
+    if "source_ip" in fields:
+        fields["source_ip"] = first_ip(fields["source_ip"]) or fields["source_ip"]
+    if "attempts" in fields:
+        fields["attempts"] = _to_int(fields["attempts"])
+    return _alert(text, "cef", fields)
+
+
+# -------------------------------
+# Syslog (RFC 3164 and RFC 5424)
+# -------------------------------
+_SYSLOG_TIME = (r"(?:<\d{1,3}>)?(?P<timestamp>(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)"
+                r" [ \d]\d \d{2}:\d{2}:\d{2})")
+_SYSLOG_PREFIX = re.compile(_SYSLOG_TIME)
+_SYSLOG_3164 = re.compile(
+    _SYSLOG_TIME + r" (?P<host>\S+) (?P<app>[^\s:\[]+)(?:\[\d+\])?: ?(?P<message>.*)",
+    re.DOTALL,
+)
+_SYSLOG_5424 = re.compile(
+    r"<\d{1,3}>1 (?P<timestamp>\S+) (?P<host>\S+) (?P<app>\S+) \S+ \S+ (?:-|(?:\[.*?\])+) ?(?P<message>.*)",
+    re.DOTALL,
+)
+_SYSLOG_USER = re.compile(r"\bfor (?:invalid user )?(?P<user>[^\s;]+) from\b|\buser[= ](?P<user2>[\w.@-]+)")
+_SYSLOG_COUNT = re.compile(r"message repeated (\d+) times|(\d+) more authentication failures")
+
+
+def _parse_syslog(text, match):
+    message = match.group("message").strip()
+    fields = {
+        "timestamp": match.group("timestamp"),
+        "target": match.group("host"),
+        "title": message.split("\n", 1)[0] or None,
+    }
+    if (ip := first_ip(message)):
+        fields["source_ip"] = ip
+    if (user := _SYSLOG_USER.search(message)):
+        fields["user"] = user.group("user") or user.group("user2")
+    if (count := _SYSLOG_COUNT.search(message)):
+        fields["attempts"] = int(count.group(1) or count.group(2))
+    return _alert(text, "syslog", fields)
+
+
+# -------------------------------
+# Entry points
+# -------------------------------
+def parse_alert(alert):
+    """
+    Parses an alert in any supported format; an Alert is returned as is,
+    a dict is treated as a JSON alert. Text that matches no structured
+    format still yields an Alert (format "text") with the first IP found
+    as its source.
+    """
+    if isinstance(alert, Alert):
+        return alert
+    if isinstance(alert, dict):
+        return _parse_json(json.dumps(alert), alert)
+
+    head = alert.lstrip()
+    if head[:1] == "{":
+        try:
+            record = json.loads(head)
+        except ValueError:
+            record = None
+        if isinstance(record, dict):
+            return _parse_json(alert, record)
+    cef = alert.find("CEF:", 0, 200)
+    if cef != -1 and "\n" not in alert[:cef]:
+        parsed = _parse_cef(alert, cef)
+        if parsed is not None:
+            return parsed
+    if "[ALERT]" not in alert:
+        match = _SYSLOG_3164.match(head) or _SYSLOG_5424.match(head)
+        if match:
+            return _parse_syslog(alert, match)
+    return _parse_block(alert)
+
+
+def load_alert(fallback="No alert provided.", path="alerts.txt", argv=None):
+    """
+    Alert for the command line scripts: the CLI arguments (`argv`, default
+    sys.argv[1:]), else the contents of `path`, else `fallback`.
+    """
+    args = sys.argv[1:] if argv is None else argv
+    if args:
+        return parse_alert(" ".join(args))
+    f = Path(path)
+    if f.exists():
+        return parse_alert(f.read_text(encoding="utf-8"))
+    return parse_alert(fallback)
@@ -0,0 +1,126 @@
+import time
+
+from alert_model import parse_alert
+from crew_registry import crew_registry, run_pipeline
+from fast_path import FastPath
+from reputation_cache import lookup_ip_reputation
+from result_cache import result_cache_from_env
+from router import AlertRouter
+from soc_pipeline import PIPELINE_MODES, StageTimer
+
+DEFAULT_MODEL = "gemini/gemini-2.0-flash"
+LLM_TEMPERATURE = 0.2
+# Modes a request may ask for: a pipeline, or "auto" for the router.
+REQUEST_MODES = PIPELINE_MODES + ("auto",)
+
+# -------------------------------
+# Alert -> report
+# -------------------------------
+# The path every entry point shares: the router (mode="auto") or the fast
+# path answer what they can locally, the result cache answers repeats, and
+# everything else runs a registry pipeline. api.py splits these steps
+# around its worker pool; soc_cli.py and the other in-process callers use
+# analyze(), which runs them back to back on the calling thread.
+
+
+class AlertAnalyzer:
+    """
+    Fast path, router and result cache for one process, plus the pipeline
+    templates they fall back to (from the process-wide crew registry).
+    """
+
+    def __init__(self, fast_path, router, result_cache, temperature=LLM_TEMPERATURE):
+        self.fast_path = fast_path
+        self.router = router
+        self.result_cache = result_cache
+        self.temperature = temperature
+
+    @classmethod
+    def from_env(cls, temperature=LLM_TEMPERATURE):
+        # Known alert templates (brute force, port scan, ransomware) are
+        # answered locally; mode="auto" requests are scored and sent to the
+        # cheapest tier that fits (SOC_ROUTE_TEMPLATE_MAX /
+        # SOC_ROUTE_SUMMARIZER_MAX); finished reports are cached
+        # (SOC_CACHE_PATH / _MAX / _TTL).
+        return cls(
+            fast_path=FastPath(reputation=lookup_ip_reputation),
+            router=AlertRouter.from_env(reputation=lookup_ip_reputation),
+            result_cache=result_cache_from_env(),
+            temperature=temperature,
+        )
+
+    def pipeline(self, model_name, mode="crew", stream=False):
+        return crew_registry().pipeline(model_name, self.temperature, mode, stream)
+
+    def resolve_locally(self, alert, use_fast_path=True, mode="crew"):
+        """
+        Everything decided before a worker is involved (alert is an Alert
+        or its text): returns (report, engine, pipeline_mode, route).
+        `report` is set when the alert was answered locally (router
+        template tier or fast path); otherwise pipeline_mode is the
+        pipeline to run, with mode="auto" resolved by the router.
+        """
+        if mode == "auto":
+            start = time.perf_counter()
+            decision = self.router.route(alert)
+            if decision.tier == "template":
+                report = decision.render_template()
+                self.router.record("template", time.perf_counter() - start)
+                return report, "template", None, decision.as_dict()
+            return None, None, decision.tier, decision.as_dict()
+        if use_fast_path:
+            report = self.fast_path.analyze(alert)
+            if report is not None:
+                return report, "fast_path", None, None
+        return None, None, mode, None
+
+    def cache_key(self, alert, model_name, mode="crew"):
+        # Crew-mode keys predate pipeline modes and stay unchanged.
+        model_key = model_name if mode == "crew" else f"{mode}:{model_name}"
+        return parse_alert(alert).fingerprint(model_key, self.temperature)
+
+    def run_cached(self, alert, model_name, task_callback=None, crew=None, lookup=True,
+                   mode="crew", routed=False):
+        """
+        Returns (report, cached, timings). On a miss the pipeline for `mode`
+        runs (the registry template, or `crew` when given) and the report is
+        stored for later copies of the same alert. Pass lookup=False when the
+        caller has already checked the cache, routed=True to count the run's
+        latency in the router's per-tier stats.
+        """
+        alert = parse_alert(alert)
+        key = self.cache_key(alert, model_name, mode)
+        report = self.result_cache.get(key) if lookup else None
+        if report is not None:
+            return report, True, None
+        if crew is None:
+            crew = self.pipeline(model_name, mode)
+        timer = StageTimer(task_callback)
+        report = run_pipeline(crew, alert, timer)
+        self.result_cache.set(key, report)
+        timings = timer.finish()
+        if routed:
+            self.router.record(mode, timings["total"])
+        return report, False, timings
+
+    def analyze(self, alert, model_name=DEFAULT_MODEL, mode="crew", use_fast_path=True):
+        """
+        Whole path on the calling thread. Returns the /analyze_alert
+        response fields as a dict; pipeline errors propagate.
+        """
+        alert = parse_alert(alert)
+        report, engine, mode, route = self.resolve_locally(alert, use_fast_path, mode)
+        if report is not None:
+            return {"status": "success", "report": report, "cached": False, "engine": engine,
+                    "timings": None, "route": route}
+        report, cached, timings = self.run_cached(alert, model_name, mode=mode, routed=route is not None)
+        return {"status": "success", "report": report, "cached": cached, "engine": mode,
+                "timings": timings, "route": route}
+
+    def stats(self):
+        return {
+            "result_cache": self.result_cache.stats(),
+            "fast_path": self.fast_path.stats(),
+            "router": self.router.stats(),
+            "crew_registry": crew_registry().stats(),
+        }
@@ -1,10 +1,27 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
-from crewai.tools import tool
+from typing import Literal
 from dotenv import load_dotenv
+import asyncio
+import importlib
+import json
 import os
+import time
+from worker_pool import CrewWorkerPool, PoolSaturated
+from job_store import JobStore, JobStoreFull, STAGES, STAGE_BY_ROLE
+from alert_model import parse_alert
+from ioc_extract import LOG_TYPES, extract_iocs
+from aggregator import AlertAggregator
+from llm_memo import completion_store
+from crew_registry import crew_registry, kickoff_soc_crew
+from analyzer import AlertAnalyzer, DEFAULT_MODEL, LLM_TEMPERATURE, REQUEST_MODES
+from report_stream import FINAL_STAGE, StreamMetrics, render_event, stream_tokens
+from reputation_cache import enrich_indicators, reputation_cache
+from threat_intel import get_store
+from ti_providers import provider_client
+from work_queue import QueueBusy, QueueWorkers, work_queue
 
 # Load environment variables
 load_dotenv()
@@ -15,149 +32,533 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Crew runs block for tens of seconds, so they execute on a bounded pool
+# instead of the event loop (SOC_WORKERS / SOC_MAX_QUEUE / SOC_CREW_TIMEOUT).
+crew_pool = CrewWorkerPool.from_env()
+
+# Background jobs for clients that can't hold a connection open for the
+# whole pipeline (SOC_JOB_MAX / SOC_JOB_TTL bound the store).
+job_store = JobStore.from_env()
+
+# Durable queue between intake and the crew (SOC_QUEUE_PATH, see
+# work_queue.py). When set, jobs and /ingest groups are written to it and
+# fed to the worker pool by SOC_QUEUE_WORKERS threads (default SOC_WORKERS)
+# as it has room, and /analyze_alert records each crew run there until it
+# finishes, so alerts accepted before a crash or restart are analyzed when
+# the server is back.
+alert_queue = work_queue("api")
+QUEUE_WORKERS = int(os.getenv("SOC_QUEUE_WORKERS", str(crew_pool.max_workers)))
+
+# Batch endpoint limits: alerts per request and alerts in flight per batch.
+BATCH_MAX_ALERTS = int(os.getenv("SOC_BATCH_MAX", "500"))
+BATCH_CONCURRENCY = int(os.getenv("SOC_BATCH_CONCURRENCY", "8"))
+ENRICH_MAX_INDICATORS = int(os.getenv("SOC_ENRICH_MAX", "10000"))
+
+# Fast path, router and result cache (see analyzer.py). Finished reports
+# are keyed by normalized alert + model + temperature, so re-fired SIEM
+# alerts skip the crew; known templates never reach it; mode="auto"
+# requests go to the cheapest tier that fits. Stats are on GET /stats.
+analyzer = AlertAnalyzer.from_env(LLM_TEMPERATURE)
+result_cache, fast_path, router = analyzer.result_cache, analyzer.fast_path, analyzer.router
+
+# Pipeline used when a request doesn't pick one: "crew" runs the four tasks
+# sequentially, "dag" runs the local threat intel lookup alongside the
+# summarizer, "compact" asks for the whole report in one structured call,
+# "summarizer" is a single agent (see soc_pipeline.py), and "auto" scores
+# the alert locally and picks template / summarizer / crew (see router.py).
+DEFAULT_PIPELINE_MODE = os.getenv("SOC_PIPELINE_MODE", "crew")
+if DEFAULT_PIPELINE_MODE not in REQUEST_MODES:
+    raise ValueError(f"Unknown SOC_PIPELINE_MODE {DEFAULT_PIPELINE_MODE!r}; choose from {REQUEST_MODES}")
+
 # -------------------------------
 # 1) Models
 # -------------------------------
 class AlertRequest(BaseModel):
     alert_text: str
-    model: str = "gemini/gemini-2.0-flash"
+    model: str = DEFAULT_MODEL
+    fast_path: bool = True
+    mode: Literal["crew", "dag", "compact", "summarizer", "auto"] = DEFAULT_PIPELINE_MODE
 
 class ReportResponse(BaseModel):
     status: str
     report: str
+    cached: bool = False
+    engine: str = "crew"
+    timings: dict | None = None
+    route: dict | None = None
+
+class JobSubmitted(BaseModel):
+    job_id: str
+    status: str
+
+class IngestResponse(BaseModel):
+    job_id: str
+    status: str
+    group_size: int
+
+class EnrichRequest(BaseModel):
+    indicators: list[str] = []
+    text: str | None = None  # alert or log excerpt; its IOCs are enriched too
+
+class EnrichResponse(BaseModel):
+    results: list[dict]
+    listed: int
+    max_risk_score: int
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    progress: dict
+    result: ReportResponse | None = None
+    error: str | None = None
+    created_at: float
+    updated_at: float
 
 # -------------------------------
-# 2) LLM & Tools
+# 2) LLM
 # -------------------------------
-def get_llm(model_name):
-    return LLM(
-        model=model_name,
-        api_key=os.getenv("GEMINI_API_KEY"),
-        temperature=0.2,
-    )
-
-class ThreatIntelTools:
-    @tool("Check IP Reputation")
-    def check_ip_reputation(ip_address: str):
-        """
-        Checks the reputation of a given IP address using simulated Threat Intelligence feeds.
-        Returns risk score, malicious status, and geolocation.
-        """
-        # Mock data logic
-        if "45.12.34.7" in ip_address:
-            return {
-                "ip": ip_address,
-                "risk_score": 85,
-                "status": "Malicious",
-                "geolocation": "Unknown/Proxy",
-                "attack_history": ["SSH Brute Force", "Port Scanning"],
-                "isp": "BadActor Networks Ltd."
-            }
-        elif "198.51.100.14" in ip_address:
-             return {
-                "ip": ip_address,
-                "risk_score": 92,
-                "status": "High Risk",
-                "geolocation": "Eastern Europe",
-                "attack_history": ["Data Exfiltration", "Ransomware C2"],
-                "isp": "Bulletproof Hosting Inc."
-            }
-        else:
-            return {
-                "ip": ip_address,
-                "risk_score": 10,
-                "status": "Benign",
-                "geolocation": "US",
-                "attack_history": [],
-                "isp": "Cloud Provider Inc."
-            }
+# LLM clients and pipeline templates are built once per (model, temperature)
+# and reused across requests (see crew_registry.py).
+def get_llm(model_name, stream=False):
+    return crew_registry().llm(model_name, LLM_TEMPERATURE, stream)
 
 # -------------------------------
 # 3) Crew Logic
 # -------------------------------
-def run_soc_crew(alert_text: str, model_name: str):
-    llm = get_llm(model_name)
-
-    summarizer = Agent(
-        role="Security Alert Summarizer",
-        goal="Extract key facts (Source IP, Target, Type).",
-        backstory="You are a SOC analyst. You extract facts precisely.",
-        llm=llm,
-        verbose=True,
-    )
+def get_pipeline(model_name, mode="crew", stream=False):
+    return analyzer.pipeline(model_name, mode, stream)
 
-    threat_intel_agent = Agent(
-        role="Threat Intelligence Analyst",
-        goal="Investigate source IPs and provide reputation/risk data.",
-        backstory="You are a Threat Intel specialist. You use tools to check if an IP is malicious.",
-        llm=llm,
-        tools=[ThreatIntelTools.check_ip_reputation],
-        verbose=True,
-    )
+def run_soc_crew(alert, model_name: str, task_callback=None):
+    return kickoff_soc_crew(get_pipeline(model_name), alert, task_callback)
 
-    mitigator = Agent(
-        role="Mitigation Advisor",
-        goal="Provide remediation steps considering the threat intelligence.",
-        backstory="You are a senior incident responder. You tailor actions based on IP risk.",
-        llm=llm,
-        verbose=True,
-    )
+# Thin wrappers over the analyzer, kept module-level so SOC_POOL_KIND=process
+# can pickle them by name.
+def resolve_locally(alert, use_fast_path=True, mode="crew"):
+    return analyzer.resolve_locally(alert, use_fast_path, mode)
 
-    manager = Agent(
-        role="SOC Manager",
-        goal="Consolidate all findings into a final SOC Incident Report.",
-        backstory="You are the SOC Manager. You generate the final report.",
-        llm=llm,
-        verbose=True,
-    )
+async def off_loop(fn, *args, **kwargs):
+    """
+    Calls fn, which may resolve alerts, from async code. With remote
+    reputation providers enabled a lookup can wait on the network, so it
+    then runs in the threadpool instead of on the event loop.
+    """
+    if provider_client() is None:
+        return fn(*args, **kwargs)
+    return await run_in_threadpool(fn, *args, **kwargs)
 
-    # Tasks
-    task_summarize = Task(
-        description=f"Summarize this alert and extract the Source IP:\n{alert_text}",
-        agent=summarizer,
-        expected_output="Summary with Source IP clearly identified.",
-    )
+async def resolve(alert, use_fast_path=True, mode="crew"):
+    return await off_loop(resolve_locally, alert, use_fast_path, mode)
 
-    task_threat_intel = Task(
-        description="Analyze the Source IP from the summary using the 'Check IP Reputation' tool.",
-        agent=threat_intel_agent,
-        context=[task_summarize],
-        expected_output="Threat Intelligence Report including Risk Score, Status, and ISP.",
-    )
+def cache_key(alert, model_name: str, mode="crew"):
+    return analyzer.cache_key(alert, model_name, mode)
 
-    task_mitigate = Task(
-        description="Provide mitigation steps based on the summary and threat intelligence.",
-        agent=mitigator,
-        context=[task_summarize, task_threat_intel],
-        expected_output="Mitigation plan tailored to the specific threat level.",
-    )
+def run_soc_crew_cached(alert, model_name: str, task_callback=None, crew=None, lookup=True,
+                        mode="crew", routed=False):
+    return analyzer.run_cached(alert, model_name, task_callback, crew, lookup, mode, routed)
 
-    task_report = Task(
-        description="Create a final SOC Incident Report incorporating Summary, Threat Intel, and Mitigation.",
-        agent=manager,
-        context=[task_summarize, task_threat_intel, task_mitigate],
-        expected_output="Professional SOC Report with dedicated sections for Threat Intel and Mitigation.",
-    )
+def run_soc_crew_streamed(alert, model_name: str, emit, mode="crew", routed=False):
+    """
+    run_soc_crew_cached for /analyze_alert/stream (cache already checked):
+    every finished stage is passed to emit("stage", ...) and, where the LLM
+    streams, the final stage's tokens to emit("token", ...).
+    """
+    started = time.perf_counter()
+    final_stage = FINAL_STAGE.get(mode)
 
-    crew = Crew(
-        agents=[summarizer, threat_intel_agent, mitigator, manager],
-        tasks=[task_summarize, task_threat_intel, task_mitigate, task_report],
-        verbose=True,
-    )
+    def on_task_done(output):
+        emit("stage", {
+            "stage": STAGE_BY_ROLE.get(getattr(output, "agent", None)),
+            "output": str(output.raw),
+            "elapsed": round(time.perf_counter() - started, 4),
+        })
+
+    def on_token(stage, chunk):
+        if stage == final_stage:
+            emit("token", {"stage": stage, "text": chunk})
+
+    with stream_tokens(on_token):
+        return run_soc_crew_cached(
+            alert, model_name, on_task_done, crew=get_pipeline(model_name, mode, stream=True),
+            lookup=False, mode=mode, routed=routed,
+        )
 
-    return crew.kickoff()
+def run_soc_crew_acked(item, alert, model_name: str, mode="crew", routed=False):
+    """
+    run_soc_crew_cached for an alert already claimed from alert_queue. The
+    item only covers a crash mid-run (queue_workers then redo it into the
+    result cache): it is acked when the crew returns or raises, as the
+    caller gets the error. Looks the queue up by name, as under
+    SOC_POOL_KIND=process this runs in a child.
+    """
+    try:
+        return run_soc_crew_cached(alert, model_name, lookup=False, mode=mode, routed=routed)
+    finally:
+        work_queue("api").ack(item)
+
+def job_failed(job_id: str, error, retry=False):
+    if retry:
+        job_store.mark_queued(job_id)  # alert_queue runs it again after a backoff
+    else:
+        job_store.fail(job_id, str(error))
+
+def job_succeeded(job_id: str, report, cached, timings, mode, route):
+    job_store.succeed(job_id, {
+        "status": "success", "report": report, "cached": cached, "engine": mode, "timings": timings,
+        "route": route,
+    })
+
+def run_soc_job(job_id: str, alert, model_name: str, mode="crew", route=None, retry=False):
+    job_store.mark_running(job_id)
+    try:
+        report, cached, timings = run_soc_crew_cached(
+            alert, model_name, job_store.stage_callback(job_id), mode=mode, routed=route is not None
+        )
+    except Exception as e:
+        job_failed(job_id, e, retry)
+        raise
+    job_succeeded(job_id, report, cached, timings, mode, route)
+
+def submit_soc_job(job_id: str, alert, model_name: str, mode="crew", route=None, retry=False):
+    """
+    Schedules run_soc_job on crew_pool and returns its Future. A process
+    pool can't reach this process's job store, so there the crew runs on
+    its own and the job is finished here from the result: it stays
+    "queued" until then and reports no per-stage progress.
+    """
+    if crew_pool.kind != "process":
+        return crew_pool.submit(run_soc_job, job_id, alert, model_name, mode, route, retry)
+
+    def finish(future):
+        if future.cancelled():
+            job_store.fail(job_id, "Cancelled at shutdown")
+        elif future.exception() is not None:
+            job_failed(job_id, future.exception(), retry)
+        else:
+            job_succeeded(job_id, *future.result(), mode, route)
+
+    future = crew_pool.submit(run_soc_crew_cached, alert, model_name, mode=mode, routed=route is not None)
+    future.add_done_callback(finish)
+    return future
+
+def start_job(job_id: str, alert, model_name: str, use_fast_path=True, mode="crew"):
+    """
+    Runs a job inline when the alert can be answered locally (fast path or
+    router template tier), otherwise queues it on alert_queue or, without
+    one, on the worker pool. Raises PoolSaturated when the pool is full.
+    """
+    alert = parse_alert(alert)
+    report, engine, mode, route = resolve_locally(alert, use_fast_path, mode)
+    if report is not None:
+        for stage in STAGES:
+            job_store.mark_stage(job_id, stage)
+        job_store.succeed(job_id, {"status": "success", "report": report, "engine": engine, "route": route})
+        return
+    job_store.mark_queued(job_id)
+    if alert_queue is not None:
+        alert_queue.enqueue({"job_id": job_id, "alert": alert.raw, "model": model_name, "mode": mode,
+                             "route": route})
+        return
+    submit_soc_job(job_id, alert, model_name, mode, route)
+
+def run_queued_alert(item):
+    """
+    queue_workers handler: runs the item on crew_pool and waits for it, so
+    queued work shares the pool's bound with everything else; a full pool
+    hands the item back for later. Items from a previous run whose job is
+    gone (the job store lives in memory) are still analyzed, into the
+    result cache.
+    """
+    payload = item.payload
+    alert = parse_alert(payload["alert"])
+    routed = payload["route"] is not None
+    try:
+        if payload.get("job_id") and job_store.get(payload["job_id"]) is not None:
+            future = submit_soc_job(payload["job_id"], alert, payload["model"], payload["mode"], payload["route"],
+                                    retry=not alert_queue.last_attempt(item))
+        else:
+            future = crew_pool.submit(run_soc_crew_cached, alert, payload["model"], mode=payload["mode"],
+                                      routed=routed)
+    except PoolSaturated:
+        raise QueueBusy()
+    future.result()
+
+queue_workers = None
+if alert_queue is not None:
+    queue_workers = QueueWorkers(alert_queue, run_queued_alert, QUEUE_WORKERS, name="soc-api-queue")
+
+def dispatch_alert_group(group):
+    request = group.meta
+    try:
+        start_job(group.group_id, group.consolidated_alert(), request.model, request.fast_path, request.mode)
+    except PoolSaturated as e:
+        job_store.fail(group.group_id, f"Rejected at flush: {e}")
+
+# Time to first useful byte of /analyze_alert/stream, on GET /stats.
+stream_metrics = StreamMetrics()
+
+# Repeated alerts posted to /ingest are merged per (source IP, target,
+# attack type) and analyzed once per window (SOC_AGG_WINDOW / _MAX_WINDOW).
+aggregator = AlertAggregator.from_env(dispatch_alert_group)
 
 # -------------------------------
 # 4) Endpoints
 # -------------------------------
 @app.post("/analyze_alert", response_model=ReportResponse)
 async def analyze_alert(request: AlertRequest):
+    alert = parse_alert(request.alert_text)
+    report, engine, mode, route = await resolve(alert, request.fast_path, request.mode)
+    if report is not None:
+        return ReportResponse(status="success", report=report, engine=engine, route=route)
+    cached = result_cache.get(cache_key(alert, request.model, mode))
+    if cached is not None:
+        return ReportResponse(status="success", report=cached, cached=True, engine=mode, route=route)
+    item = None
+    if alert_queue is not None:
+        item = alert_queue.enqueue({"alert": alert.raw, "model": request.model, "mode": mode, "route": route},
+                                   claim=True)
     try:
-        result = run_soc_crew(request.alert_text, request.model)
-        return ReportResponse(status="success", report=str(result))
+        if item is None:
+            report, cached, timings = await crew_pool.run(
+                run_soc_crew_cached, alert, request.model, lookup=False, mode=mode,
+                routed=route is not None,
+            )
+        else:
+            report, cached, timings = await crew_pool.run(
+                run_soc_crew_acked, item, alert, request.model, mode=mode, routed=route is not None,
+            )
+        return ReportResponse(status="success", report=report, cached=cached, engine=mode, timings=timings,
+                              route=route)
+    except PoolSaturated as e:
+        if item is not None:
+            alert_queue.ack(item)  # never started; the client was told to retry
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Analysis timed out after {crew_pool.timeout:.0f}s")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze_alert/stream")
+async def analyze_alert_stream(request: AlertRequest, format: Literal["sse", "ndjson"] = "sse"):
+    """
+    Streaming /analyze_alert. Events: "meta" (engine and route), one
+    "stage" per finished task (summary, threat intel, mitigation, report),
+    "token" chunks of the final stage when the LLM streams, then "report"
+    with the same fields as /analyze_alert plus ttfb_ms, or "error".
+    Server-Sent Events by default, JSON lines with ?format=ndjson. A client
+    that disconnects early does not stop the run; its report is still cached.
+    """
+    started = time.perf_counter()
+    alert = parse_alert(request.alert_text)
+    report, engine, mode, route = await resolve(alert, request.fast_path, request.mode)
+    cached = False
+    if report is None:
+        report = result_cache.get(cache_key(alert, request.model, mode))
+        engine, cached = mode, report is not None
+
+    events = asyncio.Queue()
+    future = None
+    if report is None:
+        loop = asyncio.get_running_loop()
+
+        def emit(name, data):
+            loop.call_soon_threadsafe(events.put_nowait, (name, data))
+
+        try:
+            # emit() calls back into this loop, so the run stays in-process.
+            future = crew_pool.submit_local(run_soc_crew_streamed, alert, request.model, emit, mode, route is not None)
+        except PoolSaturated as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+        # Queued after every emit() the worker made before finishing.
+        asyncio.wrap_future(future).add_done_callback(lambda _: events.put_nowait(None))
+
+    async def stream_events():
+        ttfb = None
+        yield render_event("meta", {"engine": engine, "route": route}, format)
+        timings = None
+        if future is not None:
+            deadline = started + crew_pool.timeout
+            while True:
+                try:
+                    item = await asyncio.wait_for(events.get(), max(0.0, deadline - time.perf_counter()))
+                except asyncio.TimeoutError:
+                    future.cancel()
+                    yield render_event("error", {
+                        "status": "timeout", "error": f"Analysis timed out after {crew_pool.timeout:.0f}s",
+                    }, format)
+                    return
+                if item is None:
+                    break
+                if ttfb is None:
+                    ttfb = time.perf_counter() - started
+                yield render_event(*item, format)
+            try:
+                result, was_cached, timings = future.result()
+            except Exception as e:
+                yield render_event("error", {"status": "error", "error": str(e)}, format)
+                return
+        else:
+            result, was_cached = report, cached
+        total = time.perf_counter() - started
+        ttfb = total if ttfb is None else ttfb
+        stream_metrics.record(engine, ttfb, total)
+        yield render_event("report", {
+            "status": "success", "report": result, "cached": was_cached, "engine": engine,
+            "timings": timings, "route": route, "ttfb_ms": round(ttfb * 1000, 1),
+        }, format)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(stream_events(), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/analyze_alerts")
+async def analyze_alerts(requests: list[AlertRequest]):
+    """
+    Analyzes a burst of alerts in one call. Every alert for the same
+    (model, mode) runs a copy of the same registry pipeline; results
+    are streamed back as JSON lines in completion order, each tagged with
+    its input index.
+    """
+    if len(requests) > BATCH_MAX_ALERTS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ALERTS} alerts")
+
+    limit = asyncio.Semaphore(max(1, min(BATCH_CONCURRENCY, crew_pool.max_workers)))
+
+    async def analyze_one(index, request):
+        alert = parse_alert(request.alert_text)
+        report, engine, mode, route = await resolve(alert, request.fast_path, request.mode)
+        if report is not None:
+            return {"index": index, "status": "success", "report": report, "engine": engine, "route": route}
+        async with limit:
+            try:
+                report, cached, timings = await crew_pool.run(
+                    run_soc_crew_cached, alert, request.model, mode=mode, routed=route is not None,
+                )
+                return {"index": index, "status": "success", "report": report, "cached": cached,
+                        "engine": mode, "timings": timings, "route": route}
+            except PoolSaturated as e:
+                return {"index": index, "status": "rejected", "error": str(e)}
+            except asyncio.TimeoutError:
+                return {"index": index, "status": "timeout", "error": "Analysis timed out"}
+            except Exception as e:
+                return {"index": index, "status": "error", "error": str(e)}
+
+    async def stream_results():
+        pending = [asyncio.ensure_future(analyze_one(i, r)) for i, r in enumerate(requests)]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            for task in pending:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/jobs", response_model=JobSubmitted, status_code=202)
+async def submit_job(request: AlertRequest):
+    try:
+        job = job_store.create()
+    except JobStoreFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    try:
+        await off_loop(start_job, job.id, parse_alert(request.alert_text), request.model, request.fast_path,
+                       request.mode)
+    except PoolSaturated as e:
+        job_store.discard(job.id)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return JobSubmitted(job_id=job.id, status=job_store.get(job.id)["status"])
+
+@app.post("/ingest", response_model=IngestResponse, status_code=202)
+async def ingest_alert(request: AlertRequest):
+    """
+    Aggregating variant of /jobs: every alert in the same group shares one
+    job ID, which runs once the group's window closes.
+    """
+    try:
+        # Adding can close an expired group and start its job.
+        group = await off_loop(
+            aggregator.add,
+            parse_alert(request.alert_text),
+            group_id_factory=lambda: job_store.create(status="aggregating").id,
+            meta=request,
+        )
+    except JobStoreFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return IngestResponse(job_id=group.group_id, status="aggregating", group_size=group.count)
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+@app.post("/enrich", response_model=EnrichResponse)
+def enrich(request: EnrichRequest):
+    """
+    Reputation for a list of IPs, domains or hashes in one call, in input
+    order, followed by any indicators extracted from `text`. IPs go through
+    the reputation cache (and remote providers), the rest to the local IOC
+    store; no worker pool is involved.
+    """
+    indicators = list(request.indicators)
+    if request.text:
+        found = extract_iocs(request.text, LOG_TYPES)
+        indicators = list(dict.fromkeys(indicators + [v for kind in LOG_TYPES for v in found[kind]]))
+    if len(indicators) > ENRICH_MAX_INDICATORS:
+        raise HTTPException(status_code=413, detail=f"Request exceeds {ENRICH_MAX_INDICATORS} indicators")
+    results = enrich_indicators(indicators)
+    return EnrichResponse(
+        results=results,
+        listed=sum(r["listed"] for r in results),
+        max_risk_score=max((r["risk_score"] or 0 for r in results), default=0),
+    )
+
+@app.get("/stats")
+def read_stats():
+    return {
+        "worker_pool": crew_pool.stats(),
+        "jobs": job_store.stats(),
+        "result_cache": result_cache.stats(),
+        "llm_memo": completion_store().stats() if completion_store() else None,
+        "fast_path": fast_path.stats(),
+        "aggregator": aggregator.stats(),
+        "router": router.stats(),
+        "crew_registry": crew_registry().stats(),
+        "streaming": stream_metrics.stats(),
+        "threat_intel": get_store().stats(),
+        "reputation_cache": reputation_cache().stats() if reputation_cache() else None,
+        "ti_providers": provider_client().stats() if provider_client() else None,
+        "work_queue": alert_queue.stats() if alert_queue else None,
+    }
+
+@app.on_event("startup")
+async def start_aggregator_flusher():
+    async def flush_loop():
+        while True:
+            await asyncio.sleep(1.0)
+            await off_loop(aggregator.flush_expired)
+    app.state.flusher = asyncio.create_task(flush_loop())
+
+# crewai is imported by the first analysis that needs an LLM, not with this
+# module. SOC_PRELOAD=1 loads it in the background once the server is up,
+# so the port opens immediately and the first crew request doesn't pay for it.
+@app.on_event("startup")
+async def preload_crewai():
+    if os.getenv("SOC_PRELOAD", "0") == "1":
+        asyncio.get_running_loop().run_in_executor(None, importlib.import_module, "crewai")
+
+@app.on_event("startup")
+def start_queue_workers():
+    if queue_workers is not None:
+        queue_workers.start()
+
+@app.on_event("shutdown")
+def shutdown_pool():
+    app.state.flusher.cancel()
+    if queue_workers is not None:
+        queue_workers.stop(wait=False)  # unfinished items are redelivered on the next start
+    crew_pool.shutdown(wait=False)
+
 @app.get("/")
 def read_root():
     return {"message": "AI Security Copilot API is running. Use /analyze_alert to process alerts."}
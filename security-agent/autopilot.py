@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from aggregator import AlertAggregator
+from log_stream import SECURITY_LINE
+from log_watcher import LogWatcher
+from work_queue import QueueWorkers
+
+
+class AutoPilot:
+    """
+    Background pipeline behind the dashboard's Auto-Pilot toggle:
+    LogWatcher -> AlertAggregator -> `analyze(alert_text, options)` on a
+    small thread pool. Nothing here blocks the caller; the UI just reads
+    `recent_lines`, `results` and `stats()` on each rerun. `options` (e.g.
+    model and temperature) is whatever the caller last set, captured when
+    a group is flushed. Only lines `line_filter` matches (by default the
+    log_stream security pre-filter) are aggregated; cron, systemd and
+    kernel chatter is shown in `recent_lines` but never analyzed.
+
+    With a `queue` (a WorkQueue), flushed groups are written to it and
+    analyzed by `max_workers` QueueWorkers, so groups the watcher already
+    read past survive a restart, failed analyses are retried and those
+    that fail every attempt are dead-lettered.
+    """
+
+    def __init__(self, log_path, analyze, state_path=None, max_workers=2, max_results=50, queue=None,
+                 line_filter=SECURITY_LINE):
+        self.analyze = analyze
+        self.line_filter = line_filter
+        self.options = {}
+        self.queue = queue
+        self.recent_lines = deque(maxlen=200)
+        self.results = deque(maxlen=max_results)
+        self.aggregator = AlertAggregator.from_env(self._submit)
+        self.watcher = LogWatcher(log_path, on_lines=self._on_lines, state_path=state_path)
+        if queue is None:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="autopilot")
+        else:
+            self._workers = QueueWorkers(queue, self._run_item, max_workers, name="autopilot")
+        self._stop = threading.Event()
+        self._flusher = None
+        self._in_flight = 0
+        self._skipped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._flusher is not None and self._flusher.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self.watcher.start()
+            if self.queue is not None:
+                self._workers.start()
+            self._flusher = threading.Thread(target=self._flush_loop, name="autopilot-flush", daemon=True)
+            self._flusher.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.watcher.stop()
+        if self.queue is not None:
+            self._workers.stop(wait=False)
+
+    def _flush_loop(self):
+        while not self._stop.wait(1.0):
+            self.aggregator.flush_expired()
+
+    def _on_lines(self, lines):
+        for line in lines:
+            if line.strip():
+                self.recent_lines.append(line)
+                if self.line_filter is None or self.line_filter.search(line):
+                    self.aggregator.add(line)
+                else:
+                    self._skipped += 1
+
+    def _submit(self, group):
+        options = dict(self.options)
+        if self.queue is not None:
+            self.queue.enqueue({"alert": group.consolidated_alert(), "key": list(group.key), "count": group.count,
+                                "options": options})
+            return
+        with self._lock:
+            self._in_flight += 1
+        self._executor.submit(self._analyze_group, group.consolidated_alert(), group.key, group.count, options)
+
+    def _run_item(self, item):
+        payload = item.payload
+        with self._lock:
+            self._in_flight += 1
+        self._analyze_group(payload["alert"], payload["key"], payload["count"], payload["options"],
+                            queued=True, retry=not self.queue.last_attempt(item))
+
+    def _analyze_group(self, alert_text, key, count, options, queued=False, retry=False):
+        start = time.perf_counter()
+        try:
+            report = self.analyze(alert_text, options)
+            error = None
+        except Exception as e:
+            report, error = None, str(e)
+            if queued:
+                if not retry:
+                    self._record(key, count, report, error, start)
+                with self._lock:
+                    self._in_flight -= 1
+                raise  # the queue retries it after a backoff, or dead-letters it
+        self._record(key, count, report, error, start)
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record(self, key, count, report, error, start):
+        self.results.appendleft({
+            "source_ip": key[0],
+            "target": key[1],
+            "attack_type": key[2],
+            "alerts": count,
+            "report": report,
+            "error": error,
+            "seconds": round(time.perf_counter() - start, 2),
+            "finished_at": time.strftime("%H:%M:%S"),
+        })
+
+    def stats(self):
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "watcher": self.watcher.stats(),
+            "aggregator": self.aggregator.stats(),
+            "lines_skipped": self._skipped,
+            "analyses_in_flight": in_flight,
+            "work_queue": self.queue.stats() if self.queue is not None else None,
+        }
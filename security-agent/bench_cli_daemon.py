@@ -0,0 +1,101 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+# -------------------------------
+# Benchmark: one process per alert vs. the soc_cli.py daemon
+# -------------------------------
+# Usage: python bench_cli_daemon.py [alerts] [mode] [workers]
+# "per-process" runs `soc_cli.py analyze` once per alert, the way the
+# scripts were driven (interpreter start, crewai import and crew
+# construction every time). "daemon stdin" pipes all alerts as JSON lines
+# into one `soc_cli.py daemon`; "daemon socket" sends them to a warm daemon
+# over its Unix socket. StubLLM answers every call after SOC_STUB_LATENCY
+# seconds; alerts are distinct so neither the fast path nor the cache helps.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL = "stub/bench"
+ALERT = "Unusual outbound DNS volume from host-{n} to 10.{m}.{n}.7"
+ENV = {**os.environ, "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true",
+       "SOC_LLM_MEMO": "off", "SOC_STUB_LATENCY": os.getenv("SOC_STUB_LATENCY", "0.05"),
+       "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "bench-placeholder")}
+CLI = [sys.executable, os.path.join(HERE, "soc_cli.py")]
+
+
+def per_process(alerts, mode):
+    for alert in alerts:
+        subprocess.run(CLI + ["analyze", "--model", MODEL, "--mode", mode, "--json", alert],
+                       cwd=HERE, env=ENV, check=True, capture_output=True)
+
+
+def daemon_stdin(alerts, mode, workers):
+    lines = "".join(json.dumps({"alert_text": a}) + "\n" for a in alerts)
+    proc = subprocess.run(CLI + ["daemon", "--model", MODEL, "--mode", mode, "--workers", str(workers)],
+                          cwd=HERE, env=ENV, input=lines, text=True, check=True, capture_output=True)
+    answers = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert len(answers) == len(alerts) and all(a["status"] == "success" for a in answers), answers[:3]
+
+
+def start_socket_daemon(path, mode, workers):
+    proc = subprocess.Popen(CLI + ["daemon", "--model", MODEL, "--mode", mode, "--workers", str(workers),
+                                   "--socket", path], cwd=HERE, env=ENV, stderr=subprocess.DEVNULL)
+    while not os.path.exists(path):
+        time.sleep(0.05)
+    return proc
+
+
+def daemon_socket(path, alerts):
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(path)
+        stream = sock.makefile("rwb")
+        for alert in alerts:
+            stream.write((json.dumps({"alert_text": alert}) + "\n").encode())
+        stream.flush()
+        sock.shutdown(socket.SHUT_WR)
+        answers = [json.loads(line) for line in stream]
+    assert len(answers) == len(alerts), len(answers)
+
+
+def report(label, n, seconds):
+    print(f"{label:<16}{seconds:>8.2f}s{n / seconds:>10.2f}/s{seconds / n * 1000:>10.0f}ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    mode = sys.argv[2] if len(sys.argv) > 2 else "crew"
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    batches = iter(range(1000))
+
+    def fresh_alerts():
+        m = next(batches)
+        return [ALERT.format(n=i, m=m) for i in range(n)]
+
+    print(f"{n} alerts, mode={mode}, {ENV['SOC_STUB_LATENCY']}s per LLM call, {workers} daemon workers\n")
+    print(f"{'':<16}{'total':>9}{'alerts':>12}{'per alert':>12}")
+
+    start = time.perf_counter()
+    per_process(fresh_alerts(), mode)
+    report("per-process", n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    daemon_stdin(fresh_alerts(), mode, workers)
+    report("daemon stdin", n, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "soc.sock")
+        proc = start_socket_daemon(path, mode, workers)
+        try:
+            start = time.perf_counter()
+            daemon_socket(path, fresh_alerts())
+            report("daemon socket", n, time.perf_counter() - start)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
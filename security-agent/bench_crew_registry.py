@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Offline benchmark: keep crewai from phoning home, and take LLM latency out.
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("SOC_STUB_LATENCY", "0")
+os.environ["SOC_LLM_MEMO"] = "off"
+
+from crewai.events.event_bus import crewai_event_bus
+
+from crew_registry import CrewRegistry, build_pipeline, make_llm, run_pipeline
+from soc_pipeline import StageTimer
+
+# -------------------------------
+# Microbenchmark: per-request crew setup, rebuilt vs. registry
+# -------------------------------
+# Usage: python bench_crew_registry.py [requests] [threads]
+# "rebuild" is what api.py did before the registry: a new LLM client plus
+# agents and tasks (or pipeline) for every request. "registry" looks the
+# template up in a CrewRegistry. Setup is timed on its own, then whole
+# requests (setup + kickoff on a copy) against a zero-latency StubLLM, then
+# `threads` threads ask a fresh registry for the same key at once. The
+# last line times constructing a real Gemini client (no request is sent),
+# which the stub rows leave out.
+
+MODEL = "stub/bench"
+TEMPERATURE = 0.2
+MODES = ("crew", "dag", "summarizer", "compact")
+ALERT = "[ALERT] 2025-11-29 19:57 IST\nUnusual outbound transfer detected.\nSource IP: 45.12.34.7\nBytes: {n}\n"
+
+
+def rebuild(mode):
+    return build_pipeline(make_llm(MODEL, TEMPERATURE), mode)
+
+
+def time_each(fn, n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    registry = CrewRegistry()
+
+    print(f"{n} requests per mode, median per request\n")
+    print(f"{'mode':<12}{'setup rebuild':>15}{'setup registry':>16}{'request rebuild':>17}{'request registry':>18}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = []
+        for mode in MODES:
+            setup_rebuild = time_each(lambda i: rebuild(mode), n)
+            setup_registry = time_each(lambda i: registry.pipeline(MODEL, TEMPERATURE, mode), n)
+            run_rebuild = time_each(
+                lambda i: run_pipeline(rebuild(mode), ALERT.format(n=i), StageTimer()), n)
+            run_registry = time_each(
+                lambda i: run_pipeline(registry.pipeline(MODEL, TEMPERATURE, mode), ALERT.format(n=i), StageTimer()),
+                n)
+            rows.append((mode, setup_rebuild, setup_registry, run_rebuild, run_registry))
+        crewai_event_bus.flush()
+    for mode, setup_rebuild, setup_registry, run_rebuild, run_registry in rows:
+        print(f"{mode:<12}{setup_rebuild:>13.2f}ms{setup_registry:>14.4f}ms{run_rebuild:>15.1f}ms{run_registry:>16.1f}ms")
+
+    fresh = CrewRegistry()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(threads) as pool:
+        templates = list(pool.map(lambda _: fresh.pipeline(MODEL, TEMPERATURE, "crew"), range(threads)))
+    print(f"\n{threads} concurrent first requests: {len({id(t) for t in templates})} template built; "
+          f"{fresh.stats()}")
+
+    os.environ.setdefault("GEMINI_API_KEY", "bench-placeholder")
+    make_llm("gemini/gemini-2.0-flash", TEMPERATURE)  # first construction pays the imports
+    gemini = time_each(lambda i: make_llm("gemini/gemini-2.0-flash", TEMPERATURE), min(n, 20))
+    print(f"gemini/gemini-2.0-flash client construction: {gemini:.1f}ms per rebuild, 0 with the registry")
+
+
+if __name__ == "__main__":
+    main()
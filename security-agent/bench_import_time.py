@@ -0,0 +1,92 @@
+import os
+import statistics
+import subprocess
+import sys
+
+# -------------------------------
+# Benchmark: cold import time of the entry points, with a regression gate
+# -------------------------------
+# Usage: python bench_import_time.py [runs] [budget_scale]
+# Imports each module in a fresh `python -X importtime` process `runs`
+# times and reports the median cumulative import time of the module itself
+# (interpreter startup excluded) and whether any heavy dependency came
+# along. Exits 1 if a module goes over its budget (scaled by budget_scale,
+# for slower machines) or loads a dependency it should only load on use,
+# so it can run in CI.
+
+# Loaded by the code path that needs them, never by importing an entry point.
+HEAVY = ("crewai", "litellm", "reportlab", "graphviz", "gtts", "httpx")
+
+# Budgets in ms. api.py is dominated by FastAPI/pydantic (~0.5s); the rest
+# need pydantic at most.
+BUDGET_MS = {
+    "api": 1500,
+    "soc_cli": 300,
+    "analyzer": 300,
+    "crew_registry": 300,
+    "soc_pipeline": 300,
+    "utils": 300,
+    "alert_model": 150,
+    "fast_path": 150,
+    "work_queue": 150,
+    "summarizer_gemini": 300,
+    "soc_orchestrator": 300,
+    "multi_agent_security": 300,
+    "soc_threat_system": 300,
+    "log_analyzer_agent": 300,
+}
+
+ENV = {**os.environ, "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true",
+       "PYTHONPATH": os.path.dirname(os.path.abspath(__file__)), "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def import_once(module):
+    """
+    Returns (cumulative ms for `module`, set of top-level packages imported).
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=ENV)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    total, loaded = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        loaded.add(name.strip().split(".")[0])
+        if name.strip() == module and not name[1:].startswith(" "):
+            total = int(cumulative) / 1000
+    return total, loaded
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    failures = []
+
+    print(f"median of {runs} cold imports\n")
+    print(f"{'module':<22}{'import':>10}{'budget':>10}  heavy dependencies loaded")
+    for module, budget in BUDGET_MS.items():
+        samples, heavy = [], set()
+        for _ in range(runs):
+            ms, loaded = import_once(module)
+            samples.append(ms)
+            heavy |= loaded.intersection(HEAVY)
+        median = statistics.median(samples)
+        budget *= scale
+        print(f"{module:<22}{median:>8.0f}ms{budget:>8.0f}ms  {', '.join(sorted(heavy)) or '-'}")
+        if median > budget:
+            failures.append(f"{module}: {median:.0f}ms > {budget:.0f}ms budget")
+        if heavy:
+            failures.append(f"{module}: imports {', '.join(sorted(heavy))} at import time")
+
+    if failures:
+        print("\nREGRESSION:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nall entry points within budget")
+
+
+if __name__ == "__main__":
+    main()
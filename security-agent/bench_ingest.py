@@ -0,0 +1,93 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# -------------------------------
+# Benchmark: streaming ingestion throughput and memory vs. input size
+# -------------------------------
+# Usage: python bench_ingest.py [small] [large] [concurrency]
+# Writes `small` and `large` alerts in each bulk format ([ALERT] blocks,
+# JSONL, CSV), then runs `soc_cli.py ingest` on each file in its own process
+# and reports records/s and the process's peak RSS. Alerts are brute-force
+# templates with varying IPs and counts, answered by the fast path, so this
+# measures the reader/writer path rather than the LLM. Peak RSS should stay
+# flat as the input grows. Every alert has a new source IP, so the
+# reputation cache (100k entries by default) is capped here to keep its
+# growth out of the numbers.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENV = {**os.environ, "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true",
+       "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "bench-placeholder"),
+       "SOC_REP_CACHE_MAX": os.getenv("SOC_REP_CACHE_MAX", "1000")}
+
+
+def alert_fields(i):
+    return {
+        "timestamp": "2025-11-29 19:57 IST",
+        "title": "Multiple failed SSH login attempts detected.",
+        "source_ip": f"45.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+        "target": f"Ubuntu-Prod-Server-{i % 100:02d}",
+        "attempts": str(20 + i % 80),
+        "status": "Blocked by Fail2Ban",
+    }
+
+
+def write_input(path, format, n):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if format == "csv":
+            writer = csv.DictWriter(f, fieldnames=["id", *alert_fields(0)])
+            writer.writeheader()
+        for i in range(n):
+            fields = alert_fields(i)
+            if format == "alert":
+                f.write(f"[ALERT] {fields['timestamp']}\n{fields['title']}\nSource IP: {fields['source_ip']}\n"
+                        f"Target: {fields['target']}\nAttempts: {fields['attempts']}\nStatus: {fields['status']}\n")
+            elif format == "jsonl":
+                f.write(json.dumps({"id": f"a{i}", **fields}) + "\n")
+            else:
+                writer.writerow({"id": f"a{i}", **fields})
+
+
+def ingest(path, concurrency):
+    """
+    Returns (seconds, peak RSS in MB, summary) for one ingest process.
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "soc_cli.py"), "ingest", path, "--output", os.devnull,
+         "--concurrency", str(concurrency)],
+        cwd=HERE, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    stderr = proc.stderr.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    if status != 0:
+        raise RuntimeError(f"ingest {path} failed:\n{stderr[-2000:]}")
+    return elapsed, usage.ru_maxrss / 1024, json.loads(stderr.strip().splitlines()[-1])
+
+
+def main():
+    small = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    large = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    print(f"{'format':<8}{'records':>9}{'input':>9}{'wall':>9}{'records/s':>11}{'peak RSS':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for format, ext in (("alert", "txt"), ("jsonl", "jsonl"), ("csv", "csv")):
+            for n in (small, large):
+                path = os.path.join(tmp, f"alerts_{n}.{ext}")
+                write_input(path, format, n)
+                size = os.path.getsize(path) / 1e6
+                elapsed, rss, summary = ingest(path, concurrency)
+                assert summary["records"] == n and summary["errors"] == 0, summary
+                print(f"{format:<8}{n:>9}{size:>7.1f}MB{elapsed:>8.1f}s"
+                      f"{summary['records_per_s']:>11.0f}{rss:>8.0f}MB")
+                os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
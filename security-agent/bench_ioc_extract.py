@@ -0,0 +1,89 @@
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+from bench_log_stream import NORMAL, SUSPICIOUS
+from ioc_extract import LOG_TYPES, scan_file
+
+# -------------------------------
+# Benchmark: IOC extraction throughput on a synthetic log
+# -------------------------------
+# Usage: python bench_ioc_extract.py [size_mb] [path] [workers]
+# Generates auth.log/proxy-style lines (most carry an IPv4 address, some
+# URLs, domains, IPv6 addresses and hashes) and compares scan_file, per type
+# and for all types (single process and `workers` processes, default: CPU
+# count), against a straightforward combined regex.
+
+EXTRA = [
+    "{ts} proxy01 squid[{pid}]: 10.0.{a}.{b} GET http://cdn{a}.example-{b}.com/update.bin 200",
+    "{ts} web01 named[{pid}]: client 2001:db8:{a:x}::{b:x}#53: query: host{b}.bad-domain.net IN A",
+    "{ts} av01 clamd[{pid}]: /tmp/x{a}: Trojan.Agent FOUND sha256={h}",
+]
+
+NAIVE = re.compile(
+    rb"(?P<url>\b(?:https?|ftp)://[^\s\"'<>]+)|(?P<ipv4>\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b)"
+    rb"|(?P<ipv6>\b(?:[0-9a-fA-F]{0,4}:){2,7}[0-9a-fA-F]{0,4}\b)|(?P<hash>\b[0-9a-fA-F]{32,64}\b)"
+    rb"|(?P<domain>\b(?:[a-zA-Z0-9-]{1,63}\.)+[a-zA-Z]{2,24}\b)"
+)
+
+
+def generate(path, size_bytes, seed=7):
+    rng = random.Random(seed)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < size_bytes:
+            lines = []
+            for _ in range(10000):
+                roll = rng.random()
+                pool = SUSPICIOUS if roll < 0.02 else EXTRA if roll < 0.10 else NORMAL
+                lines.append(rng.choice(pool).format(
+                    ts=f"Nov 29 {rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}",
+                    pid=rng.randrange(1000, 60000), a=rng.randrange(256), b=rng.randrange(256),
+                    port=rng.randrange(1024, 65535), h="%064x" % rng.getrandbits(256),
+                ))
+            block = "\n".join(lines) + "\n"
+            f.write(block)
+            written += len(block)
+
+
+def naive_scan(path):
+    with open(path, "rb") as f:
+        return {m.group(0) for line in f for m in NAIVE.finditer(line)}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f"soc_ioc_{size_mb}mb.log")
+    if not os.path.exists(path) or os.path.getsize(path) < size_mb * 1024 * 1024:
+        print(f"Generating {size_mb} MB synthetic log at {path}...")
+        generate(path, size_mb * 1024 * 1024)
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+    mb = os.path.getsize(path) / 1e6
+
+    print(f"{mb:.0f} MB log\n")
+    print(f"{'scan':<22}{'time':>8}{'MB/s':>8}{'unique':>9}")
+    for label, types in [(kind, (kind,)) for kind in LOG_TYPES if kind not in ("md5", "sha1")] + [
+        ("all log types", LOG_TYPES)
+    ]:
+        elapsed, found = timed(lambda: scan_file(path, types))
+        unique = sum(len(counts) for counts in found.values())
+        print(f"{label:<22}{elapsed:>7.2f}s{mb / elapsed:>8.0f}{unique:>9}")
+    if workers > 1:
+        elapsed, found = timed(lambda: scan_file(path, LOG_TYPES, workers=workers))
+        unique = sum(len(counts) for counts in found.values())
+        print(f"{f'all, {workers} processes':<22}{elapsed:>7.2f}s{mb / elapsed:>8.0f}{unique:>9}")
+    elapsed, found = timed(lambda: naive_scan(path))
+    print(f"{'naive combined regex':<22}{elapsed:>7.2f}s{mb / elapsed:>8.0f}{len(found):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from log_stream import render_log_digest
+
+# -------------------------------
+# Benchmark: streaming log digest on a large synthetic auth.log
+# -------------------------------
+# Usage: python bench_log_stream.py [size_mb] [path]
+# Generates `size_mb` MB (default 1024) of auth.log-style lines at `path`
+# (reused if it already has the right size), then times render_log_digest
+# and reports peak RSS to show memory stays flat regardless of file size.
+
+NORMAL = [
+    "{ts} web01 sshd[{pid}]: Accepted publickey for deploy from 10.0.{a}.{b} port {port} ssh2",
+    "{ts} web01 CRON[{pid}]: pam_unix(cron:session): session opened for user www-data by (uid=0)",
+    "{ts} web01 systemd[1]: Started Session {pid} of user deploy.",
+    "{ts} web01 kernel: [UFW BLOCK] IN=eth0 OUT= SRC=203.0.{a}.{b} DST=10.0.0.5 PROTO=TCP DPT={port}",
+]
+SUSPICIOUS = [
+    "{ts} web01 sshd[{pid}]: Failed password for root from 45.12.{a}.{b} port {port} ssh2",
+    "{ts} web01 sshd[{pid}]: Invalid user admin from 45.12.{a}.{b} port {port}",
+    "{ts} web01 sudo:    alice : user NOT in sudoers ; TTY=pts/0 ; PWD=/home/alice ; USER=root ; COMMAND=/bin/bash",
+    "{ts} web01 sudo:      bob : TTY=pts/1 ; PWD=/home/bob ; USER=root ; COMMAND=/usr/bin/apt update",
+]
+
+
+def generate(path, size_bytes, seed=42):
+    rng = random.Random(seed)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < size_bytes:
+            lines = []
+            for _ in range(10000):
+                template = rng.choice(SUSPICIOUS) if rng.random() < 0.02 else rng.choice(NORMAL)
+                lines.append(template.format(
+                    ts=f"Nov 29 {rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}",
+                    pid=rng.randrange(1000, 60000), a=rng.randrange(256), b=rng.randrange(256),
+                    port=rng.randrange(1024, 65535),
+                ))
+            block = "\n".join(lines) + "\n"
+            f.write(block)
+            written += len(block)
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f"soc_bench_{size_mb}mb.log")
+
+    if not os.path.exists(path) or os.path.getsize(path) < size_mb * 1024 * 1024:
+        print(f"Generating {size_mb} MB synthetic log at {path}...")
+        generate(path, size_mb * 1024 * 1024)
+    size = os.path.getsize(path)
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    digest = render_log_digest(path)
+    elapsed = time.perf_counter() - start
+
+    print(f"file:        {size / 1e6:.0f} MB")
+    print(f"digest:      {len(digest)} chars handed to the agent")
+    print(f"time:        {elapsed:.2f} s ({size / 1e6 / elapsed:.0f} MB/s)")
+    print(f"peak RSS:    {peak_rss_mb():.0f} MB (before scan: {rss_before:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+# Offline benchmark: keep crewai from phoning home, and measure real calls.
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("SOC_STUB_LATENCY", "0.3")
+os.environ["SOC_LLM_MEMO"] = "off"
+
+from crewai.events.event_bus import crewai_event_bus
+
+from api import LLM_TEMPERATURE
+from crew_registry import build_pipeline, run_pipeline
+from soc_pipeline import StageTimer
+from stub_llm import StubLLM
+
+# -------------------------------
+# Benchmark: crew vs. dag vs. compact pipeline
+# -------------------------------
+# Usage: python bench_pipeline_modes.py [alerts]
+# Each mode analyzes the same alerts with a fresh StubLLM (SOC_STUB_LATENCY
+# seconds per call), so latency reflects the number of sequential LLM round
+# trips and tokens reflect how much prompt each mode sends.
+
+ALERTS = [
+    "[ALERT] 2025-11-29 19:57 IST\nUnusual outbound transfer detected.\n"
+    "Source IP: 45.12.34.7\nTarget: Ubuntu-Prod-Server-04\nBytes: {n}\n",
+    "[ALERT] 2025-11-29 20:10 IST\nSuspicious PowerShell execution.\n"
+    "Source IP: 198.51.100.14\nTarget: WIN-DC-01\nProcess ID: {n}\n",
+]
+
+
+def run_mode(mode, n_alerts):
+    llm = StubLLM(model=f"stub/{mode}", temperature=LLM_TEMPERATURE)
+    template = build_pipeline(llm, mode)
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n_alerts):
+            timer = StageTimer()
+            run_pipeline(template, ALERTS[i % len(ALERTS)].format(n=i), timer)
+            latencies.append(timer.finish()["total"])
+        crewai_event_bus.flush()  # verbose console output is emitted asynchronously
+        # Crew copies share the usage counters, not the call counter.
+        usage = llm.get_token_usage_summary()
+    return {
+        "p50": statistics.median(latencies),
+        "calls": usage.successful_requests / n_alerts,
+        "prompt": usage.prompt_tokens / n_alerts,
+        "total": usage.total_tokens / n_alerts,
+    }
+
+
+def main():
+    n_alerts = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"{n_alerts} alerts, {os.environ['SOC_STUB_LATENCY']}s per LLM call\n")
+    print(f"{'mode':<9}{'p50 latency':>12}{'LLM calls':>11}{'prompt tok':>12}{'total tok':>11}")
+    baseline = None
+    for mode in ("crew", "dag", "compact"):
+        r = run_mode(mode, n_alerts)
+        baseline = baseline or r
+        print(f"{mode:<9}{r['p50']:>11.2f}s{r['calls']:>11.1f}{r['prompt']:>12.0f}{r['total']:>11.0f}"
+              f"   ({baseline['p50'] / r['p50']:.1f}x faster, {r['total'] / baseline['total']:.0%} of crew tokens)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Offline benchmark: keep crewai from phoning home.
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("SOC_STUB_LATENCY", "0.3")
+os.environ.setdefault("SOC_LLM_MEMO", "off")
+
+import httpx
+import uvicorn
+
+from api import app
+
+# -------------------------------
+# Benchmark: time to first useful byte, /analyze_alert vs. /analyze_alert/stream
+# -------------------------------
+# Usage: python bench_streaming.py [alerts_per_mode]
+# Serves the app with uvicorn on a local port (the in-process ASGI
+# transport buffers whole responses, which would hide streaming) and
+# replays distinct alerts against StubLLM. For the blocking endpoint the
+# first useful byte is the whole response; for the stream it is the first
+# stage, token or report event.
+
+MODEL = "stub/bench"
+MODES = ("crew", "dag", "summarizer")
+ALERT = "Unusual outbound DNS volume from host-{n} to 10.{m}.{n}.7 ({mode} run)."
+
+
+def start_server():
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+
+
+def blocking(base, body):
+    start = time.perf_counter()
+    httpx.post(f"{base}/analyze_alert", json=body, timeout=120).raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def streamed(base, body):
+    start = time.perf_counter()
+    first = None
+    with httpx.stream("POST", f"{base}/analyze_alert/stream", params={"format": "ndjson"},
+                      json=body, timeout=120) as response:
+        for line in response.iter_lines():
+            if first is None and line and not line.startswith('{"event": "meta"'):
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    base = start_server()
+    print(f"{n} alerts per mode, {os.environ['SOC_STUB_LATENCY']}s per LLM call\n")
+    print(f"{'mode':<12}{'endpoint':<10}{'first byte p50':>16}{'total p50':>12}")
+    for m, mode in enumerate(MODES):
+        for label, call in (("blocking", blocking), ("stream", streamed)):
+            firsts, totals = [], []
+            for i in range(n):
+                body = {"alert_text": ALERT.format(n=i, m=m, mode=label), "model": MODEL, "mode": mode}
+                with contextlib.redirect_stdout(io.StringIO()):
+                    first, total = call(base, body)
+                firsts.append(first)
+                totals.append(total)
+            print(f"{mode:<12}{label:<10}{statistics.median(firsts) * 1000:>14.0f}ms"
+                  f"{statistics.median(totals) * 1000:>10.0f}ms")
+    print(f"\n/stats streaming: {httpx.get(base + '/stats').json()['streaming']}")
+
+
+if __name__ == "__main__":
+    main()
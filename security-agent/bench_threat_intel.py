@@ -0,0 +1,75 @@
+import random
+import resource
+import sys
+import time
+
+from threat_intel import IocStore
+
+# -------------------------------
+# Benchmark: IOC store build time, memory and lookup latency
+# -------------------------------
+# Usage: python bench_threat_intel.py [indicators ...]   (default: 1M 10M)
+# Each run builds a store of N random IPv4 indicators (90% single
+# addresses, 10% CIDR ranges /20, /24 and /28, 200 distinct verdicts) and
+# times lookups for listed addresses and for random (mostly unlisted) ones.
+
+PROFILES = [
+    {"risk_score": 50 + i % 50, "status": "Malicious", "attack_history": [f"campaign-{i}"], "source": "bench"}
+    for i in range(200)
+]
+CIDR_LENGTHS = (20, 24, 28)
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def build(n, rng):
+    store = IocStore()
+    n_cidr = n // 10
+    per_profile = (n - n_cidr) // len(PROFILES)
+    hosts = []
+    for profile in PROFILES:
+        batch = [rng.getrandbits(32) for _ in range(per_profile)]
+        store.add_networks(4, 32, batch, profile)
+        hosts.extend(batch[:50])
+    per_length = n_cidr // len(CIDR_LENGTHS)
+    for length in CIDR_LENGTHS:
+        shift = 32 - length
+        store.add_networks(4, length, ((rng.getrandbits(32) >> shift) << shift for _ in range(per_length)),
+                           PROFILES[length])
+    store.freeze()
+    return store, hosts
+
+
+def time_lookups(store, ips):
+    start = time.perf_counter()
+    hits = sum(1 for ip in ips if store.lookup(ip) is not None)
+    return (time.perf_counter() - start) / len(ips) * 1e6, hits
+
+
+def main():
+    sizes = [int(float(a)) for a in sys.argv[1:]] or [1_000_000, 10_000_000]
+    rng = random.Random(7)
+    print(f"{'indicators':>12}{'build':>9}{'peak RSS':>10}{'listed µs':>11}{'random µs':>11}{'random hit%':>13}")
+    for n in sizes:
+        start = time.perf_counter()
+        store, hosts = build(n, rng)
+        build_s = time.perf_counter() - start
+
+        def to_ip(value):
+            return f"{value >> 24}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}"
+
+        listed = [to_ip(h) for h in hosts][:10000]
+        unknown = [to_ip(rng.getrandbits(32)) for _ in range(10000)]
+        listed_us, listed_hits = time_lookups(store, listed)
+        random_us, random_hits = time_lookups(store, unknown)
+        assert listed_hits == len(listed)
+        print(f"{n:>12,}{build_s:>8.1f}s{peak_rss_mb():>8.0f}MB{listed_us:>11.2f}{random_us:>11.2f}"
+              f"{100 * random_hits / len(unknown):>12.1f}%")
+        del store
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+import ti_stub_server
+from ti_providers import AbuseIPDB, ProviderClient, VirusTotal
+
+# -------------------------------
+# Benchmark: pooled async providers vs. a connection per call
+# -------------------------------
+# Usage: python bench_ti_providers.py [lookups] [threads] [latency_ms]
+# Runs against ti_stub_server.py in-process. "per-call" opens a fresh
+# connection per provider request and queries providers one after the
+# other; "pooled" is ProviderClient (keep-alive pool, parallel fan-out).
+# Then shows the circuit breaker against a failing provider and the token
+# bucket against a 4 requests/minute quota.
+
+
+def stub_stats(base):
+    return httpx.get(base + "/stats").json()
+
+
+def random_ips(n, seed=0):
+    return [f"10.{seed}.{i // 256 % 256}.{i % 256}" for i in range(n)]
+
+
+def per_call_lookup(base, ip):
+    httpx.get(base + "/api/v2/check", params={"ipAddress": ip}).raise_for_status()
+    httpx.get(base + f"/api/v3/ip_addresses/{ip}").raise_for_status()
+
+
+def run(label, base, lookup, ips, threads):
+    before = stub_stats(base)
+    latencies = []
+
+    def timed(ip):
+        start = time.perf_counter()
+        lookup(ip)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(timed, ips))
+    elapsed = time.perf_counter() - start
+    after = stub_stats(base)
+    latencies.sort()
+    print(f"{label:<10}{len(ips) / elapsed:>10.0f}/s{statistics.median(latencies) * 1000:>10.1f}ms"
+          f"{latencies[int(0.99 * len(latencies)) - 1] * 1000:>10.1f}ms"
+          f"{after['connections'] - before['connections']:>13}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 20.0
+
+    server = ti_stub_server.serve(port=0, latency=latency_ms / 1000)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"{n} lookups, {threads} threads, {latency_ms:.0f} ms stub latency, 2 providers\n")
+    print(f"{'client':<10}{'throughput':>12}{'p50':>12}{'p99':>12}{'connections':>13}")
+    run("per-call", base, lambda ip: per_call_lookup(base, ip), random_ips(n, 1), threads)
+    client = ProviderClient([AbuseIPDB(base, rate=0, concurrency=threads),
+                             VirusTotal(base, rate=0, concurrency=threads)], max_connections=threads * 2)
+    run("pooled", base, client.lookup, random_ips(n, 2), threads)
+    client.close()
+
+    failing = ti_stub_server.serve(port=0, latency=latency_ms / 1000, error_rate=1.0)
+    failing_base = f"http://127.0.0.1:{failing.server_address[1]}"
+    client = ProviderClient([AbuseIPDB(failing_base, rate=0, failure_threshold=5, reset_timeout=60)])
+    start = time.perf_counter()
+    for ip in random_ips(100, 3):
+        client.lookup(ip)
+    elapsed = time.perf_counter() - start
+    print(f"\nbreaker: 100 lookups against a failing provider in {elapsed:.2f}s, "
+          f"{stub_stats(failing_base)['requests']} reached it; {client.stats()['abuseipdb']}")
+    client.close()
+
+    client = ProviderClient([VirusTotal(base, rate=4 / 60, burst=4)], max_wait=0.1)
+    results = [client.lookup(ip)["providers"]["virustotal"] for ip in random_ips(20, 4)]
+    print(f"token bucket (4/min, burst 4): {results.count('ok')} sent, "
+          f"{results.count('rate_limited')} rate limited out of 20")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
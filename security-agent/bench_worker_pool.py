@@ -0,0 +1,64 @@
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Offline benchmark: keep crewai from phoning home.
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("SOC_STUB_LATENCY", "0.5")
+# Every alert is the same; the completion memo would answer all but the first.
+os.environ.setdefault("SOC_LLM_MEMO", "off")
+
+from api import run_soc_crew
+from worker_pool import CrewWorkerPool
+
+# -------------------------------
+# Load benchmark: /analyze_alert crew runs on the worker pool
+# -------------------------------
+# Usage: python bench_worker_pool.py [alerts] [pool sizes...]
+# Each alert runs the real four-agent crew against StubLLM, whose latency
+# is controlled by SOC_STUB_LATENCY (seconds per LLM call). One untimed
+# crew runs first, so importing crewai and building the crew template is
+# not charged to the first pool size.
+
+ALERT = (
+    "[ALERT] 2025-11-29 19:57 IST\n"
+    "Multiple failed SSH login attempts detected.\n"
+    "Source IP: 45.12.34.7\n"
+    "Target: Ubuntu-Prod-Server-04\n"
+    "Attempts: 56\n"
+    "Status: Blocked by Fail2Ban\n"
+)
+
+
+async def run_load(pool_size, n_alerts):
+    pool = CrewWorkerPool(max_workers=pool_size, max_queue=n_alerts, timeout=600)
+    start = time.perf_counter()
+    await asyncio.gather(*(pool.run(run_soc_crew, ALERT, "stub/bench") for _ in range(n_alerts)))
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return elapsed
+
+
+def main():
+    n_alerts = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    sizes = [int(x) for x in sys.argv[2:]] or [1, 2, 4, 8, 16]
+
+    print(f"{n_alerts} alerts, stub latency {os.environ['SOC_STUB_LATENCY']}s/call")
+    print(f"{'workers':>8} {'seconds':>9} {'alerts/s':>9} {'speedup':>8}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_soc_crew(ALERT, "stub/bench")
+    baseline = None
+    for size in sizes:
+        # Agents run with verbose=True; keep their console output out of the table.
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = asyncio.run(run_load(size, n_alerts))
+        baseline = baseline or elapsed
+        print(f"{size:>8} {elapsed:>9.2f} {n_alerts / elapsed:>9.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
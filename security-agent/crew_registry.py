@@ -0,0 +1,242 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from alert_model import parse_alert
+from reputation_cache import lookup_ip_reputation
+from soc_pipeline import CompactPipeline, DagPipeline, SummarizerPipeline
+
+# -------------------------------
+# Long-lived LLM clients and crews
+# -------------------------------
+# Building an LLM client, four Agents and four Tasks costs far more than
+# filling in one alert, so api.py and dashboard.py keep them here per
+# (model, temperature) and only pass the alert in at kickoff. crewai itself
+# is imported by the builders, on the first analysis that needs it.
+
+
+def make_llm(model_name, temperature, stream=False):
+    """
+    New LLM client for `model_name`, wrapped in the per-stage completion
+    memo (SOC_LLM_MEMO). "stub/..." models are served by StubLLM; stream=True
+    makes the provider emit token chunks (see report_stream.py).
+    """
+    from memoized_llm import memoize_llm
+
+    if model_name.startswith("stub/"):
+        from stub_llm import StubLLM
+        return memoize_llm(StubLLM(model=model_name, temperature=temperature, stream=stream))
+
+    from crewai.llm import LLM
+
+    return memoize_llm(LLM(
+        model=model_name,
+        api_key=os.getenv("GEMINI_API_KEY"),
+        temperature=temperature,
+        stream=stream,
+    ))
+
+
+def build_soc_crew(llm):
+    """
+    Builds the four-agent crew once for a given LLM. The alert is not baked
+    in: task descriptions carry an {alert_text} placeholder that is filled
+    per alert by kickoff_soc_crew, so one crew can serve many alerts.
+    """
+    from crewai import Agent, Task, Crew
+    from soc_tools import ThreatIntelTools
+
+    summarizer = Agent(
+        role="Security Alert Summarizer",
+        goal="Extract key facts (Source IP, Target, Type).",
+        backstory="You are a SOC analyst. You extract facts precisely.",
+        llm=llm,
+        verbose=True,
+    )
+
+    threat_intel_agent = Agent(
+        role="Threat Intelligence Analyst",
+        goal="Investigate source IPs and provide reputation/risk data.",
+        backstory="You are a Threat Intel specialist. You use tools to check if an IP is malicious.",
+        llm=llm,
+        tools=[ThreatIntelTools.enrich_indicators, ThreatIntelTools.check_ip_reputation],
+        verbose=True,
+    )
+
+    mitigator = Agent(
+        role="Mitigation Advisor",
+        goal="Provide remediation steps considering the threat intelligence.",
+        backstory="You are a senior incident responder. You tailor actions based on IP risk.",
+        llm=llm,
+        verbose=True,
+    )
+
+    manager = Agent(
+        role="SOC Manager",
+        goal="Consolidate all findings into a final SOC Incident Report.",
+        backstory="You are the SOC Manager. You generate the final report.",
+        llm=llm,
+        verbose=True,
+    )
+
+    # Tasks
+    task_summarize = Task(
+        description="Summarize this alert and extract the Source IP:\n{alert_text}",
+        agent=summarizer,
+        expected_output="Summary with Source IP clearly identified.",
+    )
+
+    task_threat_intel = Task(
+        description=(
+            "Analyze the Source IP and any other indicators (IPs, domains, file hashes) from the summary. "
+            "Call the 'Enrich Indicators' tool once with all of them rather than checking them one by one."
+        ),
+        agent=threat_intel_agent,
+        context=[task_summarize],
+        expected_output="Threat Intelligence Report including Risk Score, Status, and ISP.",
+    )
+
+    task_mitigate = Task(
+        description="Provide mitigation steps based on the summary and threat intelligence.",
+        agent=mitigator,
+        context=[task_summarize, task_threat_intel],
+        expected_output="Mitigation plan tailored to the specific threat level.",
+    )
+
+    task_report = Task(
+        description="Create a final SOC Incident Report incorporating Summary, Threat Intel, and Mitigation.",
+        agent=manager,
+        context=[task_summarize, task_threat_intel, task_mitigate],
+        expected_output="Professional SOC Report with dedicated sections for Threat Intel and Mitigation.",
+    )
+
+    return Crew(
+        agents=[summarizer, threat_intel_agent, mitigator, manager],
+        tasks=[task_summarize, task_threat_intel, task_mitigate, task_report],
+        verbose=True,
+    )
+
+
+def kickoff_soc_crew(crew, alert, task_callback=None):
+    # Each run gets its own copy so concurrent alerts never share task
+    # outputs; the copies reuse the template's LLM client.
+    run = crew.copy()
+    run.task_callback = task_callback
+    return run.kickoff(inputs={"alert_text": parse_alert(alert).prompt_text()})
+
+
+def build_pipeline(llm, mode="crew"):
+    """
+    Reusable template for a pipeline mode: the sequential crew, the DAG,
+    the single-call compact pipeline or the single-agent summarizer.
+    """
+    if mode == "dag":
+        return DagPipeline(llm, reputation=lookup_ip_reputation)
+    if mode == "compact":
+        return CompactPipeline(llm, reputation=lookup_ip_reputation)
+    if mode == "summarizer":
+        return SummarizerPipeline(llm, reputation=lookup_ip_reputation)
+    return build_soc_crew(llm)
+
+
+def run_pipeline(template, alert, timer):
+    if isinstance(template, (DagPipeline, CompactPipeline, SummarizerPipeline)):
+        return template.kickoff(alert, timer)
+    return str(kickoff_soc_crew(template, alert, timer))
+
+
+class CrewRegistry:
+    """
+    LLM clients per (model, temperature, stream) and pipeline templates per
+    (model, temperature, mode, stream), built on first use and kept for
+    the life of the process (least recently used past `max_entries` are
+    dropped). Templates are never run in place: kickoff_soc_crew and the
+    pipelines run copies, so one template serves concurrent alerts.
+
+    Builds run outside the registry lock: the first one imports crewai and
+    can take seconds, and must not hold up hits on other keys. Threads that
+    ask for a key while it is being built wait for that build and get the
+    same object.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._llms = OrderedDict()
+        self._pipelines = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._builds = 0
+        self._build_seconds = 0.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_entries=int(os.getenv("SOC_CREW_REGISTRY_MAX", "32")))
+
+    def llm(self, model_name, temperature, stream=False):
+        return self._get("llm", self._llms, (model_name, temperature, stream),
+                         lambda: make_llm(model_name, temperature, stream))
+
+    def pipeline(self, model_name, temperature, mode="crew", stream=False):
+        return self._get("pipeline", self._pipelines, (model_name, temperature, mode, stream),
+                         lambda: build_pipeline(self.llm(model_name, temperature, stream), mode))
+
+    def _get(self, kind, entries, key, build):
+        with self._lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+                self._hits += 1
+                return value
+            pending = self._inflight.get((kind, key))
+            leader = pending is None
+            if leader:
+                pending = self._inflight[(kind, key)] = Future()
+        if not leader:
+            return pending.result()
+
+        start = time.perf_counter()
+        try:
+            value = build()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop((kind, key), None)
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            entries[key] = value
+            self._builds += 1
+            self._build_seconds += time.perf_counter() - start
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._inflight.pop((kind, key), None)
+        pending.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                "llms": len(self._llms),
+                "pipelines": [":".join(str(part) for part in key) for key in self._pipelines],
+                "hits": self._hits,
+                "builds": self._builds,
+                "build_ms_total": round(self._build_seconds * 1000, 1),
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def crew_registry():
+    """
+    Process-wide CrewRegistry (SOC_CREW_REGISTRY_MAX entries per kind).
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = CrewRegistry.from_env()
+    return _registry
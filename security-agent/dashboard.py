@@ -1,13 +1,18 @@
 import streamlit as st
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
-from crewai.tools import tool
 from dotenv import load_dotenv
 import os
 import time
 import sys
 # Import our new utils
 from utils import generate_pdf_report, create_threat_graph, generate_audio_summary
+from result_cache import result_cache_from_env
+from crew_registry import crew_registry, kickoff_soc_crew
+from fast_path import FastPath
+from alert_model import parse_alert
+from ioc_extract import extract_iocs
+from reputation_cache import lookup_ip_reputation, reputation_cache
+from autopilot import AutoPilot
+from work_queue import work_queue
 
 # Load environment variables
 load_dotenv()
@@ -88,125 +93,86 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # -------------------------------
-# 1) LLM Setup
+# 1) Result Cache
 # -------------------------------
+# Shared across reruns and sessions; set SOC_CACHE_PATH to share it with the API.
 @st.cache_resource
-def get_llm(model_name, temp):
-    return LLM(
-        model=model_name,
-        api_key=os.getenv("GEMINI_API_KEY"),
-        temperature=temp,
-    )
+def get_result_cache():
+    return result_cache_from_env()
 
 # -------------------------------
-# 2) Custom Tool: Threat Intel
+# 2) Crew
 # -------------------------------
-class ThreatIntelTools:
-    @tool("Check IP Reputation")
-    def check_ip_reputation(ip_address: str):
-        """
-        Checks the reputation of a given IP address using simulated Threat Intelligence feeds.
-        Returns risk score, malicious status, and geolocation.
-        """
-        # Mock data logic
-        if "45.12.34.7" in ip_address:
-            return {
-                "ip": ip_address,
-                "risk_score": 85,
-                "status": "Malicious",
-                "geolocation": "Unknown/Proxy",
-                "attack_history": ["SSH Brute Force", "Port Scanning"],
-                "isp": "BadActor Networks Ltd."
-            }
-        elif "198.51.100.14" in ip_address:
-             return {
-                "ip": ip_address,
-                "risk_score": 92,
-                "status": "High Risk",
-                "geolocation": "Eastern Europe",
-                "attack_history": ["Data Exfiltration", "Ransomware C2"],
-                "isp": "Bulletproof Hosting Inc."
-            }
-        else:
-            return {
-                "ip": ip_address,
-                "risk_score": 10,
-                "status": "Benign",
-                "geolocation": "US",
-                "attack_history": [],
-                "isp": "Cloud Provider Inc."
-            }
+# The four-agent crew (with the threat intel tools) is the API's, built once
+# per (model, temp) by crew_registry.py; each analysis kicks off a copy.
+def get_crew(model_name, temp):
+    return crew_registry().pipeline(model_name, temp)
+
+def analyze_alert_text(alert, cache, fast_path, model_name, temp):
+    """
+    Fast path for known templates, then the result cache, then the crew,
+    which (with crewai) is only resolved when it is needed. `alert` is an
+    Alert or its text. Returns (report, source). Takes its resources as
+    arguments so it can run off the script thread.
+    """
+    alert = parse_alert(alert)
+    report = fast_path.analyze(alert)
+    if report is not None:
+        return report, "fast_path"
+    cache_key = alert.fingerprint(model_name, temp)
+    report = cache.get(cache_key)
+    if report is not None:
+        return report, "cache"
+    report = str(kickoff_soc_crew(get_crew(model_name, temp), alert))
+    cache.set(cache_key, report)
+    return report, "crew"
 
 # -------------------------------
-# 3) Agents Definition
+# 3) Auto-Pilot (log watcher)
 # -------------------------------
-def create_crew(alert_text, llm):
-    summarizer = Agent(
-        role="Security Alert Summarizer",
-        goal="Extract key facts (Source IP, Target, Type).",
-        backstory="You are a SOC analyst. You extract facts precisely.",
-        llm=llm,
-        verbose=True,
-    )
-
-    threat_intel_agent = Agent(
-        role="Threat Intelligence Analyst",
-        goal="Investigate source IPs and provide reputation/risk data.",
-        backstory="You are a Threat Intel specialist. You use tools to check if an IP is malicious.",
-        llm=llm,
-        tools=[ThreatIntelTools.check_ip_reputation],
-        verbose=True,
-    )
+WATCH_LOG = os.getenv("SOC_WATCH_LOG", "sample_logs.log")
 
-    mitigator = Agent(
-        role="Mitigation Advisor",
-        goal="Provide remediation steps considering the threat intelligence.",
-        backstory="You are a senior incident responder. You tailor actions based on IP risk.",
-        llm=llm,
-        verbose=True,
-    )
-
-    manager = Agent(
-        role="SOC Manager",
-        goal="Consolidate all findings into a final SOC Incident Report.",
-        backstory="You are the SOC Manager. You generate the final report.",
-        llm=llm,
-        verbose=True,
-    )
-
-    # Tasks
-    task_summarize = Task(
-        description=f"Summarize this alert and extract the Source IP:\n{alert_text}",
-        agent=summarizer,
-        expected_output="Summary with Source IP clearly identified.",
-    )
-
-    task_threat_intel = Task(
-        description="Analyze the Source IP from the summary using the 'Check IP Reputation' tool.",
-        agent=threat_intel_agent,
-        context=[task_summarize],
-        expected_output="Threat Intelligence Report including Risk Score, Status, and ISP.",
-    )
-
-    task_mitigate = Task(
-        description="Provide mitigation steps based on the summary and threat intelligence.",
-        agent=mitigator,
-        context=[task_summarize, task_threat_intel],
-        expected_output="Mitigation plan tailored to the specific threat level.",
-    )
+@st.cache_resource
+def get_fast_path():
+    return FastPath(reputation=lookup_ip_reputation)
 
-    task_report = Task(
-        description="Create a final SOC Incident Report incorporating Summary, Threat Intel, and Mitigation.",
-        agent=manager,
-        context=[task_summarize, task_threat_intel, task_mitigate],
-        expected_output="Professional SOC Report with dedicated sections for Threat Intel and Mitigation.",
+@st.cache_resource
+def get_autopilot(log_path):
+    # One pipeline per log, shared across reruns; the model and temperature
+    # are set on each rerun and travel with every flushed group. Cached
+    # resources are resolved here, on the script thread, for the workers.
+    cache, fast_path = get_result_cache(), get_fast_path()
+    return AutoPilot(
+        log_path,
+        analyze=lambda text, options: analyze_alert_text(text, cache, fast_path, options["model"],
+                                                         options["temperature"])[0],
+        state_path=f"{log_path}.offset",
+        queue=work_queue("autopilot"),  # None unless SOC_QUEUE_PATH is set
     )
 
-    return Crew(
-        agents=[summarizer, threat_intel_agent, mitigator, manager],
-        tasks=[task_summarize, task_threat_intel, task_mitigate, task_report],
-        verbose=True,
-    )
+@st.fragment(run_every="2s")
+def render_autopilot(pilot):
+    stats = pilot.stats()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Lines Read", stats["watcher"]["lines_read"])
+    c2.metric("Open Groups", stats["aggregator"]["open_groups"])
+    c3.metric("Analyses Running", stats["analyses_in_flight"])
+    st.caption(f"Watcher backend: {stats['watcher']['backend']} · "
+               f"rotations {stats['watcher']['rotations']} · truncations {stats['watcher']['truncations']}")
+    if stats["work_queue"]:
+        queue = stats["work_queue"]
+        st.caption(f"Work queue: {queue['ready']} waiting · {queue['retry_wait']} retrying · "
+                   f"{queue['dead_letters']} dead letters")
+    if pilot.recent_lines:
+        st.code("\n".join(list(pilot.recent_lines)[-15:]), language="log")
+    for result in list(pilot.results):
+        label = (f"{result['finished_at']} · {result['attack_type']} · {result['source_ip']} → "
+                 f"{result['target']} ({result['alerts']} alerts)")
+        with st.expander(label):
+            if result["error"]:
+                st.error(result["error"])
+            else:
+                st.markdown(result["report"])
 
 # -------------------------------
 # 4) Main UI Logic
@@ -229,9 +195,14 @@ with st.sidebar:
     st.subheader("📡 Auto-Pilot")
     auto_pilot = st.toggle("Enable Log Watcher", value=False)
     if auto_pilot:
-        st.caption("Monitoring `sample_logs.log`...")
+        st.caption(f"Monitoring `{WATCH_LOG}`...")
         
     st.markdown("---")
+    cache_stats = get_result_cache().stats()
+    st.caption(f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    if reputation_cache():
+        rep_stats = reputation_cache().stats()
+        st.caption(f"Reputation cache: {rep_stats['entries']} IPs, {rep_stats['hit_rate']:.0%} hit rate")
     st.info("System Status: ONLINE")
 
 # Main Content
@@ -247,8 +218,6 @@ if "analysis_result" not in st.session_state:
 if "source_ip" not in st.session_state:
     st.session_state.source_ip = "Unknown"
 
-llm = get_llm(model_choice, temperature)
-
 with tab1:
     col1, col2 = st.columns([2, 1])
     
@@ -267,15 +236,22 @@ with tab1:
                 with st.status("🤖 AGENTS ACTIVE...", expanded=True) as status:
                     st.write("🔍 Summarizer: Extracting IOCs...")
                     # In a real app, we'd use callbacks to update this live
-                    crew = create_crew(alert_input, llm)
-                    result = crew.kickoff()
-                    st.session_state.analysis_result = str(result)
+                    alert = parse_alert(alert_input)
+                    report, source = analyze_alert_text(alert, get_result_cache(), get_fast_path(),
+                                                        model_choice, temperature)
+                    if source == "cache":
+                        st.write("♻️ Matching alert found in result cache.")
+                    elif source == "fast_path":
+                        st.write("⚡ Known alert template: answered without the LLM.")
+                    st.session_state.analysis_result = report
                     
-                    # Extract IP for graph (simple heuristic for demo)
-                    import re
-                    ip_match = re.search(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', alert_input)
-                    if ip_match:
-                        st.session_state.source_ip = ip_match.group(0)
+                    # Indicators for the graph and the analyst
+                    iocs = extract_iocs(alert.raw)
+                    if alert.source_ip:
+                        st.session_state.source_ip = alert.source_ip
+                    summary = ", ".join(f"{len(values)} {kind}" for kind, values in iocs.items() if values)
+                    if summary:
+                        st.write(f"🔎 IOCs extracted: {summary}")
                     
                     status.update(label="✅ THREAT NEUTRALIZED (Analysis Complete)", state="complete", expanded=False)
                 
@@ -332,8 +308,16 @@ with tab3:
     else:
         st.info("No report available to export.")
 
-# Auto-Pilot Logic (Simple Implementation)
+# Auto-Pilot Logic: the watcher runs in background threads; this section
+# only starts/stops it and re-renders its state every couple of seconds.
+# Nothing is built until the toggle is first switched on.
 if auto_pilot:
-    # Check for new logs (Mocking the behavior for demo)
-    # In a real app, this would be a loop or use st.empty()
-    pass
+    pilot = get_autopilot(WATCH_LOG)
+    pilot.options = {"model": model_choice, "temperature": temperature}
+    st.session_state.autopilot = pilot
+    pilot.start()
+    st.markdown("---")
+    st.subheader("📡 Auto-Pilot Feed")
+    render_autopilot(pilot)
+elif st.session_state.get("autopilot") is not None and st.session_state.autopilot.running:
+    st.session_state.autopilot.stop()
@@ -0,0 +1,221 @@
+import re
+import threading
+import time
+from collections import deque
+
+from alert_model import Alert, parse_alert
+from metrics import percentile_ms
+
+# -------------------------------
+# 1) Field extraction
+# -------------------------------
+# Parsing lives in alert_model.py ([ALERT] blocks, JSON, CEF, syslog).
+def parse_alert_fields(alert):
+    """
+    Parsed fields of an alert (text or Alert) as a dict with any of:
+    timestamp, title, source_ip, target, attempts, ports, status, user,
+    files_encrypted.
+    """
+    return parse_alert(alert).fields()
+
+
+# -------------------------------
+# 2) Template classification
+# -------------------------------
+_TEMPLATE_RULES = [
+    ("ransomware", re.compile(r"ransomware|ransom note|files? (?:were |being )?encrypted|\.locked\b", re.IGNORECASE),
+     ("target",)),
+    ("brute_force", re.compile(r"brute[ -]?force|failed (?:ssh |rdp )?log ?in|authentication failures?|password spray",
+                               re.IGNORECASE),
+     ("source_ip", "target")),
+    ("port_scan", re.compile(r"port ?scan|port sweep|nmap", re.IGNORECASE),
+     ("source_ip",)),
+]
+
+# Wording that means more is going on than a template can report; router.py
+# escalates on the same keywords. Ransomware's own words only rule out the
+# other templates.
+ESCALATION_KEYWORDS = re.compile(
+    r"exfiltrat|command[- ]and[- ]control|\bc2\b|beacon|privilege escalation|lateral movement|"
+    r"credential dump|mimikatz",
+    re.IGNORECASE,
+)
+IMPACT_KEYWORDS = re.compile(r"ransom|encrypted", re.IGNORECASE)
+
+# An attack that got through (a login after brute force, an allowed
+# connection) is an incident, not a known noise shape.
+_SUCCEEDED = re.compile(r"\b(?:succe(?:ss|eded|ssful(?:ly)?)|allowed|accepted)\b", re.IGNORECASE)
+_SUCCESS_WORDING = re.compile(
+    r"successful(?:ly)? (?:\w+ )?log ?in|log ?in succeeded|accepted (?:password|publickey)", re.IGNORECASE
+)
+
+
+def is_critical(text):
+    return bool(ESCALATION_KEYWORDS.search(text) or IMPACT_KEYWORDS.search(text))
+
+
+def classify_alert(alert, fields):
+    """
+    Returns the template name for a recognized alert shape (text or Alert),
+    or None when the alert should go to the crew. A template only matches
+    when the fields its report needs were actually parsed, never when the
+    alert mentions escalation keywords, and never when its status says the
+    activity succeeded or was allowed.
+    """
+    text = alert.raw if isinstance(alert, Alert) else alert
+    if ESCALATION_KEYWORDS.search(text) or _SUCCESS_WORDING.search(text):
+        return None
+    if _SUCCEEDED.search(str(fields.get("status") or "")):
+        return None
+    for name, pattern, required in _TEMPLATE_RULES:
+        if name != "ransomware" and IMPACT_KEYWORDS.search(text):
+            continue
+        if pattern.search(text) and all(fields.get(f) for f in required):
+            return name
+    return None
+
+
+# -------------------------------
+# 3) Report templates
+# -------------------------------
+_MITIGATION = {
+    "brute_force": [
+        "Block {source_ip} at the perimeter firewall and confirm the Fail2Ban/IPS ban is active.",
+        "Review authentication logs on {target} for any successful logins from {source_ip}.",
+        "Enforce key-based SSH authentication and disable password login where possible.",
+        "Rotate credentials for any account targeted during the attack window.",
+    ],
+    "port_scan": [
+        "Rate-limit or block {source_ip} at the edge firewall.",
+        "Verify that only required ports are exposed on {target}.",
+        "Watch for follow-up exploitation attempts against the scanned services.",
+    ],
+    "ransomware": [
+        "Isolate {target} from the network immediately.",
+        "Activate the Incident Response Plan and preserve forensic evidence (memory, disk images).",
+        "Identify the encryption process and kill it on any other affected hosts.",
+        "Restore affected data from known-good offline backups.",
+    ],
+}
+_ATTACK_NAMES = {
+    "brute_force": "Brute Force (credential guessing)",
+    "port_scan": "Reconnaissance (port scanning)",
+    "ransomware": "Ransomware",
+}
+
+
+def _severity(template, fields, reputation):
+    if template == "ransomware":
+        return "High", "Ransomware activity threatens data availability."
+    risk = reputation.get("risk_score", 0) if reputation else 0
+    attempts = fields.get("attempts") or 0
+    if risk >= 80:
+        return "High", f"Source IP has a threat intel risk score of {risk}."
+    if attempts >= 50 or risk >= 50:
+        return "Medium", f"{attempts} attempts recorded; risk score {risk}."
+    return "Low", "Low volume from a source without known malicious history."
+
+
+def render_report(template, fields, reputation=None):
+    facts = {
+        "source_ip": fields.get("source_ip", "Unknown"),
+        "target": fields.get("target", "Unknown"),
+    }
+    severity, reason = _severity(template, fields, reputation)
+
+    lines = [
+        "# SOC Incident Report",
+        "",
+        "## Executive Summary",
+        f"{fields.get('title') or _ATTACK_NAMES[template] + ' detected.'} "
+        f"Severity: **{severity}** — {reason}",
+        "",
+        "## Key Facts",
+        f"- Type: {_ATTACK_NAMES[template]}",
+        f"- Source: {facts['source_ip']}",
+        f"- Target: {facts['target']}",
+    ]
+    if fields.get("timestamp"):
+        lines.append(f"- Time: {fields['timestamp']}")
+    if fields.get("attempts") is not None:
+        lines.append(f"- Attempts: {fields['attempts']}")
+    if fields.get("ports"):
+        lines.append(f"- Ports: {fields['ports']}")
+    lines.append(f"- Status: {fields.get('status', 'Unknown')}")
+
+    if reputation:
+        lines += [
+            "",
+            "## Threat Intelligence",
+            f"- IP: {reputation.get('ip', facts['source_ip'])}",
+            f"- Risk Score: {reputation.get('risk_score')}/100",
+            f"- Status: {reputation.get('status')}",
+            f"- ISP: {reputation.get('isp')}",
+            f"- Geolocation: {reputation.get('geolocation')}",
+            f"- Known History: {', '.join(reputation.get('attack_history') or []) or 'None'}",
+        ]
+
+    lines += ["", "## Mitigation Plan"]
+    lines += [f"- {step.format(**facts)}" for step in _MITIGATION[template]]
+    lines += [
+        "",
+        "## Conclusion",
+        "Generated by the deterministic fast path from a known alert template; "
+        "escalate to the full crew if the facts above look incomplete.",
+    ]
+    return "\n".join(lines)
+
+
+# -------------------------------
+# 4) Fast path with stats
+# -------------------------------
+class FastPath:
+    """
+    Answers recognized alert templates without calling the LLM and keeps
+    serve-rate and latency statistics (over the last `window` alerts).
+    `reputation` is an optional callable ip -> reputation dict.
+    """
+
+    def __init__(self, reputation=None, window=10000):
+        self.reputation = reputation
+        self._lock = threading.Lock()
+        self._seen = 0
+        self._served = {}
+        self._latencies = deque(maxlen=window)
+
+    def analyze(self, alert):
+        """
+        Returns the templated report for an alert (text or Alert), or None
+        if the alert is an unknown shape and needs the crew.
+        """
+        start = time.perf_counter()
+        alert = parse_alert(alert)
+        fields = alert.fields()
+        template = classify_alert(alert, fields)
+        report = None
+        if template:
+            reputation = None
+            if self.reputation and fields.get("source_ip"):
+                reputation = self.reputation(fields["source_ip"])
+            report = render_report(template, fields, reputation)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._seen += 1
+            if template:
+                self._served[template] = self._served.get(template, 0) + 1
+                self._latencies.append(elapsed)
+        return report
+
+    def stats(self):
+        with self._lock:
+            served = sum(self._served.values())
+            latencies = sorted(self._latencies)
+            return {
+                "alerts_seen": self._seen,
+                "served": served,
+                "served_pct": round(100.0 * served / self._seen, 2) if self._seen else 0.0,
+                "by_template": dict(self._served),
+                "p50_ms": percentile_ms(latencies, 0.50),
+                "p99_ms": percentile_ms(latencies, 0.99),
+            }
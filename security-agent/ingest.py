@@ -0,0 +1,261 @@
+import csv
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------------------
+# Streaming bulk ingestion
+# -------------------------------
+# A day of exported alerts goes through the pipeline without being loaded
+# at once: readers are generators over the input's lines, at most
+# 2 * concurrency records are in flight, and each result is written (and
+# flushed) as one JSON line as soon as it is ready. Memory depends on the
+# concurrency, not on the size of the input.
+#
+# Formats: "alert" ([ALERT] blocks, one per header line), "jsonl" (one
+# JSON object per line: {"alert_text": ..., "id": ...} or a raw JSON/ECS
+# alert), "csv" (header row; an alert_text column, or alert fields such as
+# source_ip, target, title) and "lines" (one syslog, CEF or text alert per
+# line). "auto" picks one from the file extension or the first lines.
+
+FORMATS = ("auto", "alert", "jsonl", "csv", "lines")
+_SNIFF_LINES = 50
+
+
+class IngestRecord:
+    """
+    One input record: its position, the caller's id (or None) and the
+    alert (text or a dict of fields), or the reason it can't be analyzed.
+    """
+
+    __slots__ = ("index", "id", "alert", "error")
+
+    def __init__(self, index, id=None, alert=None, error=None):
+        self.index = index
+        self.id = id
+        self.alert = alert
+        self.error = error
+
+
+def iter_alert_blocks(lines):
+    """
+    [ALERT] blocks: each "[ALERT]" header opens a new record, even when it
+    follows other text on the same line (as in a file appended to without
+    a trailing newline). Anything before the first header is skipped.
+    """
+    block = None
+    for line in lines:
+        start = line.find("[ALERT]")
+        if start != -1:
+            if block is not None:
+                block.append(line[:start])
+                yield "".join(block).rstrip()
+            block = [line[start:]]
+        elif block is not None:
+            block.append(line)
+    if block:
+        yield "".join(block).rstrip()
+
+
+def iter_records(lines, format="auto", name=None):
+    """
+    IngestRecords from an iterable of text lines (an open file, sys.stdin),
+    read lazily. `name` is the input's file name, used by format="auto".
+    """
+    if format == "auto":
+        format, lines = sniff_format(lines, name)
+    index = itertools.count()
+
+    if format == "alert":
+        for block in iter_alert_blocks(lines):
+            yield IngestRecord(next(index), alert=block)
+    elif format == "lines":
+        for line in lines:
+            if line.strip():
+                yield IngestRecord(next(index), alert=line.rstrip("\r\n"))
+    elif format == "jsonl":
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield IngestRecord(next(index), error=f"invalid JSON: {e}")
+                continue
+            if isinstance(record, dict) and "alert_text" in record:
+                yield IngestRecord(next(index), record.get("id"), record["alert_text"])
+            elif isinstance(record, dict):
+                yield IngestRecord(next(index), record.get("id"), line.strip())
+            else:
+                yield IngestRecord(next(index), error="expected a JSON object")
+    elif format == "csv":
+        for row in csv.DictReader(lines):
+            if row.get("alert_text"):
+                yield IngestRecord(next(index), row.get("id") or None, row["alert_text"])
+            else:
+                fields = {k: v for k, v in row.items() if k and v}
+                yield IngestRecord(next(index), fields.pop("id", None), fields)
+    else:
+        raise ValueError(f"Unknown format {format!r}; choose from {FORMATS}")
+
+
+def sniff_format(lines, name=None):
+    """
+    Returns (format, lines) for format="auto". The extension decides when
+    there is one; otherwise up to 50 lines are peeked (and put back): any
+    "[ALERT]" header means "alert", a leading "{" means "jsonl", else "lines".
+    """
+    ext = os.path.splitext(name or "")[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl", lines
+    if ext == ".csv":
+        return "csv", lines
+    lines = iter(lines)
+    head = list(itertools.islice(lines, _SNIFF_LINES))
+    lines = itertools.chain(head, lines)
+    if any("[ALERT]" in line for line in head):
+        return "alert", lines
+    first = next((line for line in head if line.strip()), "")
+    if first.lstrip().startswith("{"):
+        return "jsonl", lines
+    return "lines", lines
+
+
+class IngestStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.records = 0
+        self.errors = 0
+        self.engines = {}
+
+    def record(self, result):
+        with self._lock:
+            self.records += 1
+            if result["status"] != "success":
+                self.errors += 1
+            else:
+                engine = result.get("engine")
+                self.engines[engine] = self.engines.get(engine, 0) + 1
+
+    def as_dict(self):
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            return {
+                "records": self.records,
+                "errors": self.errors,
+                "engines": dict(self.engines),
+                "elapsed_s": round(elapsed, 2),
+                "records_per_s": round(self.records / elapsed, 1) if elapsed else 0.0,
+            }
+
+
+def run_ingest(records, analyze, out, concurrency=8):
+    """
+    Runs analyze(alert) for every IngestRecord on `concurrency` threads and
+    writes one JSON line per record to `out` in completion order, tagged
+    with its input "index" and "id". analyze returns the /analyze_alert
+    response fields; its exceptions become "status": "error" lines.
+    Returns IngestStats.
+    """
+    stats = IngestStats()
+    slots = threading.BoundedSemaphore(concurrency * 2)
+    write_lock = threading.Lock()
+
+    def run(record):
+        if record.error:
+            return {"index": record.index, "id": record.id, "status": "error", "error": record.error}
+        try:
+            return {"index": record.index, "id": record.id, **analyze(record.alert)}
+        except Exception as e:
+            return {"index": record.index, "id": record.id, "status": "error", "error": str(e)}
+
+    def written(future):
+        try:
+            result = future.result()
+            stats.record(result)
+            with write_lock:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="soc-ingest") as pool:
+        for record in records:
+            slots.acquire()
+            pool.submit(run, record).add_done_callback(written)
+    return stats
+
+
+# -------------------------------
+# Durable ingestion (soc_cli.py ingest --durable / worker)
+# -------------------------------
+# Records are written to a WorkQueue (see work_queue.py) in batches before
+# any analysis starts, and analyzed from there by QueueWorkers, so an
+# interrupted run loses nothing: `soc_cli.py worker` finishes what is left.
+# Each payload carries the analysis options, so the worker needs none.
+
+def enqueue_records(records, queue, options, batch=500):
+    """
+    Writes IngestRecords to `queue`, `batch` per transaction, each with
+    the `options` dict (model, mode, fast_path). Returns how many.
+    """
+    records = iter(records)
+    total = 0
+    for chunk in iter(lambda: list(itertools.islice(records, batch)), []):
+        total += queue.enqueue_many(
+            {"index": r.index, "id": r.id, "alert": r.alert, "error": r.error, **options} for r in chunk
+        )
+    return total
+
+
+def drain_queue(queue, analyze, out, concurrency=8, feed=None, until_empty=True):
+    """
+    Runs analyze(payload) for queued records on `concurrency` QueueWorkers,
+    writing one JSON line per record as run_ingest does. A line is written
+    before its item is acked, so a crash can repeat a record (same index
+    and id) but never drop one. Failed analyses are retried by the queue;
+    the last attempt writes an error line and the record is dead-lettered.
+
+    `feed` runs on the calling thread while the workers drain (e.g. to
+    enqueue the input). Returns IngestStats once it has returned and, with
+    until_empty, nothing is left to retry; otherwise runs until interrupted.
+    """
+    from work_queue import QueueWorkers
+
+    stats = IngestStats()
+    write_lock = threading.Lock()
+
+    def handle(item):
+        payload = item.payload
+        error = None
+        if payload["error"]:
+            result = {"status": "error", "error": payload["error"]}
+        else:
+            try:
+                result = analyze(payload)
+            except Exception as e:
+                if not queue.last_attempt(item):
+                    raise
+                error = e
+                result = {"status": "error", "error": str(e)}
+        result = {"index": payload["index"], "id": payload["id"], **result}
+        stats.record(result)
+        with write_lock:
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+        if error is not None:
+            raise error
+
+    workers = QueueWorkers(queue, handle, concurrency, name="soc-ingest").start()
+    try:
+        if feed is not None:
+            feed()
+        while not until_empty or queue.pending():
+            time.sleep(0.2)
+    finally:
+        workers.stop()
+    return stats
@@ -0,0 +1,312 @@
+import re
+import socket
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from log_stream import CHUNK_SIZE, iter_chunks
+
+# -------------------------------
+# IOC extraction
+# -------------------------------
+# Pulls IPv4/IPv6 addresses, ip:port endpoints, domains, URLs and MD5/SHA1/
+# SHA256 hashes out of alert text (str) or log chunks (bytes), validated and
+# de-duplicated in order of first appearance.
+#
+# Speed: a regex that starts with a character class (\d, [a-z]) makes the
+# engine attempt a match at almost every byte (~10-50 MB/s). Every anchor
+# here starts with a literal instead ("." for IPv4 and domains, ":" for IPv6,
+# "://" for URLs), which the engine finds with a fast scan, and the rest of
+# the indicator is recovered around each hit. Hashes have no literal, so
+# they are found as runs in a translated hex mask. Repeated IPv4 hits are
+# counted before they are validated, so busy logs validate each address once.
+#
+# Measured (bench_ioc_extract.py, 68 MB synthetic log where most lines carry
+# an IPv4 address, one CPU): url 336 MB/s, sha256 328, ipv6 207, domain 62,
+# ipv4 44, all log types together 20 MB/s; a naive combined regex does 6.
+# Only the single-type url, hash and ipv6 scans reach hundreds of MB/s. The
+# IPv4 and domain passes are bound by per-hit work in Python on logs this
+# dense, and so is the all-types figure.
+
+IOC_TYPES = ("ipv4", "ipv6", "endpoint", "domain", "url", "md5", "sha1", "sha256")
+# Source ports in logs are mostly ephemeral noise, so files skip endpoints.
+LOG_TYPES = ("ipv4", "ipv6", "domain", "url", "md5", "sha1", "sha256")
+
+_HASH_TYPES = {32: "md5", 40: "sha1", 64: "sha256"}
+_URL_SCHEMES = {"http", "https", "ftp", "ftps", "sftp", "ws", "wss"}
+# Final labels that are far more often file extensions than TLDs in logs.
+_NOT_TLDS = {
+    "bak", "bat", "bin", "cfg", "conf", "crt", "csv", "dat", "db", "dll", "doc", "docx", "exe", "gif",
+    "gz", "htm", "html", "ini", "jar", "jpeg", "jpg", "js", "json", "key", "lock", "locked", "log", "md",
+    "old", "pdf", "pem", "php", "pid", "png", "ps1", "py", "rb", "service", "sh", "so", "sock", "socket",
+    "sql", "svg", "swp", "tar", "target", "timer", "tmp", "txt", "xls", "xlsx", "xml", "yaml", "yml", "zip",
+}
+_DEFANGED = (("[.]", "."), ("(.)", "."), ("[:]", ":"), ("[://]", "://"), ("hxxp", "http"), ("hXXp", "http"))
+_HEX = "0123456789abcdefABCDEF"
+_MEMO_MAX = 1_000_000
+
+
+class _Patterns:
+    """
+    The scanner's patterns and tables, compiled for str or for bytes input.
+    """
+
+    def __init__(self, kind):
+        def c(pattern):
+            return re.compile(pattern if kind is str else pattern.encode())
+
+        def lit(text):
+            return text if kind is str else text.encode()
+
+        self.ipv4_anchor = c(r"\.\d{1,3}\.\d{1,3}\.\d{1,3}(?!\.?\d)")
+        self.endpoint_anchor = c(r"\.\d{1,3}\.\d{1,3}\.\d{1,3}(?!\.?\d)(?::\d{1,5}\b|[ \t]+port[ \t]+\d{1,5}\b)?")
+        self.ipv4 = c(r"(?<![\w.])(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})(?!\.?\d)"
+                      r"(?::(\d{1,5})\b|[ \t]+port[ \t]+(\d{1,5})\b)?")
+        self.ipv6_anchor = c(r"::|:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}:")
+        self.ipv6_head = c(r"(?<![\w:.])[0-9A-Fa-f:]{0,39}\Z")
+        self.ipv6_tail = c(r"(?P<rest>[0-9A-Fa-f:]*(?:\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})?)(?![\w:.])"
+                           r"(?:\]:(?P<port>\d{1,5})\b)?")
+        self.domain_anchor = c(r"\.(?:[A-Za-z]{2,24}|xn--[A-Za-z0-9-]{1,59})(?![\w-]|\.[A-Za-z0-9])")
+        self.host_run = c(r"[A-Za-z0-9.-]+\Z")
+        self.url_marker = lit("://")
+        self.url_scheme = c(r"(?<![A-Za-z0-9+.-])[A-Za-z][A-Za-z0-9+.-]{1,15}\Z")
+        self.url_rest = c(r"[^\s\"'<>`|\\^{}]+")
+        self.url_trailing = lit(".,;:!?)]}")
+        self.word = c(r"\w")
+        self.bracket = lit("[")
+        self.hex_run = lit("x" * 32)
+        self.non_hex = lit(" ")
+        if kind is str:
+            self.hex_mask = str.maketrans({chr(i): "x" if chr(i) in _HEX else " " for i in range(128)})
+        else:
+            self.hex_mask = bytes(ord("x") if chr(i) in _HEX else ord(" ") for i in range(256))
+        self.defanged = [(lit(a), lit(b)) for a, b in _DEFANGED]
+
+
+_DOMAIN = re.compile(r"(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+(?:[a-z]{2,24}|xn--[a-z0-9-]{1,59})")
+_STR = _Patterns(str)
+_BYTES = _Patterns(bytes)
+
+
+def _text(value):
+    return value if isinstance(value, str) else value.decode("utf-8", errors="replace")
+
+
+def refang(data):
+    """
+    Undoes common defanging ("45.12.34[.]7", "hxxp://") so defanged
+    indicators are extracted too.
+    """
+    p = _STR if isinstance(data, str) else _BYTES
+    for defanged, plain in p.defanged:
+        if defanged in data:
+            data = data.replace(defanged, plain)
+    return data
+
+
+# -------------------------------
+# 1) Per-type scanners
+# -------------------------------
+def _parse_ipv4(p, key):
+    """
+    (ip, port) for one anchor hit, or None when it is not a valid address.
+    """
+    m = p.ipv4.search(key)
+    if m is None:
+        return None
+    octets = [int(o) for o in m.group(1, 2, 3, 4)]
+    if max(octets) > 255:
+        return None
+    port = m.group(5) or m.group(6)
+    port = int(port) if port and 0 < int(port) < 65536 else None
+    return ".".join(map(str, octets)), port
+
+
+def _scan_ipv4(p, data, found, memo):
+    anchor = p.endpoint_anchor if "endpoint" in found else p.ipv4_anchor
+    # Anchor hits start at the first dot; the four characters before it cover
+    # the first octet and the boundary in front of it.
+    hits = Counter(data[m.start() - 4 if m.start() > 4 else 0:m.end()] for m in anchor.finditer(data))
+    ipv4, endpoint = found.get("ipv4"), found.get("endpoint")
+    for key, count in hits.items():
+        parsed = memo.get(key, False)
+        if parsed is False:
+            parsed = memo[key] = _parse_ipv4(p, key)
+        if parsed is None:
+            continue
+        ip, port = parsed
+        if ipv4 is not None:
+            ipv4[ip] += count
+        if port and endpoint is not None:
+            endpoint[f"{ip}:{port}"] += count
+    if len(memo) > _MEMO_MAX:
+        memo.clear()
+
+
+def _scan_ipv6(p, data, found):
+    pos = 0
+    while (m := p.ipv6_anchor.search(data, pos)) is not None:
+        head = p.ipv6_head.search(data, max(0, m.start() - 39), m.start())
+        tail = p.ipv6_tail.match(data, m.end())
+        if head is None or tail is None:
+            pos = m.end()
+            continue
+        pos = tail.end()
+        try:
+            packed = socket.inet_pton(socket.AF_INET6, _text(data[head.start():tail.end("rest")]))
+        except OSError:
+            continue
+        if packed == bytes(16):  # "::", e.g. from "std::string"
+            continue
+        ip = socket.inet_ntop(socket.AF_INET6, packed)
+        if "ipv6" in found:
+            found["ipv6"][ip] += 1
+        port = tail.group("port")
+        bracketed = data[head.start() - 1:head.start()] == p.bracket
+        if port and bracketed and "endpoint" in found and 0 < int(port) < 65536:
+            found["endpoint"][f"[{ip}]:{int(port)}"] += 1
+
+
+def _scan_domains(p, data, found):
+    for m in p.domain_anchor.finditer(data):
+        tld = _text(m.group(0)[1:]).lower()
+        if tld in _NOT_TLDS:
+            continue
+        # The host is the run of name characters in front of the final label.
+        window = max(0, m.start() - 253)
+        run = p.host_run.search(data, window, m.start())
+        if run is None or (run.start() == window and window > 0):
+            continue
+        domain = _text(data[run.start():m.end()]).lstrip(".-")
+        # Mixed case ("Trojan.Agent", "System.IO") is a malware or type name.
+        if not (domain.islower() or domain.isupper()):
+            continue
+        domain = domain.lower()
+        if len(domain) <= 253 and _DOMAIN.fullmatch(domain):
+            found["domain"][domain] += 1
+
+
+def _scan_urls(p, data, found):
+    pos = 0
+    while (start := data.find(p.url_marker, pos)) >= 0:
+        pos = start + 3
+        scheme = p.url_scheme.search(data, max(0, start - 16), start)
+        rest = p.url_rest.match(data, pos)
+        if scheme is None or rest is None or _text(scheme.group(0)).lower() not in _URL_SCHEMES:
+            continue
+        pos = rest.end()
+        url = _text(data[scheme.start():rest.end()].rstrip(p.url_trailing))
+        if len(url) > len(scheme.group(0)) + 3:
+            found["url"][url] += 1
+
+
+def _scan_hashes(p, data, found):
+    mask = data.translate(p.hex_mask)
+    pos = 0
+    while (i := mask.find(p.hex_run, pos)) >= 0:
+        start = mask.rfind(p.non_hex, 0, i) + 1
+        end = mask.find(p.non_hex, i)
+        end = len(data) if end < 0 else end
+        pos = end
+        kind = _HASH_TYPES.get(end - start)
+        if kind is None or kind not in found:
+            continue
+        if (start and p.word.match(data, start - 1)) or p.word.match(data, end):
+            continue
+        value = data[start:end]
+        if not value.isdigit():
+            found[kind][_text(value).lower()] += 1
+
+
+# -------------------------------
+# 2) Public API
+# -------------------------------
+def scan(data, types=IOC_TYPES, memo=None):
+    """
+    Counts the indicators in `data` (str or bytes). Returns
+    {type: Counter(value -> occurrences)} for every requested type, each in
+    order of first appearance. Alert text (str) is refanged first; log
+    chunks (bytes) are scanned as-is. `memo` carries parsed IPv4 hits
+    between calls on the same stream.
+    """
+    if isinstance(data, str):
+        p = _STR
+        data = refang(data)
+    else:
+        p = _BYTES
+    found = {kind: Counter() for kind in types}
+    if "ipv4" in found or "endpoint" in found:
+        _scan_ipv4(p, data, found, {} if memo is None else memo)
+    if "ipv6" in found or "endpoint" in found:
+        _scan_ipv6(p, data, found)
+    if "domain" in found:
+        _scan_domains(p, data, found)
+    if "url" in found:
+        _scan_urls(p, data, found)
+    if found.keys() & _HASH_TYPES.values():
+        _scan_hashes(p, data, found)
+    return found
+
+
+def extract_iocs(text, types=IOC_TYPES):
+    """
+    Unique indicators in `text`: {type: [values]} for every requested type.
+    """
+    return {kind: list(values) for kind, values in scan(text, types).items()}
+
+
+def first_ip(text):
+    """
+    The first valid IPv4 address in `text`, else the first IPv6 one, else None.
+    """
+    text = refang(text)
+    # Alert-sized input: searching directly beats the anchored scan.
+    for m in _STR.ipv4.finditer(text):
+        octets = [int(o) for o in m.group(1, 2, 3, 4)]
+        if max(octets) <= 255:
+            return ".".join(map(str, octets))
+    found = {"ipv6": Counter()}
+    _scan_ipv6(_STR, text, found)
+    return next(iter(found["ipv6"]), None)
+
+
+def scan_file(path, types=LOG_TYPES, chunk_size=CHUNK_SIZE, workers=1):
+    """
+    scan() over a file of any size. Returns {type: Counter} merged across
+    chunks. With workers > 1 chunks are scanned in that many processes
+    (at most two chunks per worker in flight, so memory stays bounded).
+    """
+    totals = {kind: Counter() for kind in types}
+
+    def merge(found):
+        for kind, counts in found.items():
+            totals[kind].update(counts)
+
+    if workers <= 1:
+        memo = {}
+        for _, chunk in iter_chunks(path, chunk_size):
+            merge(scan(chunk, types, memo))
+        return totals
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for _, chunk in iter_chunks(path, chunk_size):
+            pending.append(pool.submit(scan, chunk, types))
+            if len(pending) >= 2 * workers:
+                merge(pending.popleft().result())
+        while pending:
+            merge(pending.popleft().result())
+    return totals
+
+
+def render_iocs(found, max_per_type=20):
+    """
+    Markdown summary of scan()/scan_file() output, most frequent first.
+    """
+    lines = []
+    for kind, counts in found.items():
+        if not counts:
+            continue
+        top = ", ".join(f"{value} ({count})" for value, count in counts.most_common(max_per_type))
+        more = f" and {len(counts) - max_per_type} more" if len(counts) > max_per_type else ""
+        lines.append(f"- **{kind}** ({len(counts)} unique): {top}{more}")
+    return "\n".join(lines) or "No indicators found."
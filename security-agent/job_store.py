@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Crew stages in execution order, keyed by the agent role that runs them.
+STAGES = ("summarize", "threat_intel", "mitigate", "report")
+STAGE_BY_ROLE = {
+    "Security Alert Summarizer": "summarize",
+    "Threat Intelligence Analyst": "threat_intel",
+    "Mitigation Advisor": "mitigate",
+    "SOC Manager": "report",
+}
+
+
+class JobStoreFull(Exception):
+    """Raised when every job in the store is still queued or running."""
+
+
+class Job:
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = "queued"
+        self.progress = {stage: "pending" for stage in STAGES}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    @property
+    def finished(self):
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobStore:
+    """
+    Thread-safe, bounded store of background analysis jobs.
+
+    Finished jobs expire `ttl` seconds after their last update, and once
+    `max_jobs` is reached the least recently updated finished job is
+    evicted, so memory stays flat under sustained load no matter how many
+    jobs are never polled. Queued and running jobs are never dropped: with
+    `max_jobs` of them, create() raises JobStoreFull.
+    """
+
+    def __init__(self, max_jobs=1000, ttl=3600.0):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._evicted = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_jobs=int(os.getenv("SOC_JOB_MAX", "1000")),
+            ttl=float(os.getenv("SOC_JOB_TTL", "3600")),
+        )
+
+    def create(self, status="queued"):
+        job = Job(uuid.uuid4().hex)
+        job.status = status
+        with self._lock:
+            self._expire(time.time())
+            if len(self._jobs) >= self.max_jobs:
+                oldest = next((j for j in self._jobs.values() if j.finished), None)
+                if oldest is None:
+                    self._rejected += 1
+                    raise JobStoreFull(f"{len(self._jobs)} jobs queued or running (limit {self.max_jobs})")
+                del self._jobs[oldest.id]
+                self._evicted += 1
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire(time.time())
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def discard(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def mark_queued(self, job_id):
+        self._update(job_id, status="queued")
+
+    def mark_running(self, job_id):
+        self._update(job_id, status="running")
+
+    def mark_stage(self, job_id, stage):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.progress[stage] = "done"
+            self._touch(job)
+
+    def stage_callback(self, job_id):
+        """
+        Returns a crew task_callback that marks the finished task's stage
+        as done on this job.
+        """
+        def on_task_done(output):
+            stage = STAGE_BY_ROLE.get(getattr(output, "agent", None))
+            if stage:
+                self.mark_stage(job_id, stage)
+        return on_task_done
+
+    def succeed(self, job_id, result):
+        self._update(job_id, status="succeeded", result=result)
+
+    def fail(self, job_id, error):
+        self._update(job_id, status="failed", error=error)
+
+    def stats(self):
+        with self._lock:
+            by_status = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {"jobs": len(self._jobs), "by_status": by_status, "evicted": self._evicted,
+                    "rejected": self._rejected}
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for name, value in fields.items():
+                setattr(job, name, value)
+            self._touch(job)
+
+    def _touch(self, job):
+        job.updated_at = time.time()
+        self._jobs.move_to_end(job.id)
+
+    def _expire(self, now):
+        # Entries are ordered by updated_at, so expired ones sit at the front;
+        # live jobs among them are kept.
+        expired = []
+        for job in self._jobs.values():
+            if now - job.updated_at < self.ttl:
+                break
+            if job.finished:
+                expired.append(job.id)
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._evicted += len(expired)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from metrics import cache_stats
+
+# -------------------------------
+# Completion stores
+# -------------------------------
+class MemoryCompletionStore:
+    """
+    Size-bounded LRU map of completion key -> response text.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return cache_stats("memory", len(self._entries), self._hits, self._misses, self._evictions)
+
+
+class FileCompletionStore:
+    """
+    One JSON file per completion under `directory`, so memoized stages
+    survive restarts. When the directory grows past `max_entries` the least
+    recently used files (by mtime, refreshed on every hit) are removed.
+    """
+
+    def __init__(self, directory, max_entries=20000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._count = sum(1 for _ in self.directory.glob("*.json"))
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        path = self.directory / f"{key}.json"
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))["response"]
+            path.touch()
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+        return value
+
+    def set(self, key, value):
+        path = self.directory / f"{key}.json"
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        existed = path.exists()
+        tmp.write_text(json.dumps({"response": value}), encoding="utf-8")
+        os.replace(tmp, path)
+        with self._lock:
+            if not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._prune()
+
+    def _prune(self):
+        # Trim to 90% of the bound so pruning doesn't run on every insert.
+        files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        excess = len(files) - int(self.max_entries * 0.9)
+        for path in files[:max(excess, 0)]:
+            path.unlink(missing_ok=True)
+            self._evictions += 1
+        self._count = len(files) - max(excess, 0)
+
+    def stats(self):
+        with self._lock:
+            return cache_stats("file", self._count, self._hits, self._misses, self._evictions)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def completion_store():
+    """
+    Process-wide store selected by SOC_LLM_MEMO: "memory" (default),
+    "file" (directory SOC_LLM_MEMO_DIR) or "off". Returns None when off.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            kind = os.getenv("SOC_LLM_MEMO", "memory")
+            max_entries = int(os.getenv("SOC_LLM_MEMO_MAX", "4096"))
+            if kind == "file":
+                _store = FileCompletionStore(os.getenv("SOC_LLM_MEMO_DIR", ".llm_memo"), max_entries)
+            elif kind == "memory":
+                _store = MemoryCompletionStore(max_entries)
+            else:
+                return None
+        return _store
+
+
+# -------------------------------
+# Completion keys
+# -------------------------------
+# The crewai LLM wrapper that uses these lives in memoized_llm.py, so
+# importing the stores (api.py does, for /stats) doesn't load crewai.
+def completion_key(model, temperature, messages, tools=None, response_model=None, stop=None):
+    """
+    Hash of everything that determines a completion: the model settings,
+    the full message list (agent system prompt, rendered task prompt and
+    any context from earlier tasks), the tools offered and the output schema.
+    """
+    material = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "tools": sorted(_tool_name(t) for t in tools or []),
+            "response_model": getattr(response_model, "__name__", None),
+            "stop": sorted(stop or []),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _tool_name(tool):
+    if isinstance(tool, dict):
+        return str(tool.get("name") or tool.get("function", {}).get("name"))
+    return str(getattr(tool, "name", tool))
@@ -1,102 +1,141 @@
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
-from crewai.tools import tool
 from dotenv import load_dotenv
 from pathlib import Path
 import os
+import sys
+from ioc_extract import render_iocs, scan_file
+from log_engine import analyze_log
+from log_stream import render_log_digest
+from utils import log_error
 
-load_dotenv()
 
 # -------------------------------
-# 1) LLM
+# Log Reader (wrapped as a crewai tool by build_log_crew)
 # -------------------------------
-llm = LLM(
-    model="gemini/gemini-2.0-flash",
-    api_key=os.getenv("GEMINI_API_KEY"),
-    temperature=0.2,
-)
+def read_log_file(file_path: str, page: int = 0):
+    """
+    Reads a log file in streaming chunks and returns a compact digest:
+    counts of failed logins, sudo usage and privilege escalation per
+    chunk, plus one page of the matching lines (pass page=1, 2, ... for
+    more). Works on files of any size.
+    """
+    try:
+        path = Path(file_path)
+        if not path.exists():
+            return f"Error: File {file_path} not found."
+        return render_log_digest(path, page=page)
+    except Exception as e:
+        return f"Error reading file: {e}"
 
-# -------------------------------
-# 2) Custom Tool: Log Reader
-# -------------------------------
-class LogTools:
-    @tool("Read Log File")
-    def read_log_file(file_path: str):
-        """
-        Reads the content of a specified log file.
-        Useful for analyzing system events, authentication failures, and errors.
-        """
-        try:
-            path = Path(file_path)
-            if not path.exists():
-                return f"Error: File {file_path} not found."
-            return path.read_text(encoding="utf-8")
-        except Exception as e:
-            return f"Error reading file: {e}"
 
-# -------------------------------
-# 3) Agents
-# -------------------------------
-log_analyzer = Agent(
-    role="Log Analysis Specialist",
-    goal="Analyze raw log files to identify security incidents, anomalies, and suspicious patterns.",
-    backstory=(
-        "You are an expert in digital forensics and log analysis. "
-        "You can spot a brute force attack or privilege escalation attempt from miles away."
-    ),
-    llm=llm,
-    tools=[LogTools.read_log_file],
-    verbose=True,
-)
-
-manager = Agent(
-    role="SOC Manager",
-    goal="Review the log analysis and produce a summary report.",
-    backstory="You oversee the security operations. You need to know if the logs indicate a breach.",
-    llm=llm,
-    verbose=True,
-)
+def build_log_crew(llm, log_file):
+    """
+    The log analyst + manager crew for `log_file` and the kickoff inputs
+    (pre-computed findings and IOCs). Shared with `soc_cli.py logs`.
+    """
+    from crewai import Agent, Task, Crew
+    from crewai.tools import tool
 
-# -------------------------------
-# 4) Tasks
-# -------------------------------
-task_analyze_logs = Task(
-    description=(
-        "Read the file 'sample_logs.log'. "
-        "Analyze the logs for any suspicious activity, specifically looking for:\n"
-        "1. Multiple failed login attempts (Brute Force).\n"
-        "2. Unauthorized sudo usage or privilege escalation attempts.\n"
-        "3. Any other anomalies.\n\n"
-        "Provide a detailed technical analysis of what you found, including timestamps and involved users/IPs."
-    ),
-    agent=log_analyzer,
-    expected_output="Detailed technical analysis of the log file identifying specific security events.",
-)
-
-task_report = Task(
-    description="Create a Log Analysis Report based on the findings.",
-    agent=manager,
-    context=[task_analyze_logs],
-    expected_output="A structured report summarizing the log analysis findings and recommending actions.",
-)
+    # -------------------------------
+    # 1) Custom Tool: Log Reader
+    # -------------------------------
+    read_log_tool = tool("Read Log File")(read_log_file)
 
-# -------------------------------
-# 5) Orchestrate
-# -------------------------------
-crew = Crew(
-    agents=[log_analyzer, manager],
-    tasks=[task_analyze_logs, task_report],
-    verbose=True,
-)
-
-try:
-    result = crew.kickoff()
-    print("\n================ LOG ANALYSIS REPORT ================\n")
-    print(result)
-    print("\n=====================================================\n")
-except Exception as e:
-    print(f"Error executing crew: {e}")
-    import traceback
-    with open("error.log", "w", encoding="utf-8") as f:
-        f.write(f"Error: {e}\n")
-        traceback.print_exc(file=f)
+    # -------------------------------
+    # 2) Local pre-aggregation
+    # -------------------------------
+    # Brute-force and sudo statistics and the log's indicators of compromise
+    # are computed here, so the agent starts from them instead of reading raw
+    # lines.
+    findings = analyze_log(log_file).render()
+    iocs = render_iocs(scan_file(log_file))
+
+    # -------------------------------
+    # 3) Agents
+    # -------------------------------
+    log_analyzer = Agent(
+        role="Log Analysis Specialist",
+        goal="Analyze raw log files to identify security incidents, anomalies, and suspicious patterns.",
+        backstory=(
+            "You are an expert in digital forensics and log analysis. "
+            "You can spot a brute force attack or privilege escalation attempt from miles away."
+        ),
+        llm=llm,
+        tools=[read_log_tool],
+        verbose=True,
+    )
+
+    manager = Agent(
+        role="SOC Manager",
+        goal="Review the log analysis and produce a summary report.",
+        backstory="You oversee the security operations. You need to know if the logs indicate a breach.",
+        llm=llm,
+        verbose=True,
+    )
+
+    # -------------------------------
+    # 4) Tasks
+    # -------------------------------
+    task_analyze_logs = Task(
+        description=(
+            f"The log file '{log_file}' has already been parsed. Per-IP and per-user statistics:\n\n"
+            "{findings}\n\n"
+            "Indicators of compromise seen in the log (occurrences in parentheses):\n"
+            "{iocs}\n\n"
+            "Interpret these findings, specifically:\n"
+            "1. Multiple failed login attempts (Brute Force), and whether any of them succeeded.\n"
+            "2. Unauthorized sudo usage or privilege escalation attempts.\n"
+            "3. Any other anomalies.\n\n"
+            "Only use the Read Log File tool if you need to see specific raw lines. "
+            "Provide a detailed technical analysis of what you found, including timestamps and involved users/IPs."
+        ),
+        agent=log_analyzer,
+        expected_output="Detailed technical analysis of the log file identifying specific security events.",
+    )
+
+    task_report = Task(
+        description="Create a Log Analysis Report based on the findings.",
+        agent=manager,
+        context=[task_analyze_logs],
+        expected_output="A structured report summarizing the log analysis findings and recommending actions.",
+    )
+
+    crew = Crew(
+        agents=[log_analyzer, manager],
+        tasks=[task_analyze_logs, task_report],
+        verbose=True,
+    )
+    return crew, {"findings": findings, "iocs": iocs}
+
+
+def main():
+    from crewai.llm import LLM
+
+    load_dotenv()
+
+    log_file = sys.argv[1] if len(sys.argv) > 1 else "sample_logs.log"
+
+    # -------------------------------
+    # LLM
+    # -------------------------------
+    llm = LLM(
+        model="gemini/gemini-2.0-flash",
+        api_key=os.getenv("GEMINI_API_KEY"),
+        temperature=0.2,
+    )
+
+    # -------------------------------
+    # Orchestrate
+    # -------------------------------
+    try:
+        crew, inputs = build_log_crew(llm, log_file)
+        result = crew.kickoff(inputs=inputs)
+        print("\n================ LOG ANALYSIS REPORT ================\n")
+        print(result)
+        print("\n=====================================================\n")
+    except Exception as e:
+        print(f"Error executing crew: {e}")
+        log_error(e)
+
+
+if __name__ == "__main__":
+    main()
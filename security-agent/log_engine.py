@@ -0,0 +1,248 @@
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+
+from log_stream import CHUNK_SIZE, iter_chunks, iter_matching_lines
+
+# -------------------------------
+# 1) Line parsing
+# -------------------------------
+# Only lines containing one of these markers are parsed at all.
+_PREFILTER = re.compile(
+    rb"Failed password|Failed publickey|Invalid user|authentication failure|Accepted |"
+    rb"sudo(?:\[\d+\])?:|FAILED SU|su(?:\[\d+\])?: "
+)
+
+_SYSLOG = re.compile(
+    r"^(?:(?P<bsd>[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d)|"
+    r"(?P<iso>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?)"
+    r" (?P<host>\S+) (?P<proc>[^\s:\[]+)(?:\[\d+\])?: (?P<msg>.*)$"
+)
+_FAILED = re.compile(r"Failed (?:password|publickey) for (?:invalid user )?(?P<user>\S+) from (?P<ip>[\da-fA-F:.]+)")
+_INVALID_USER = re.compile(r"Invalid user (?P<user>\S*) from (?P<ip>[\da-fA-F:.]+)")
+_PAM_FAILURE = re.compile(r"authentication failure;.*?rhost=(?P<ip>\S*)(?:\s+user=(?P<user>\S+))?")
+_ACCEPTED = re.compile(r"Accepted \S+ for (?P<user>\S+) from (?P<ip>[\da-fA-F:.]+)")
+_SUDO = re.compile(
+    r"^\s*(?P<user>\S+) : (?:(?P<denied>user NOT in sudoers|\d+ incorrect password attempts?) ; )?"
+    r"TTY=\S+ ; PWD=\S+ ; USER=(?P<runas>\S+) ; COMMAND=(?P<command>.*)$"
+)
+_SU_FAILURE = re.compile(r"FAILED SU \(to (?P<runas>\S+)\) (?P<user>\S+)")
+# sshd, sudo and su log a pam_unix "authentication failure" line next to
+# their own line for the same attempt ("Failed password", "N incorrect
+# password attempts", "FAILED SU"), so only their own lines are counted.
+# For other services the PAM line is all there is.
+_PAM_DUPLICATED = frozenset(("sshd", "sudo", "su"))
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])}
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(bsd=None, iso=None, year=None):
+    """
+    Epoch seconds for a syslog timestamp, read as local time. BSD syslog
+    omits the year, so `year` (default: current year) is assumed. Cached:
+    busy logs repeat the same second many times.
+    """
+    if iso:
+        return time.mktime(time.strptime(iso, "%Y-%m-%dT%H:%M:%S"))
+    month = _MONTHS[bsd[:3]]
+    day = int(bsd[4:6])
+    hh, mm, ss = int(bsd[7:9]), int(bsd[10:12]), int(bsd[13:15])
+    return time.mktime((year or time.localtime().tm_year, month + 1, day, hh, mm, ss, 0, 0, -1))
+
+
+def parse_event(line, year=None):
+    """
+    Turns one auth.log line into (kind, timestamp, ip, user, detail) or
+    None. kind is one of: failed_login, invalid_user, accepted_login,
+    sudo, sudo_denied, su_failure.
+    """
+    header = _SYSLOG.match(line)
+    if not header:
+        return None
+    msg = header.group("msg")
+    ts = parse_timestamp(header.group("bsd"), header.group("iso"), year)
+    proc = header.group("proc")
+
+    if proc == "sudo":
+        m = _SUDO.match(msg)
+        if m:
+            kind = "sudo_denied" if m.group("denied") else "sudo"
+            return kind, ts, None, m.group("user"), f"{m.group('runas')}: {m.group('command')[:120]}"
+        return None
+    if proc == "su":
+        m = _SU_FAILURE.search(msg)
+        if m:
+            return "su_failure", ts, None, m.group("user"), m.group("runas")
+        return None
+
+    m = _FAILED.search(msg)
+    if m:
+        return "failed_login", ts, m.group("ip"), m.group("user"), proc
+    m = _INVALID_USER.search(msg)
+    if m:
+        return "invalid_user", ts, m.group("ip"), m.group("user") or "(empty)", proc
+    m = _ACCEPTED.search(msg)
+    if m:
+        return "accepted_login", ts, m.group("ip"), m.group("user"), proc
+    m = None if proc in _PAM_DUPLICATED else _PAM_FAILURE.search(msg)
+    if m and m.group("ip"):
+        return "failed_login", ts, m.group("ip"), m.group("user") or "unknown", proc
+    return None
+
+
+# -------------------------------
+# 2) Aggregation
+# -------------------------------
+class EntityStats:
+    """
+    Counters for one IP or user. Time buckets are a Counter keyed by
+    bucket start, so memory grows with active buckets, not with events.
+    """
+    __slots__ = ("failures", "successes", "sudo", "sudo_denied", "su_failures",
+                 "first_seen", "last_seen", "buckets", "peers", "success_after_failure")
+
+    def __init__(self):
+        self.failures = 0
+        self.successes = 0
+        self.sudo = 0
+        self.sudo_denied = 0
+        self.su_failures = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.buckets = Counter()
+        self.peers = set()
+        self.success_after_failure = False
+
+    def seen(self, ts):
+        if self.first_seen is None or ts < self.first_seen:
+            self.first_seen = ts
+        if self.last_seen is None or ts > self.last_seen:
+            self.last_seen = ts
+
+
+class LogAnalysis:
+    """
+    Per-IP and per-user security statistics for one log file.
+    `bucket` is the rate window in seconds (default: per minute).
+    """
+    MAX_PEERS = 20
+
+    def __init__(self, bucket=60):
+        self.bucket = bucket
+        self.by_ip = {}
+        self.by_user = {}
+        self.kinds = Counter()
+        self.lines = 0
+        self.events = 0
+
+    def add(self, event):
+        kind, ts, ip, user, detail = event
+        self.events += 1
+        self.kinds[kind] += 1
+        bucket = int(ts // self.bucket) * self.bucket
+
+        if kind == "accepted_login" and ip not in self.by_ip:
+            # Routine logins only matter after failures from the same IP;
+            # don't grow a record for every client that ever connected.
+            ip = None
+        if ip:
+            s = self.by_ip.get(ip) or self.by_ip.setdefault(ip, EntityStats())
+            s.seen(ts)
+            if kind in ("failed_login", "invalid_user"):
+                s.failures += 1
+                s.buckets[bucket] += 1
+                if len(s.peers) < self.MAX_PEERS:
+                    s.peers.add(user)
+            elif kind == "accepted_login":
+                s.successes += 1
+                if s.failures:
+                    s.success_after_failure = True
+        if user:
+            s = self.by_user.get(user) or self.by_user.setdefault(user, EntityStats())
+            s.seen(ts)
+            if kind in ("failed_login", "invalid_user"):
+                s.failures += 1
+                s.buckets[bucket] += 1
+                if ip and len(s.peers) < self.MAX_PEERS:
+                    s.peers.add(ip)
+            elif kind == "accepted_login":
+                s.successes += 1
+            elif kind == "sudo":
+                s.sudo += 1
+            elif kind == "sudo_denied":
+                s.sudo_denied += 1
+                s.buckets[bucket] += 1
+            elif kind == "su_failure":
+                s.su_failures += 1
+                s.buckets[bucket] += 1
+
+    # ---- findings ----
+    def findings(self, min_failures=5):
+        """
+        Rows of (finding, entity, count, detail, first_seen, last_seen),
+        most severe first.
+        """
+        rows = []
+        for ip, s in self.by_ip.items():
+            if s.failures >= min_failures:
+                peak = max(s.buckets.values())
+                finding = "Brute force → SUCCESS" if s.success_after_failure else "Brute force"
+                detail = f"{self._peers(s)} users tried, peak {peak}/{self._bucket_name()}"
+                rows.append((finding, ip, s.failures, detail, s.first_seen, s.last_seen))
+        for user, s in self.by_user.items():
+            if s.sudo_denied or s.su_failures:
+                rows.append(("Unauthorized sudo/su", user, s.sudo_denied + s.su_failures,
+                             f"{s.sudo} successful sudo", s.first_seen, s.last_seen))
+            if s.failures >= min_failures and len(s.peers) > 1:
+                rows.append(("Targeted account", user, s.failures,
+                             f"from {self._peers(s)} IPs", s.first_seen, s.last_seen))
+        order = {"Brute force → SUCCESS": 0, "Unauthorized sudo/su": 1, "Brute force": 2, "Targeted account": 3}
+        rows.sort(key=lambda r: (order[r[0]], -r[2]))
+        return rows
+
+    def _peers(self, stats):
+        return f"{len(stats.peers)}+" if len(stats.peers) >= self.MAX_PEERS else str(len(stats.peers))
+
+    def _bucket_name(self):
+        return "min" if self.bucket == 60 else f"{self.bucket}s"
+
+    def render(self, max_rows=50, min_failures=5):
+        """
+        Markdown summary and findings table: the only log-derived text the
+        LLM sees.
+        """
+        fmt = lambda ts: time.strftime("%b %d %H:%M:%S", time.localtime(ts)) if ts else "-"
+        rows = self.findings(min_failures)
+        kinds = ", ".join(f"{k}={v}" for k, v in sorted(self.kinds.items())) or "none"
+        out = [
+            f"Parsed {self.lines} lines, {self.events} security events ({kinds}).",
+            f"{len(self.by_ip)} remote IPs, {len(self.by_user)} users involved.",
+            "",
+            "| Finding | Entity | Count | Detail | First seen | Last seen |",
+            "|---|---|---|---|---|---|",
+        ]
+        for finding, entity, count, detail, first, last in rows[:max_rows]:
+            out.append(f"| {finding} | {entity} | {count} | {detail} | {fmt(first)} | {fmt(last)} |")
+        if not rows:
+            out.append("| No findings | - | 0 | - | - | - |")
+        elif len(rows) > max_rows:
+            out.append(f"\n({len(rows) - max_rows} more rows omitted)")
+        return "\n".join(out)
+
+
+def analyze_log(path, bucket=60, year=None, chunk_size=CHUNK_SIZE):
+    """
+    Streams `path` once and returns its LogAnalysis. Only pre-filtered
+    lines are decoded and parsed.
+    """
+    analysis = LogAnalysis(bucket)
+    for _, chunk in iter_chunks(path, chunk_size):
+        analysis.lines += chunk.count(b"\n")
+        for raw in iter_matching_lines(chunk, _PREFILTER):
+            event = parse_event(raw.decode("utf-8", errors="replace"), year)
+            if event:
+                analysis.add(event)
+    return analysis
@@ -0,0 +1,209 @@
+import re
+from collections import Counter
+from pathlib import Path
+
+# -------------------------------
+# 1) Chunked reading
+# -------------------------------
+CHUNK_SIZE = 8 * 1024 * 1024
+# Longest partial line iter_chunks holds while looking for its newline.
+MAX_LINE = 1024 * 1024
+
+
+def iter_chunks(path, chunk_size=CHUNK_SIZE, max_line=MAX_LINE):
+    """
+    Yields (offset, bytes) chunks of a file that always end on a line
+    boundary, so memory is bounded by `chunk_size` plus one line no matter
+    how large the file is. A line that reaches `max_line` bytes still
+    without a newline (a binary file, a runaway line) is yielded as its own
+    chunk, cut to those bytes, and the rest of it is skipped.
+    """
+    with open(path, "rb", buffering=0) as f:
+        offset = 0  # file position of the first byte of carry + block
+        carry = b""
+        skipping = False
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            if skipping:
+                end = block.find(b"\n")
+                if end < 0:
+                    offset += len(block)
+                    continue
+                offset += end + 1
+                block = block[end + 1:]
+                skipping = False
+            data = carry + block
+            cut = data.rfind(b"\n") + 1
+            if cut:
+                yield offset, data[:cut]
+                offset += cut
+            carry = data[cut:]
+            if len(carry) > max_line:
+                yield offset, carry[:max_line] + b"\n"
+                offset += len(carry)
+                carry = b""
+                skipping = True
+        if carry:
+            yield offset, carry + b"\n"
+
+
+# -------------------------------
+# 2) Security pre-filter
+# -------------------------------
+# One combined pattern finds every interesting line in a chunk in a single
+# regex pass; the category is then decided on that (short) line only.
+# Matching the bare alternation and expanding to the surrounding line with
+# rfind/find is ~4x faster than anchoring the pattern with ^...$.
+CATEGORIES = {
+    "failed_login": re.compile(
+        rb"Failed password|authentication failure|Invalid user|FAILED LOGIN|Failed publickey|"
+        rb"maximum authentication attempts"
+    ),
+    "privilege_escalation": re.compile(
+        rb"NOT in sudoers|incorrect password attempts?|sudo:.*authentication failure|"
+        rb"session opened for user root|su\[\d+\]|su: |pkexec"
+    ),
+    "sudo": re.compile(rb"sudo(?:\[\d+\])?:"),
+}
+_INTERESTING = re.compile(b"|".join(p.pattern for p in CATEGORIES.values()))
+
+# The same filter for decoded lines seen one at a time (the Auto-Pilot's
+# log watcher), plus lines that already are alerts in a format
+# alert_model.py parses: [ALERT] blocks, CEF and JSON.
+SECURITY_LINE = re.compile(
+    "|".join(p.pattern.decode() for p in CATEGORIES.values()) + r"|\[ALERT\]|CEF:\d|^\s*\{"
+)
+
+
+def iter_matching_lines(chunk, pattern=_INTERESTING):
+    """
+    Yields each line of `chunk` (without its newline) that `pattern`
+    (default: the security pre-filter) matches, at most once per line.
+    """
+    pos = 0
+    search = pattern.search
+    while True:
+        match = search(chunk, pos)
+        if match is None:
+            return
+        start = chunk.rfind(b"\n", 0, match.start()) + 1
+        end = chunk.find(b"\n", match.end())
+        if end < 0:
+            end = len(chunk)
+        yield chunk[start:end]
+        pos = end + 1
+
+
+def categorize(line):
+    for name, pattern in CATEGORIES.items():
+        if pattern.search(line):
+            return name
+    return None
+
+
+def iter_security_lines(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields (chunk_index, category, line) for every line matching the
+    pre-filter, reading the file chunk by chunk.
+    """
+    for index, (_, chunk) in enumerate(iter_chunks(path, chunk_size)):
+        for line in iter_matching_lines(chunk):
+            category = categorize(line)
+            if category:
+                yield index, category, line.decode("utf-8", errors="replace")
+
+
+# -------------------------------
+# 3) Digests and paginated windows
+# -------------------------------
+def chunk_digests(path, chunk_size=CHUNK_SIZE, samples_per_chunk=3):
+    """
+    One compact record per chunk: byte range, line count, matches per
+    category and a few sample lines. Only the current chunk is in memory.
+    """
+    for index, (offset, chunk) in enumerate(iter_chunks(path, chunk_size)):
+        counts = Counter()
+        samples = []
+        for line in iter_matching_lines(chunk):
+            category = categorize(line)
+            if category:
+                counts[category] += 1
+                if len(samples) < samples_per_chunk:
+                    samples.append(line.decode("utf-8", errors="replace"))
+        yield {
+            "chunk": index,
+            "bytes": (offset, offset + len(chunk)),
+            "lines": chunk.count(b"\n"),
+            "matches": dict(counts),
+            "samples": samples,
+        }
+
+
+def security_window(path, page=0, page_size=200, chunk_size=CHUNK_SIZE):
+    """
+    Returns page `page` of the pre-filtered lines (page_size lines each)
+    and whether more pages follow. Streams the file, keeping only one page.
+    """
+    start, end = page * page_size, (page + 1) * page_size
+    window = []
+    has_more = False
+    for position, (_, category, line) in enumerate(iter_security_lines(path, chunk_size)):
+        if position >= end:
+            has_more = True
+            break
+        if position >= start:
+            window.append(f"[{category}] {line}")
+    return window, has_more
+
+
+def render_log_digest(file_path, page=0, page_size=200, chunk_size=CHUNK_SIZE):
+    """
+    Text handed to the log analysis agent instead of the raw file: totals
+    per category, a per-chunk digest for chunks with findings, and one page
+    of matching lines. The file is streamed once.
+    """
+    path = Path(file_path)
+    start, end = page * page_size, (page + 1) * page_size
+    totals = Counter()
+    total_lines = 0
+    position = 0
+    window = []
+    digest_lines = []
+    for index, (offset, chunk) in enumerate(iter_chunks(path, chunk_size)):
+        total_lines += chunk.count(b"\n")
+        counts = Counter()
+        sample = None
+        for raw in iter_matching_lines(chunk):
+            category = categorize(raw)
+            if not category:
+                continue
+            counts[category] += 1
+            line = None
+            if sample is None or start <= position < end:
+                line = raw.decode("utf-8", errors="replace")
+            if sample is None:
+                sample = line
+            if start <= position < end:
+                window.append(f"[{category}] {line}")
+            position += 1
+        totals.update(counts)
+        if counts and len(digest_lines) < 50:
+            found = ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+            digest_lines.append(f"- chunk {index} (bytes {offset}-{offset + len(chunk)}): {found}; e.g. {sample[:200]}")
+
+    has_more = position > end
+    out = [
+        f"Log digest for {path.name}: {path.stat().st_size} bytes, {total_lines} lines.",
+        "Security-relevant lines by category: "
+        + (", ".join(f"{k}={v}" for k, v in sorted(totals.items())) or "none"),
+        "",
+        "Chunks with findings:",
+        *(digest_lines or ["- none"]),
+        "",
+        f"Matching lines, page {page} ({len(window)} lines"
+        + (f"; call again with page={page + 1} for more)" if has_more else "; last page)") + ":",
+        *window,
+    ]
+    return "\n".join(out)
@@ -0,0 +1,297 @@
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+
+# -------------------------------
+# 1) inotify (Linux) via ctypes
+# -------------------------------
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """
+    Minimal inotify wrapper: watches one directory and reports whether any
+    event touched `filename`. Raises OSError where inotify isn't available.
+    """
+
+    def __init__(self, directory, filename):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+        self._name = os.fsencode(filename)
+
+    def wait(self, timeout):
+        """
+        Blocks up to `timeout` seconds; True if the watched file changed.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        touched = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                start = offset + _EVENT_HEADER.size
+                name = data[start:start + length].rstrip(b"\0")
+                touched = touched or name == self._name
+                offset = start + length
+        return touched
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingNotifier:
+    """
+    Fallback for platforms without inotify: wakes every `interval` seconds
+    and reports a change when the file's inode, size or mtime moved.
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._last = self._signature()
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self._signature()
+        changed = current != self._last
+        self._last = current
+        return changed
+
+    def close(self):
+        pass
+
+
+# -------------------------------
+# 2) Rotation-aware block reader
+# -------------------------------
+class LogWatcher:
+    """
+    Follows a log file and delivers complete new lines in batches.
+
+    - Woken by inotify on Linux, otherwise by a polling fallback.
+    - Reads new bytes in `block_size` blocks and splits lines itself, so a
+      burst of thousands of lines costs a handful of syscalls.
+    - Handles rotation (the path now points at a new inode: the old file is
+      drained, then the new one is read from the start) and truncation
+      (size drops below the read offset: restart from 0).
+    - Persists (inode, offset) to `state_path` after each batch, so a
+      restart resumes exactly where it stopped instead of skipping or
+      re-reading lines. Without saved state it starts at end of file,
+      unless `from_start` is set.
+    """
+
+    def __init__(self, path, on_lines=None, state_path=None, block_size=64 * 1024,
+                 poll_interval=1.0, from_start=False):
+        self.path = os.path.abspath(path)
+        self.on_lines = on_lines
+        self.state_path = state_path
+        self.block_size = block_size
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+
+        self._file = None
+        self._inode = None
+        self._offset = 0
+        self._partial = b""
+        self._stop = threading.Event()
+        self._thread = None
+        self.lines_read = 0
+        self.rotations = 0
+        self.truncations = 0
+        self.backend = None
+
+    # ---- state persistence ----
+    def _load_state(self):
+        if not self.state_path:
+            return None
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return state["inode"], state["offset"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"path": self.path, "inode": self._inode, "offset": self._offset}, f)
+        os.replace(tmp, self.state_path)
+
+    # ---- reading ----
+    def _open(self, resume=True):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        st = os.fstat(f.fileno())
+        saved = self._load_state() if resume else None
+        if saved and saved[0] == st.st_ino and saved[1] <= st.st_size:
+            offset = saved[1]
+        elif resume and not saved and not self.from_start:
+            offset = st.st_size
+        else:
+            offset = 0
+        f.seek(offset)
+        self._file, self._inode, self._offset, self._partial = f, st.st_ino, offset, b""
+        return True
+
+    def _drain(self):
+        """
+        Reads everything currently available from the open file and returns
+        the complete lines. The trailing partial line is held back and its
+        bytes are not counted in the persisted offset.
+        """
+        lines = []
+        while True:
+            block = self._file.read(self.block_size)
+            if not block:
+                break
+            data = self._partial + block
+            parts = data.split(b"\n")
+            self._partial = parts.pop()
+            for raw in parts:
+                self._offset += len(raw) + 1
+                lines.append(raw.rstrip(b"\r").decode("utf-8", errors="replace"))
+        return lines
+
+    def poll(self):
+        """
+        Returns the lines that appeared since the last call, handling
+        rotation and truncation. Safe to call directly (no thread needed).
+        """
+        if self._file is None and not self._open(resume=True):
+            # The file doesn't exist yet, so everything it will contain is new.
+            self.from_start = True
+            return []
+
+        lines = self._drain()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None  # Rotated away and not yet recreated: keep the old handle.
+
+        if st is not None and st.st_ino != self._inode:
+            # Rotated: old file is fully drained above; switch to the new one.
+            self._file.close()
+            self.rotations += 1
+            if self._open(resume=False):
+                lines += self._drain()
+        elif st is not None and st.st_size < self._offset + len(self._partial):
+            # Truncated in place (copytruncate): start over from the top.
+            self.truncations += 1
+            self._file.seek(0)
+            self._offset, self._partial = 0, b""
+            lines += self._drain()
+
+        if lines:
+            self.lines_read += len(lines)
+            self._save_state()
+        return lines
+
+    # ---- background thread ----
+    def _make_notifier(self):
+        try:
+            notifier = Inotify(os.path.dirname(self.path), os.path.basename(self.path))
+            self.backend = "inotify"
+        except OSError:
+            notifier = PollingNotifier(self.path, self.poll_interval)
+            self.backend = "polling"
+        return notifier
+
+    def run(self):
+        notifier = self._make_notifier()
+        try:
+            while not self._stop.is_set():
+                lines = self.poll()
+                if lines and self.on_lines:
+                    self.on_lines(lines)
+                # inotify may coalesce events, so still re-check periodically.
+                notifier.wait(self.poll_interval)
+        finally:
+            notifier.close()
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="log-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def iter_lines(self, max_buffer=10000):
+        """
+        Generator of new lines for callers that want to consume the watcher
+        as a stream. Runs the watcher in the background and hands lines over
+        through a bounded queue (the reader blocks when the consumer lags).
+        """
+        lines = queue.Queue(maxsize=max_buffer)
+
+        def enqueue(batch):
+            for line in batch:
+                lines.put(line)
+
+        self.on_lines = enqueue
+        self.start()
+        try:
+            while True:
+                yield lines.get()
+        finally:
+            self.stop()
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "backend": self.backend,
+            "offset": self._offset,
+            "lines_read": self.lines_read,
+            "rotations": self.rotations,
+            "truncations": self.truncations,
+        }
@@ -0,0 +1,62 @@
+from typing import Any
+
+from crewai import BaseLLM
+from crewai.llms.base_llm import call_stop_override
+
+from llm_memo import completion_key, completion_store
+
+# -------------------------------
+# Memoizing LLM wrapper
+# -------------------------------
+class MemoizedLLM(BaseLLM):
+    """
+    Wraps a crewai LLM so each completion is looked up in a completion store
+    before calling the provider. Sits below the crew, so a pipeline whose
+    alert differs only in later stages re-pays only for the stages whose
+    prompt actually changed. Only plain-text answers are memoized.
+    """
+    inner: Any = None
+    store: Any = None
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        stop = self.stop_sequences
+        key = completion_key(self.model, self.temperature, messages, tools, response_model, stop)
+        cached = self.store.get(key)
+        if cached is not None:
+            return cached
+
+        # Agents apply their stop words to the LLM they hold (this wrapper),
+        # so hand the active list down to the provider LLM for this call.
+        with call_stop_override(self.inner, stop):
+            answer = self.inner.call(
+                messages,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+                response_model=response_model,
+            )
+        if isinstance(answer, str):
+            self.store.set(key, answer)
+        return answer
+
+    def supports_function_calling(self):
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self):
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self):
+        return self.inner.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        return self.inner.get_token_usage_summary()
+
+
+def memoize_llm(llm):
+    store = completion_store()
+    if store is None:
+        return llm
+    return MemoizedLLM(model=llm.model, temperature=llm.temperature, stop=llm.stop, inner=llm, store=store)
@@ -0,0 +1,32 @@
+# -------------------------------
+# Shared helpers for stats() endpoints
+# -------------------------------
+# The fast path, router, report streamer and TI providers report latency
+# percentiles; the result cache and the LLM memo report hit rates. Both
+# are computed here so every stats() block means the same thing.
+
+
+def percentile_ms(sorted_values, q):
+    """
+    q-th quantile (0..1) of already sorted durations in seconds, in
+    milliseconds; None when there are no samples.
+    """
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return round(sorted_values[index] * 1000, 4)
+
+
+def cache_stats(backend, size, hits, misses, evictions):
+    """
+    Common stats() dict for a cache backend.
+    """
+    lookups = hits + misses
+    return {
+        "backend": backend,
+        "entries": size,
+        "hits": hits,
+        "misses": misses,
+        "evictions": evictions,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
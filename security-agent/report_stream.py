@@ -0,0 +1,101 @@
+import contextvars
+import json
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from job_store import STAGE_BY_ROLE
+from metrics import percentile_ms
+
+# -------------------------------
+# Streaming report output
+# -------------------------------
+# /analyze_alert/stream sends each stage's output as soon as its task
+# finishes and, when the LLM streams, the final stage's tokens as they
+# arrive. Token chunks come from crewai's event bus, which calls chunk
+# handlers on the thread making the LLM call, so a context variable set by
+# the worker running the pipeline tells the handler where to send them.
+
+# Stage whose tokens are streamed, per pipeline mode. The compact pipeline
+# answers in one JSON object, so it only streams stage events.
+FINAL_STAGE = {"crew": "report", "dag": "report", "summarizer": "summarize"}
+
+_token_sink = contextvars.ContextVar("soc_token_sink", default=None)
+_forwarding = False
+_forwarding_lock = threading.Lock()
+
+
+def _forward_chunk(source, event):
+    sink = _token_sink.get()
+    if sink is not None and event.chunk:
+        sink(STAGE_BY_ROLE.get(event.agent_role), event.chunk)
+
+
+def _start_forwarding():
+    # Registered on first use rather than at import, so loading this module
+    # (api.py does at startup) doesn't import crewai.
+    global _forwarding
+    with _forwarding_lock:
+        if not _forwarding:
+            from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+
+            crewai_event_bus.on(LLMStreamChunkEvent)(_forward_chunk)
+            _forwarding = True
+
+
+@contextmanager
+def stream_tokens(sink):
+    """
+    Sends LLM stream chunks produced on this thread to sink(stage, chunk)
+    while the block runs.
+    """
+    _start_forwarding()
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+
+def render_event(name, data, format="sse"):
+    """
+    One event as a Server-Sent Events frame, or as a JSON line with the
+    event name under "event" when format="ndjson".
+    """
+    if format == "ndjson":
+        return json.dumps({"event": name, **data}) + "\n"
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+class StreamMetrics:
+    """
+    Time to first useful byte (first stage output, token or report) and
+    total duration of streamed analyses, over the last `window` streams.
+    """
+
+    def __init__(self, window=10000):
+        self._lock = threading.Lock()
+        self._streams = 0
+        self._by_engine = {}
+        self._ttfb = deque(maxlen=window)
+        self._total = deque(maxlen=window)
+
+    def record(self, engine, ttfb, total):
+        with self._lock:
+            self._streams += 1
+            self._by_engine[engine] = self._by_engine.get(engine, 0) + 1
+            self._ttfb.append(ttfb)
+            self._total.append(total)
+
+    def stats(self):
+        with self._lock:
+            ttfb = sorted(self._ttfb)
+            total = sorted(self._total)
+            return {
+                "streams": self._streams,
+                "by_engine": dict(self._by_engine),
+                "ttfb_p50_ms": percentile_ms(ttfb, 0.50),
+                "ttfb_p99_ms": percentile_ms(ttfb, 0.99),
+                "total_p50_ms": percentile_ms(total, 0.50),
+                "total_p99_ms": percentile_ms(total, 0.99),
+            }
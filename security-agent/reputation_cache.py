@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import threat_intel
+import ti_providers
+
+# -------------------------------
+# Shared reputation cache
+# -------------------------------
+# Sits in front of the reputation backend (the local IOC store, plus remote
+# providers when SOC_TI_PROVIDERS is set, see ti_providers.py) for api.py,
+# dashboard.py and the crew tools. Safe to call from the crew worker threads.
+
+VERDICTS = ("malicious", "suspicious", "benign", "negative")
+
+
+def classify_verdict(result):
+    """
+    Cache class for a reputation result. "negative" means no feed lists
+    the address; listed results are bucketed by risk score.
+    """
+    if result is None or result.get("source") is None and "matched" not in result:
+        return "negative"
+    risk = result.get("risk_score") or 0
+    if risk >= 70:
+        return "malicious"
+    if risk >= 30:
+        return "suspicious"
+    return "benign"
+
+
+def _copy(result):
+    # Callers get their own dict (and history list) so they can't edit the
+    # cached entry.
+    copy = dict(result)
+    if isinstance(copy.get("attack_history"), list):
+        copy["attack_history"] = list(copy["attack_history"])
+    return copy
+
+
+class ReputationCache:
+    """
+    LRU cache of reputation results with a TTL per verdict: long for
+    malicious addresses (they stay bad), short for benign ones (they may
+    turn bad), and a separate TTL for negative "not listed" answers.
+
+    Concurrent lookups for the same address are coalesced: one caller
+    queries the backend, the others wait for its answer. If the backend
+    fails and an expired entry is still around, that entry is served.
+    `clock` (seconds, default time.time) is injectable for tests.
+    """
+
+    def __init__(self, backend, max_entries=100000, ttls=None, clock=time.time):
+        self.backend = backend
+        self.clock = clock
+        self.max_entries = max_entries
+        self.ttls = {"malicious": 86400.0, "suspicious": 3600.0, "benign": 300.0, "negative": 600.0}
+        self.ttls.update(ttls or {})
+        self._entries = OrderedDict()  # ip -> (result, verdict, expires_at)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._backend_errors = 0
+        self._stale_served = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_env(cls, backend):
+        return cls(
+            backend,
+            max_entries=int(os.getenv("SOC_REP_CACHE_MAX", "100000")),
+            ttls={
+                verdict: float(os.getenv(f"SOC_REP_TTL_{verdict.upper()}", default))
+                for verdict, default in (("malicious", "86400"), ("suspicious", "3600"),
+                                         ("benign", "300"), ("negative", "600"))
+            },
+        )
+
+    def lookup(self, ip_address):
+        key = threat_intel.normalize_ip(ip_address)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[2]:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                if entry[1] == "negative":
+                    self._negative_hits += 1
+                return _copy(entry[0])
+            pending = self._inflight.get(key)
+            if pending is None:
+                self._misses += 1
+                pending = self._inflight[key] = Future()
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+        if not leader:
+            return _copy(pending.result())
+
+        try:
+            result = self.backend(key)
+        except Exception as e:
+            with self._lock:
+                self._backend_errors += 1
+                self._inflight.pop(key, None)
+                stale = self._entries.get(key)
+                if stale is not None:
+                    self._stale_served += 1
+            if stale is None:
+                pending.set_exception(e)
+                raise
+            pending.set_result(stale[0])
+            return _copy(stale[0])
+
+        verdict = classify_verdict(result)
+        ttl = self.ttls[verdict]
+        if result.get("degraded"):
+            # No provider answered; retry soon rather than pin a partial verdict.
+            ttl = min(ttl, self.ttls["negative"])
+        with self._lock:
+            self._entries[key] = (result, verdict, self.clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            self._inflight.pop(key, None)
+        pending.set_result(result)
+        return _copy(result)
+
+    def invalidate(self, ip_address=None):
+        with self._lock:
+            if ip_address is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(threat_intel.normalize_ip(ip_address), None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            by_verdict = {verdict: 0 for verdict in VERDICTS}
+            for _, verdict, _ in self._entries.values():
+                by_verdict[verdict] += 1
+            return {
+                "entries": len(self._entries),
+                "by_verdict": by_verdict,
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "backend_calls": self._misses,
+                "backend_errors": self._backend_errors,
+                "stale_served": self._stale_served,
+                "evictions": self._evictions,
+                "ttls": dict(self.ttls),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def reputation_cache():
+    """
+    Process-wide cache in front of ti_providers.reputation_backend().
+    Returns None when disabled with SOC_REP_CACHE=off.
+    """
+    global _cache
+    if os.getenv("SOC_REP_CACHE", "on").lower() == "off":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReputationCache.from_env(ti_providers.reputation_backend())
+    return _cache
+
+
+def lookup_ip_reputation(ip_address: str):
+    """
+    Cached drop-in for threat_intel.lookup_ip_reputation.
+    """
+    cache = reputation_cache()
+    if cache is None:
+        return ti_providers.reputation_backend()(ip_address)
+    return cache.lookup(ip_address)
+
+
+def enrich_indicators(indicators):
+    """
+    threat_intel.enrich_indicators with every IP answered through
+    lookup_ip_reputation, so batch lookups (the crew's Enrich Indicators
+    tool, /enrich) share the cache and the remote providers with single
+    ones. Domains, hashes and URLs come from the local IOC store.
+    """
+    results = threat_intel.enrich_indicators(indicators)
+    ips = list(dict.fromkeys(r["indicator"] for r in results if r["type"].startswith("ipv")))
+    if len(ips) > 1 and ti_providers.provider_client() is not None:
+        # Provider round trips overlap; the client enforces its own limits.
+        with ThreadPoolExecutor(max_workers=min(16, len(ips)), thread_name_prefix="soc-enrich") as pool:
+            verdicts = dict(zip(ips, pool.map(lookup_ip_reputation, ips)))
+    else:
+        verdicts = {ip: lookup_ip_reputation(ip) for ip in ips}
+    for result in results:
+        verdict = verdicts.get(result["indicator"])
+        if verdict is not None:
+            result.update((k, v) for k, v in verdict.items() if k != "ip")
+            result["listed"] = classify_verdict(verdict) != "negative"
+    return results
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import cache_stats
+
+# -------------------------------
+# Alert fingerprinting
+# -------------------------------
+# Re-fired copies of the same alert differ only in when they fired and how
+# many times something was counted, so those parts are masked before hashing.
+_TIMESTAMP_PATTERNS = [
+    # 2025-11-29 19:57 IST / 2025-11-29T19:57:03.120Z / 2025-11-29 19:57:03+05:30
+    re.compile(r"\b\d{4}-\d{2}-\d{2}(?:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?"
+               r"(?:\s?(?:Z|[+-]\d{2}:?\d{2}|[A-Z]{2,5})\b)?"),
+    # Nov 29 19:57:03 (syslog)
+    re.compile(r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}\b"),
+    # Bare clock times and 10/13-digit epoch stamps
+    re.compile(r"\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b"),
+    re.compile(r"\b\d{10}(?:\d{3})?\b"),
+]
+_COUNTER_PATTERN = re.compile(
+    r"\b(attempts|count|events|hits|failures|tries|occurrences|packets|bytes)(\s*[:=]\s*)\d+",
+    re.IGNORECASE,
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_alert(alert_text):
+    text = alert_text
+    for pattern in _TIMESTAMP_PATTERNS:
+        text = pattern.sub("<ts>", text)
+    text = _COUNTER_PATTERN.sub(r"\1\2<n>", text)
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def alert_fingerprint(alert_text, model_name, temperature):
+    return normalized_fingerprint(normalize_alert(alert_text), model_name, temperature)
+
+
+def normalized_fingerprint(normalized, model_name, temperature):
+    # For callers that already hold the normalized text (alert_model.Alert).
+    material = f"{model_name}\x00{temperature}\x00{normalized}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# -------------------------------
+# Cache backends
+# -------------------------------
+class MemoryResultCache:
+    """
+    In-process LRU cache of finished reports with a per-entry TTL.
+    """
+
+    def __init__(self, max_entries=1024, ttl=900.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[1] >= self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                    self._evictions += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return cache_stats("memory", len(self._entries), self._hits, self._misses, self._evictions)
+
+
+class SqliteResultCache:
+    """
+    On-disk variant of MemoryResultCache so cached reports survive restarts
+    and can be shared by the API and the dashboard through one file.
+    """
+
+    def __init__(self, path, max_entries=10000, ttl=900.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] >= self.ttl:
+                if row is not None:
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._evictions += 1
+                self._misses += 1
+                return None
+            self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            self._hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._db.execute("DELETE FROM results WHERE created <= ?", (now - self.ttl,))
+            overflow = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM results WHERE key IN"
+                    " (SELECT key FROM results ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+                self._evictions += overflow
+
+    def stats(self):
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return cache_stats("sqlite", size, self._hits, self._misses, self._evictions)
+
+
+def result_cache_from_env():
+    """
+    SOC_CACHE_PATH selects the SQLite backend; otherwise the cache is
+    in-memory. SOC_CACHE_MAX and SOC_CACHE_TTL bound either backend.
+    """
+    ttl = float(os.getenv("SOC_CACHE_TTL", "900"))
+    path = os.getenv("SOC_CACHE_PATH")
+    if path:
+        return SqliteResultCache(path, max_entries=int(os.getenv("SOC_CACHE_MAX", "10000")), ttl=ttl)
+    return MemoryResultCache(max_entries=int(os.getenv("SOC_CACHE_MAX", "1024")), ttl=ttl)
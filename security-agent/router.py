@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from collections import deque
+
+from alert_model import parse_alert
+from fast_path import classify_alert, is_critical, render_report
+from metrics import percentile_ms
+
+TIERS = ("template", "summarizer", "crew")
+
+# Baseline risk per attack type before threat intel and volume are added.
+# Unknown shapes start mid-range: nothing vouches for them being benign.
+_TYPE_RISK = {
+    "port_scan": 10,
+    "brute_force": 25,
+    "unknown": 45,
+    "ransomware": 100,
+}
+
+
+class RouteDecision:
+    __slots__ = ("tier", "score", "attack_type", "reasons", "fields", "template", "reputation")
+
+    def __init__(self, tier, score, attack_type, reasons, fields, template, reputation):
+        self.tier = tier
+        self.score = score
+        self.attack_type = attack_type
+        self.reasons = reasons
+        self.fields = fields
+        self.template = template
+        self.reputation = reputation
+
+    def render_template(self):
+        return render_report(self.template, self.fields, self.reputation)
+
+    def as_dict(self):
+        return {"tier": self.tier, "score": self.score, "attack_type": self.attack_type, "reasons": self.reasons}
+
+
+class AlertRouter:
+    """
+    Scores each alert locally (0-100) from the source IP's reputation
+    risk_score, the parsed attempt count and the attack type, then picks
+    the cheapest pipeline that is good enough:
+
+    - score < template_max and a fast path template fits: "template"
+    - score < summarizer_max: "summarizer" (one agent, one LLM call)
+    - otherwise: "crew" (the full four-agent pipeline)
+
+    Per-tier counts and latencies (over the last `window` alerts) are kept
+    for /stats; callers report latency with `record`.
+    """
+
+    def __init__(self, reputation=None, template_max=40, summarizer_max=70, window=10000):
+        self.reputation = reputation
+        self.template_max = template_max
+        self.summarizer_max = summarizer_max
+        self._lock = threading.Lock()
+        self._counts = {tier: 0 for tier in TIERS}
+        self._latencies = {tier: deque(maxlen=window) for tier in TIERS}
+
+    @classmethod
+    def from_env(cls, reputation=None):
+        return cls(
+            reputation,
+            template_max=int(os.getenv("SOC_ROUTE_TEMPLATE_MAX", "40")),
+            summarizer_max=int(os.getenv("SOC_ROUTE_SUMMARIZER_MAX", "70")),
+        )
+
+    def score(self, alert):
+        """
+        Returns (score, attack_type, reasons, fields, template, reputation)
+        for an alert (text or Alert).
+        """
+        alert = parse_alert(alert)
+        fields = alert.fields()
+        template = classify_alert(alert, fields)
+        attack_type = template or "unknown"
+        score = _TYPE_RISK[attack_type]
+        reasons = [f"type {attack_type} ({score})"]
+
+        reputation = None
+        if self.reputation and fields.get("source_ip"):
+            reputation = self.reputation(fields["source_ip"])
+            risk = reputation.get("risk_score") or 0
+            reasons.append(f"ip risk {risk}")
+            score = max(score, risk)
+
+        attempts = fields.get("attempts") or 0
+        if attempts:
+            bonus = min(15, attempts // 10)
+            reasons.append(f"{attempts} attempts (+{bonus})")
+            score += bonus
+
+        if is_critical(alert.raw):
+            reasons.append("critical keywords")
+            score = max(score, self.summarizer_max)
+        return min(100, score), attack_type, reasons, fields, template, reputation
+
+    def route(self, alert):
+        score, attack_type, reasons, fields, template, reputation = self.score(alert)
+        if score < self.template_max and template:
+            tier = "template"
+        elif score < self.summarizer_max:
+            tier = "summarizer"
+        else:
+            tier = "crew"
+        with self._lock:
+            self._counts[tier] += 1
+        return RouteDecision(tier, score, attack_type, reasons, fields, template, reputation)
+
+    def record(self, tier, seconds):
+        with self._lock:
+            self._latencies[tier].append(seconds)
+
+    def stats(self):
+        with self._lock:
+            total = sum(self._counts.values())
+            tiers = {}
+            for tier in TIERS:
+                latencies = sorted(self._latencies[tier])
+                tiers[tier] = {
+                    "count": self._counts[tier],
+                    "pct": round(100.0 * self._counts[tier] / total, 2) if total else 0.0,
+                    "p50_ms": percentile_ms(latencies, 0.50),
+                    "p99_ms": percentile_ms(latencies, 0.99),
+                }
+            return {
+                "routed": total,
+                "thresholds": {"template_max": self.template_max, "summarizer_max": self.summarizer_max},
+                "tiers": tiers,
+            }
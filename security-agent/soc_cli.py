@@ -0,0 +1,351 @@
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socketserver
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from alert_model import load_alert
+from analyzer import AlertAnalyzer, DEFAULT_MODEL, REQUEST_MODES
+from ingest import FORMATS, drain_queue, enqueue_records, iter_records, run_ingest
+from utils import log_error
+from work_queue import work_queue
+
+# -------------------------------
+# One CLI for the SOC pipeline
+# -------------------------------
+#   python soc_cli.py analyze [--model M] [--mode MODE] [--json] ["<alert>"]
+#   python soc_cli.py logs [--model M] [log_file]
+#   python soc_cli.py serve [--host H] [--port P]
+#   python soc_cli.py daemon [--socket PATH] [--workers N] [--model M] [--mode MODE]
+#   python soc_cli.py ingest [--format F] [--output PATH] [--concurrency N] [--durable] [file | -]
+#   python soc_cli.py worker [--output PATH] [--concurrency N] [--until-empty] [--requeue-dead]
+#
+# `analyze` runs one alert through the same path as the API (fast path,
+# result cache, registry pipeline). `daemon` is for many alerts: one process
+# keeps crewai imported and the pipeline built, and reads JSON lines from
+# stdin (or from each connection to a Unix socket), answering each with a
+# JSON line. `ingest` streams a bulk export (see ingest.py) into JSON-line
+# results; with --durable (and SOC_QUEUE_PATH set) the records go through
+# the on-disk work queue first, and `worker` finishes an interrupted run.
+# Errors are appended to error.log.
+
+MODES = REQUEST_MODES
+
+
+class AlertDaemon:
+    """
+    Analyzes JSON-line requests on a pool of `workers` threads, at most
+    2 * workers in flight per stream, answering in completion order.
+
+    A request line is {"alert_text": ..., "id": ..., "model": ..., "mode":
+    ..., "fast_path": ...} (only alert_text is required), a JSON string, or
+    plain alert text. The answer carries the request's "id" (its line
+    number when absent) and the /analyze_alert response fields, or
+    "status": "error" with "error". {"command": "stats"} answers with
+    counters instead.
+    """
+
+    def __init__(self, analyzer, model_name=DEFAULT_MODEL, mode="crew", workers=4):
+        self.analyzer = analyzer
+        self.model_name = model_name
+        self.mode = mode
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="soc-daemon")
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._handled = 0
+        self._failed = 0
+
+    def warm_up(self):
+        # crewai import and pipeline construction happen here, once, rather
+        # than on the first alert.
+        if self.mode != "auto":
+            self.analyzer.pipeline(self.model_name, self.mode)
+
+    def handle(self, line, index):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = line.rstrip("\n")
+        if not isinstance(request, dict):
+            request = {"alert_text": str(request)}
+        if request.get("command") == "stats":
+            return {"id": request.get("id", index), **self.stats()}
+
+        request_id = request.get("id", index)
+        if not request.get("alert_text"):
+            return {"id": request_id, "status": "error", "error": "alert_text is required"}
+        mode = request.get("mode", self.mode)
+        if mode not in MODES:
+            return {"id": request_id, "status": "error", "error": f"mode must be one of {', '.join(MODES)}"}
+        try:
+            result = self.analyzer.analyze(
+                request["alert_text"],
+                request.get("model", self.model_name),
+                mode,
+                request.get("fast_path", True),
+            )
+        except Exception as e:
+            log_error(e)
+            with self._lock:
+                self._failed += 1
+            return {"id": request_id, "status": "error", "error": str(e)}
+        with self._lock:
+            self._handled += 1
+        return {"id": request_id, **result}
+
+    def serve(self, lines, write):
+        """
+        Runs every non-blank line of `lines` and passes each answer, as a
+        JSON line, to write(). Returns once all of them are answered.
+        """
+        slots = threading.BoundedSemaphore(self.workers * 2)
+        write_lock = threading.Lock()
+
+        def answer(future):
+            try:
+                with write_lock:
+                    write(json.dumps(future.result()) + "\n")
+            except OSError:
+                pass  # client went away; the report is still cached
+            finally:
+                slots.release()
+
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            slots.acquire()
+            self._pool.submit(self.handle, line, index).add_done_callback(answer)
+        # Every slot back means every answer has been written.
+        for _ in range(self.workers * 2):
+            slots.acquire()
+
+    def stats(self):
+        with self._lock:
+            elapsed = time.time() - self._started
+            return {
+                "daemon": {
+                    "handled": self._handled,
+                    "failed": self._failed,
+                    "uptime_s": round(elapsed, 1),
+                    "alerts_per_s": round(self._handled / elapsed, 2) if elapsed else 0.0,
+                },
+                **self.analyzer.stats(),
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        lines = (line.decode("utf-8", "replace") for line in self.rfile)
+        self.server.alert_daemon.serve(lines, lambda text: self.wfile.write(text.encode()))
+
+
+def serve_unix_socket(daemon, path):
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.unlink(path)  # left behind by a daemon that didn't shut down cleanly
+    server = socketserver.ThreadingUnixStreamServer(path, _SocketHandler)
+    server.daemon_threads = True
+    server.alert_daemon = daemon
+    os.chmod(path, 0o600)
+    print(f"soc daemon listening on {path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+# -------------------------------
+# Commands
+# -------------------------------
+def cmd_analyze(args):
+    if args.alert == ["-"]:
+        alert = load_alert(argv=[sys.stdin.read()])
+    else:
+        alert = load_alert(argv=args.alert)
+    try:
+        result = AlertAnalyzer.from_env().analyze(alert, args.model, args.mode, not args.no_fast_path)
+    except Exception as e:
+        print(f"Error analyzing alert: {e}", file=sys.stderr)
+        log_error(e)
+        return 1
+    if args.json:
+        print(json.dumps(result), file=args.out)
+    else:
+        print(result["report"], file=args.out)
+        print(f"\n[engine={result['engine']} cached={result['cached']}]", file=sys.stderr)
+    return 0
+
+
+def cmd_logs(args):
+    from crew_registry import crew_registry
+    from log_analyzer_agent import build_log_crew
+
+    try:
+        crew, inputs = build_log_crew(crew_registry().llm(args.model, args.temperature), args.log_file)
+        result = crew.kickoff(inputs=inputs)
+    except Exception as e:
+        print(f"Error analyzing {args.log_file}: {e}", file=sys.stderr)
+        log_error(e)
+        return 1
+    print(result, file=args.out)
+    return 0
+
+
+def cmd_serve(args):
+    import uvicorn
+
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+def cmd_daemon(args):
+    daemon = AlertDaemon(AlertAnalyzer.from_env(), args.model, args.mode, args.workers)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        daemon.warm_up()
+        if args.socket:
+            serve_unix_socket(daemon, args.socket)
+        else:
+            daemon.serve(sys.stdin, lambda text: (args.out.write(text), args.out.flush()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.shutdown()
+        print(json.dumps(daemon.stats()["daemon"]), file=sys.stderr)
+    return 0
+
+
+def ingest_queue():
+    queue = work_queue("ingest")
+    if queue is None:
+        raise SystemExit("soc: the durable queue needs SOC_QUEUE_PATH (e.g. SOC_QUEUE_PATH=soc_queue.db)")
+    return queue
+
+
+def analyze_payload(analyzer):
+    return lambda p: analyzer.analyze(p["alert"], p["model"], p["mode"], p["fast_path"])
+
+
+def cmd_ingest(args):
+    queue = ingest_queue() if args.durable else None
+    analyzer = AlertAnalyzer.from_env()
+    fast_path = not args.no_fast_path
+    out = args.out if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    try:
+        with contextlib.ExitStack() as stack:
+            if args.input == "-":
+                lines = sys.stdin
+            else:
+                lines = stack.enter_context(open(args.input, encoding="utf-8", newline=""))
+            records = iter_records(lines, args.format, name=args.input)
+            if queue is not None:
+                options = {"model": args.model, "mode": args.mode, "fast_path": fast_path}
+                stats = drain_queue(queue, analyze_payload(analyzer), out, args.concurrency,
+                                    feed=lambda: enqueue_records(records, queue, options))
+            else:
+                stats = run_ingest(records, lambda alert: analyzer.analyze(alert, args.model, args.mode, fast_path),
+                                   out, args.concurrency)
+    except (OSError, ValueError) as e:
+        print(f"Error ingesting {args.input}: {e}", file=sys.stderr)
+        log_error(e)
+        return 1
+    finally:
+        if out is not args.out:
+            out.close()
+    print(json.dumps(stats.as_dict()), file=sys.stderr)
+    return 1 if stats.errors else 0
+
+
+def cmd_worker(args):
+    queue = ingest_queue()
+    if args.requeue_dead:
+        print(f"requeued {queue.requeue_dead()} dead letters", file=sys.stderr)
+    out = args.out if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    try:
+        stats = drain_queue(queue, analyze_payload(AlertAnalyzer.from_env()), out, args.concurrency,
+                            until_empty=args.until_empty)
+    except KeyboardInterrupt:
+        return 0  # claimed records are redelivered after the visibility timeout
+    finally:
+        if out is not args.out:
+            out.close()
+    print(json.dumps({**stats.as_dict(), "work_queue": queue.stats()}), file=sys.stderr)
+    return 1 if stats.errors else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="soc", description="SOC alert analysis")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="analyze one alert (arguments, '-' for stdin, else alerts.txt)")
+    analyze.add_argument("alert", nargs="*")
+    analyze.add_argument("--model", default=DEFAULT_MODEL)
+    analyze.add_argument("--mode", choices=MODES, default=os.getenv("SOC_PIPELINE_MODE", "crew"))
+    analyze.add_argument("--no-fast-path", action="store_true")
+    analyze.add_argument("--json", action="store_true", help="print the full result as JSON")
+    analyze.set_defaults(run=cmd_analyze)
+
+    logs = commands.add_parser("logs", help="analyze a log file with the log analyst crew")
+    logs.add_argument("log_file", nargs="?", default="sample_logs.log")
+    logs.add_argument("--model", default=DEFAULT_MODEL)
+    logs.add_argument("--temperature", type=float, default=0.2)
+    logs.set_defaults(run=cmd_logs)
+
+    serve = commands.add_parser("serve", help="run the HTTP API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--workers", type=int, default=1)
+    serve.set_defaults(run=cmd_serve)
+
+    daemon = commands.add_parser("daemon", help="analyze JSON-line alerts from stdin or a Unix socket")
+    daemon.add_argument("--socket", help="listen on this Unix socket instead of stdin")
+    daemon.add_argument("--workers", type=int, default=int(os.getenv("SOC_WORKERS", "4")))
+    daemon.add_argument("--model", default=DEFAULT_MODEL)
+    daemon.add_argument("--mode", choices=MODES, default=os.getenv("SOC_PIPELINE_MODE", "crew"))
+    daemon.set_defaults(run=cmd_daemon)
+
+    ingest = commands.add_parser("ingest", help="analyze every alert in a bulk file or stdin, writing JSON lines")
+    ingest.add_argument("input", nargs="?", default="-", help="alert file, or - for stdin (default)")
+    ingest.add_argument("--format", choices=FORMATS, default="auto")
+    ingest.add_argument("--output", default="-", help="append results to this file (default stdout)")
+    ingest.add_argument("--concurrency", type=int, default=int(os.getenv("SOC_BATCH_CONCURRENCY", "8")))
+    ingest.add_argument("--model", default=DEFAULT_MODEL)
+    ingest.add_argument("--mode", choices=MODES, default=os.getenv("SOC_PIPELINE_MODE", "crew"))
+    ingest.add_argument("--no-fast-path", action="store_true")
+    ingest.add_argument("--durable", action="store_true", help="go through the work queue in SOC_QUEUE_PATH")
+    ingest.set_defaults(run=cmd_ingest)
+
+    worker = commands.add_parser("worker", help="analyze records left in the durable ingest queue")
+    worker.add_argument("--output", default="-", help="append results to this file (default stdout)")
+    worker.add_argument("--concurrency", type=int, default=int(os.getenv("SOC_BATCH_CONCURRENCY", "8")))
+    worker.add_argument("--until-empty", action="store_true", help="exit once the queue is drained")
+    worker.add_argument("--requeue-dead", action="store_true", help="retry dead-lettered records first")
+    worker.set_defaults(run=cmd_worker)
+    return parser
+
+
+def main(argv=None):
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    # Results are written to args.out, the real stdout. Everything else
+    # printed there (crew progress, crewai's exit banner) goes to stderr for
+    # the rest of the process, so the output can be piped.
+    args.out = sys.stdout
+    sys.stdout = sys.stderr
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Literal
+
+from pydantic import BaseModel, Field, ValidationError
+
+from alert_model import parse_alert
+from job_store import STAGE_BY_ROLE
+
+PIPELINE_MODES = ("crew", "dag", "compact", "summarizer")
+
+# crewai takes seconds to import, so the pipeline constructors import it:
+# api.py can load this module (StageTimer, pipeline types) at startup.
+
+# Local stages (IOC extraction + reputation) run here while the summarizer
+# LLM call is in flight. They are short, so a small shared pool suffices.
+_stage_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SOC_DAG_THREADS", "8")), thread_name_prefix="soc-dag"
+)
+
+
+# -------------------------------
+# 1) Stage timing
+# -------------------------------
+class StageTimer:
+    """
+    Collects per-stage durations for one run. As a crew task_callback it
+    times each task from the previous one's end (tasks run sequentially);
+    DAG stages record their own durations with `record`.
+    """
+
+    def __init__(self, task_callback=None):
+        self.task_callback = task_callback
+        self.started = time.perf_counter()
+        self._last = self.started
+        self._lock = threading.Lock()
+        self.timings = {}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.timings[stage] = round(seconds, 4)
+
+    def __call__(self, output):
+        now = time.perf_counter()
+        stage = STAGE_BY_ROLE.get(getattr(output, "agent", None))
+        with self._lock:
+            if stage:
+                self.timings[stage] = round(now - self._last, 4)
+            self._last = now
+        if self.task_callback:
+            self.task_callback(output)
+
+    def finish(self):
+        self.record("total", time.perf_counter() - self.started)
+        return dict(self.timings)
+
+
+# -------------------------------
+# 2) Local threat intel stage
+# -------------------------------
+def extract_ips(alert):
+    """
+    IPv4 and IPv6 addresses in the alert (text or Alert), each in order of
+    first appearance.
+    """
+    return parse_alert(alert).ips
+
+
+def local_threat_intel(alert, reputation):
+    """
+    Deterministic replacement for the threat intel agent: looks up every
+    IP in the raw alert and renders the results for the later stages.
+    """
+    ips = extract_ips(alert)
+    if not ips:
+        return "No IP addresses found in the alert; no reputation data available."
+    lines = []
+    for ip in ips:
+        rep = reputation(ip)
+        history = ", ".join(rep.get("attack_history") or []) or "none"
+        lines.append(
+            f"- {ip}: risk score {rep.get('risk_score')}, status {rep.get('status')}, "
+            f"ISP {rep.get('isp')}, geolocation {rep.get('geolocation')}, known activity: {history}"
+        )
+    return "Threat Intelligence (local reputation lookup):\n" + "\n".join(lines)
+
+
+# -------------------------------
+# 3) DAG pipeline
+# -------------------------------
+class DagPipeline:
+    """
+    The SOC pipeline as a DAG instead of four sequential tasks:
+
+        summarize ──┐
+                    ├──> mitigate ──> report
+        ioc + rep ──┘
+
+    Threat intel only needs the raw alert, so it runs locally while the
+    summarizer's LLM call is in flight, saving the threat intel agent's
+    round trips. Agents are built once; each stage runs as a one-task crew
+    copied per alert, like the full crew template.
+    """
+
+    def __init__(self, llm, reputation):
+        from crewai import Agent, Task
+
+        self.reputation = reputation
+        summarizer = Agent(
+            role="Security Alert Summarizer",
+            goal="Extract key facts (Source IP, Target, Type).",
+            backstory="You are a SOC analyst. You extract facts precisely.",
+            llm=llm,
+            verbose=True,
+        )
+        mitigator = Agent(
+            role="Mitigation Advisor",
+            goal="Provide remediation steps considering the threat intelligence.",
+            backstory="You are a senior incident responder. You tailor actions based on IP risk.",
+            llm=llm,
+            verbose=True,
+        )
+        manager = Agent(
+            role="SOC Manager",
+            goal="Consolidate all findings into a final SOC Incident Report.",
+            backstory="You are the SOC Manager. You generate the final report.",
+            llm=llm,
+            verbose=True,
+        )
+        self.summarize = self._stage(summarizer, Task(
+            description="Summarize this alert and extract the Source IP:\n{alert_text}",
+            agent=summarizer,
+            expected_output="Summary with Source IP clearly identified.",
+        ))
+        self.mitigate = self._stage(mitigator, Task(
+            description=(
+                "Provide mitigation steps based on the summary and threat intelligence.\n\n"
+                "Summary:\n{summary}\n\n{threat_intel}"
+            ),
+            agent=mitigator,
+            expected_output="Mitigation plan tailored to the specific threat level.",
+        ))
+        self.report = self._stage(manager, Task(
+            description=(
+                "Create a final SOC Incident Report incorporating Summary, Threat Intel, and Mitigation.\n\n"
+                "Summary:\n{summary}\n\n{threat_intel}\n\nMitigation:\n{mitigation}"
+            ),
+            agent=manager,
+            expected_output="Professional SOC Report with dedicated sections for Threat Intel and Mitigation.",
+        ))
+
+    @staticmethod
+    def _stage(agent, task):
+        from crewai import Crew
+
+        return Crew(agents=[agent], tasks=[task], verbose=True)
+
+    @staticmethod
+    def _run(stage, timer, inputs):
+        run = stage.copy()
+        run.task_callback = timer.task_callback
+        return str(run.kickoff(inputs=inputs))
+
+    def kickoff(self, alert, timer):
+        """
+        Runs the DAG for one alert (text or Alert), recording stage
+        durations on `timer`. Returns the final report text.
+        """
+        alert = parse_alert(alert)
+
+        def threat_intel():
+            start = time.perf_counter()
+            intel = local_threat_intel(alert, self.reputation)
+            timer.record("threat_intel", time.perf_counter() - start)
+            if timer.task_callback:
+                timer.task_callback(SimpleNamespace(agent="Threat Intelligence Analyst", raw=intel))
+            return intel
+
+        intel_future = _stage_pool.submit(threat_intel)
+        start = time.perf_counter()
+        summary = self._run(self.summarize, timer, {"alert_text": alert.prompt_text()})
+        timer.record("summarize", time.perf_counter() - start)
+        intel = intel_future.result()
+
+        start = time.perf_counter()
+        mitigation = self._run(self.mitigate, timer, {"summary": summary, "threat_intel": intel})
+        timer.record("mitigate", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        report = self._run(self.report, timer, {"summary": summary, "threat_intel": intel, "mitigation": mitigation})
+        timer.record("report", time.perf_counter() - start)
+        return report
+
+
+# -------------------------------
+# 4) Single-agent summarizer
+# -------------------------------
+SUMMARIZER_INSTRUCTIONS = """
+Summarize this security alert clearly and briefly.
+
+Required sections:
+- Summary (1–2 lines)
+- Key Facts (bullet points: source, target, attempts/ports, time)
+- Current Status (blocked/ongoing/unknown)
+- Severity (Low/Medium/High) with 1-line reason
+- Recommended Actions (2–4 bullets, practical)
+
+Alert:
+{alert_text}
+
+{threat_intel}
+"""
+
+
+class SummarizerPipeline:
+    """
+    The summarizer_gemini.py agent as a pipeline tier: one agent, one LLM
+    call, with locally computed threat intel. Meant for medium-risk alerts
+    that need more than a template but not the full crew.
+    """
+
+    def __init__(self, llm, reputation):
+        from crewai import Agent, Task, Crew
+
+        self.reputation = reputation
+        agent = Agent(
+            role="Security Alert Summarizer",
+            goal=(
+                "Read a security alert and produce a concise, actionable summary with:"
+                " attack type, source, target, impact, current status, and severity (Low/Medium/High)."
+            ),
+            backstory="You are a cybersecurity analyst. You extract key facts and recommend next actions.",
+            llm=llm,
+            verbose=True,
+        )
+        self.crew = Crew(agents=[agent], tasks=[Task(
+            description=SUMMARIZER_INSTRUCTIONS,
+            agent=agent,
+            expected_output="A structured summary with the sections listed above. Avoid verbosity.",
+        )], verbose=True)
+
+    def kickoff(self, alert, timer):
+        alert = parse_alert(alert)
+        start = time.perf_counter()
+        intel = local_threat_intel(alert, self.reputation)
+        timer.record("threat_intel", time.perf_counter() - start)
+        start = time.perf_counter()
+        run = self.crew.copy()
+        run.task_callback = timer.task_callback
+        report = str(run.kickoff(inputs={"alert_text": alert.prompt_text(), "threat_intel": intel}))
+        timer.record("summarize", time.perf_counter() - start)
+        return report
+
+
+# -------------------------------
+# 5) Compact single-call pipeline
+# -------------------------------
+class CompactReport(BaseModel):
+    """
+    Schema for the compact pipeline's one structured LLM answer.
+    """
+    summary: str = Field(description="Two or three sentence summary of the alert.")
+    attack_type: str = Field(description="Short attack classification, e.g. 'SSH brute force'.")
+    severity: Literal["low", "medium", "high", "critical"]
+    source_ips: list[str] = Field(description="Source IP addresses involved.")
+    mitigation: list[str] = Field(description="Concrete remediation steps, most urgent first.")
+    report: str = Field(description="Final SOC incident report in markdown.")
+
+
+COMPACT_PROMPT = """You are a SOC team (analyst, incident responder and SOC manager) handling one alert.
+Threat intelligence has already been gathered; do not invent other lookups.
+
+Alert:
+{alert_text}
+
+{threat_intel}
+
+Return only a JSON object matching this schema:
+{schema}"""
+
+
+def parse_structured(answer, model):
+    """
+    Validates an LLM answer against `model`. Accepts a model instance
+    (providers with native structured output) or JSON text, optionally
+    wrapped in a markdown code fence.
+    """
+    if isinstance(answer, model):
+        return answer
+    if isinstance(answer, BaseModel):
+        return model.model_validate(answer.model_dump())
+    text = str(answer).strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    return model.model_validate_json(text)
+
+
+def render_compact_report(result):
+    steps = "\n".join(f"{i}. {step}" for i, step in enumerate(result.mitigation, 1))
+    return (
+        f"{result.report.strip()}\n\n"
+        f"**Attack type:** {result.attack_type}  \n"
+        f"**Severity:** {result.severity}  \n"
+        f"**Source IPs:** {', '.join(result.source_ips) or 'none'}\n\n"
+        f"### Mitigation\n{steps}"
+    )
+
+
+class CompactPipeline:
+    """
+    The whole SOC pipeline as one structured LLM request: threat intel is
+    computed locally, then summary, mitigation and report come back in a
+    single CompactReport. A reply that fails validation is retried up to
+    `max_retries` times with the validation error attached.
+    """
+
+    def __init__(self, llm, reputation, max_retries=1):
+        self.llm = llm
+        self.reputation = reputation
+        self.max_retries = max_retries
+        self._schema = json.dumps(CompactReport.model_json_schema())
+
+    def kickoff(self, alert, timer):
+        alert = parse_alert(alert)
+        start = time.perf_counter()
+        intel = local_threat_intel(alert, self.reputation)
+        timer.record("threat_intel", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        messages = [{"role": "user", "content": COMPACT_PROMPT.format(
+            alert_text=alert.prompt_text(), threat_intel=intel, schema=self._schema,
+        )}]
+        for attempt in range(self.max_retries + 1):
+            answer = self.llm.call(messages, response_model=CompactReport)
+            try:
+                result = parse_structured(answer, CompactReport)
+                break
+            except ValidationError as e:
+                if attempt == self.max_retries:
+                    raise ValueError(f"Compact pipeline returned invalid output: {e}") from e
+                messages = messages + [
+                    {"role": "assistant", "content": str(answer)},
+                    {"role": "user", "content": f"That did not match the schema ({e}). Return only valid JSON."},
+                ]
+        timer.record("compact", time.perf_counter() - start)
+
+        if timer.task_callback:
+            for role, raw in (
+                ("Security Alert Summarizer", result.summary),
+                ("Threat Intelligence Analyst", intel),
+                ("Mitigation Advisor", "\n".join(result.mitigation)),
+                ("SOC Manager", result.report),
+            ):
+                timer.task_callback(SimpleNamespace(agent=role, raw=raw))
+        return render_compact_report(result)
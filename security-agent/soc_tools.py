@@ -0,0 +1,36 @@
+from crewai.tools import tool
+
+from reputation_cache import enrich_indicators, lookup_ip_reputation
+
+# -------------------------------
+# Shared crew tools
+# -------------------------------
+# One definition for api.py, dashboard.py and soc_threat_system.py, backed
+# by the indexed IOC store in threat_intel.py (feeds: SOC_IOC_FEEDS) and any
+# remote providers, behind the shared reputation cache.
+
+
+class ThreatIntelTools:
+    @tool("Check IP Reputation")
+    def check_ip_reputation(ip_address: str):
+        """
+        Checks the reputation of a given IP address against the loaded threat
+        intelligence feeds (exact IPs and CIDR ranges).
+        Returns risk score, malicious status, and geolocation.
+        """
+        return lookup_ip_reputation(ip_address)
+
+    @tool("Enrich Indicators")
+    def enrich_indicators(indicators: list[str]):
+        """
+        Looks up many indicators (IPs, domains, file hashes) in one call.
+        Pass every indicator from the alert at once instead of calling
+        Check IP Reputation repeatedly. Returns one reputation entry per
+        indicator plus the highest risk score found.
+        """
+        results = enrich_indicators(indicators)
+        return {
+            "max_risk_score": max((r["risk_score"] or 0 for r in results), default=0),
+            "listed": sum(r["listed"] for r in results),
+            "results": results,
+        }
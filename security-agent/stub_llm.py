@@ -0,0 +1,86 @@
+import json
+import os
+import time
+
+from crewai import BaseLLM
+from crewai.llms.base_llm import llm_call_context
+
+# -------------------------------
+# Offline stand-in for Gemini
+# -------------------------------
+# Any model name starting with "stub/" is served by StubLLM (see get_llm in
+# api.py), so load tests and benchmarks can drive the real crew code without
+# network access or API keys.
+
+STUB_LATENCY = float(os.getenv("SOC_STUB_LATENCY", "0.05"))
+
+
+class StubLLM(BaseLLM):
+    """
+    Deterministic fake LLM that sleeps for `latency` seconds per call and
+    answers in the ReAct "Final Answer" format the agents expect, or with
+    JSON matching `response_model` when one is given. With stream=True,
+    plain-text answers are also emitted as chunk events spread over the
+    call's latency, like a streaming provider would.
+    Token usage is approximated at 4 characters per token.
+    """
+    latency: float = STUB_LATENCY
+    calls: int = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        streaming = self.stream and response_model is None
+        time.sleep(self.latency / 2 if streaming else self.latency)
+        self.calls += 1
+
+        if isinstance(messages, str):
+            prompt = messages
+        else:
+            prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        answer = f"Stub analysis ({len(prompt)} chars of context reviewed)."
+        if response_model is not None:
+            schema = response_model.model_json_schema()
+            answer = json.dumps(_stub_value(schema, schema, answer))
+
+        self._track_token_usage_internal({
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(answer) // 4,
+            "total_tokens": (len(prompt) + len(answer)) // 4,
+        })
+        if response_model is not None:
+            return answer
+        answer = f"Thought: I now know the final answer\nFinal Answer: {answer}"
+        if streaming:
+            words = answer.split(" ")
+            with llm_call_context():
+                for i, word in enumerate(words):
+                    time.sleep(self.latency / 2 / len(words))
+                    self._emit_stream_chunk_event(word if i == 0 else " " + word,
+                                                  from_task=from_task, from_agent=from_agent)
+        return answer
+
+    def supports_function_calling(self):
+        return False
+
+
+def _stub_value(schema, root, text):
+    """
+    Smallest value satisfying a JSON schema node: first enum choice, one
+    list item, `text` for strings.
+    """
+    if "$ref" in schema:
+        schema = root["$defs"][schema["$ref"].rsplit("/", 1)[-1]]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema:
+        return _stub_value(schema["anyOf"][0], root, text)
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _stub_value(prop, root, text) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_stub_value(schema.get("items", {}), root, text)]
+    if kind in ("integer", "number"):
+        return schema.get("minimum", 0)
+    if kind == "boolean":
+        return False
+    return text
@@ -0,0 +1,35 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# The modules live flat in security-agent/ and import each other by name.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+
+@pytest.fixture
+def load_api(monkeypatch):
+    """
+    Returns load(**env): api.py imported afresh with the given SOC_*
+    settings, which it reads at import time. Pools are shut down after.
+    """
+    import work_queue
+
+    loaded = []
+
+    def load(**env):
+        monkeypatch.delenv("SOC_QUEUE_PATH", raising=False)
+        monkeypatch.setenv("GEMINI_API_KEY", "test")
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        monkeypatch.setattr(work_queue, "_queues", {})
+        import api
+        loaded.append(importlib.reload(api))
+        return loaded[-1]
+
+    yield load
+    for api in loaded:
+        api.crew_pool.shutdown(wait=True)
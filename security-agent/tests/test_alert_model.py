@@ -0,0 +1,79 @@
+import pytest
+
+from alert_model import Alert, parse_alert
+
+
+def test_alert_block():
+    alert = parse_alert("[ALERT] 2025-11-29 19:57 IST\nMultiple failed SSH login attempts detected.\n"
+                        "Source IP: 45.12.34.7\nTarget: Ubuntu-Prod-Server-04\nAttempts: 56 tries\n"
+                        "Status: Blocked by Fail2Ban")
+    assert alert.format == "alert"
+    assert alert.fields() == {
+        "timestamp": "2025-11-29 19:57 IST",
+        "title": "Multiple failed SSH login attempts detected.",
+        "source_ip": "45.12.34.7",
+        "target": "Ubuntu-Prod-Server-04",
+        "attempts": 56,
+        "status": "Blocked by Fail2Ban",
+    }
+
+
+@pytest.mark.parametrize("header, title", [
+    ("SSH Brute Force detected from IP 45.12.34.7", "SSH Brute Force detected from IP 45.12.34.7"),
+    ("C2 beacon to 8.8.8.8 Port: 443", "C2 beacon to 8.8.8.8 Port: 443"),
+    ("Monitoring agent down", "Monitoring agent down"),
+])
+def test_header_without_a_time_is_the_title(header, title):
+    fields = parse_alert(f"[ALERT] {header}").fields()
+    assert fields["title"] == title
+    assert "timestamp" not in fields
+
+
+@pytest.mark.parametrize("header", [
+    "2025-11-29 19:57 IST", "11/29/2025 7:57 PM", "19:57:01", "Nov 29 19:57:01", "Mon, 29 Nov 2025 10:00",
+    "2025-11-29 19:57 - 2025-11-29 20:05",
+])
+def test_header_with_a_time_is_the_timestamp(header):
+    fields = parse_alert(f"[ALERT] {header}\nPort scan detected").fields()
+    assert fields["timestamp"] == header
+    assert fields["title"] == "Port scan detected"
+
+
+def test_empty_header_takes_title_from_next_line():
+    assert parse_alert("[ALERT]\nDisk wiped\nTarget: fs-01").fields() == {"title": "Disk wiped", "target": "fs-01"}
+
+
+def test_ecs_json():
+    alert = parse_alert('{"@timestamp": "2025-11-29T10:00:00Z", "rule": {"name": "SSH brute force"},'
+                        ' "source": {"ip": "45.12.34.7"}, "host": {"name": "srv-01"},'
+                        ' "event": {"count": 12, "outcome": "failure"}}')
+    assert alert.format == "json"
+    assert alert.fields() == {"timestamp": "2025-11-29T10:00:00Z", "title": "SSH brute force",
+                              "source_ip": "45.12.34.7", "target": "srv-01", "attempts": 12, "status": "failure"}
+
+
+def test_dict_is_a_json_alert():
+    assert parse_alert({"src_ip": "1.2.3.4", "title": "x"}).source_ip == "1.2.3.4"
+
+
+def test_cef():
+    alert = parse_alert("CEF:0|Vendor|IDS|1.0|100|Port scan|5|src=1.2.3.4 dhost=web-01 act=blocked")
+    assert alert.format == "cef"
+    assert alert.fields() == {"title": "Port scan", "source_ip": "1.2.3.4", "target": "web-01", "status": "blocked"}
+
+
+def test_syslog():
+    alert = parse_alert("<34>Nov 29 19:57:01 srv-01 sshd[123]: Failed password for root from 45.12.34.7 port 22 ssh2")
+    assert alert.format == "syslog"
+    assert (alert.target, alert.source_ip, alert.user) == ("srv-01", "45.12.34.7", "root")
+
+
+def test_plain_text_falls_back_to_first_ip():
+    alert = parse_alert("something odd from 10.1.1.1 and 10.2.2.2")
+    assert alert.format == "text"
+    assert alert.fields() == {"source_ip": "10.1.1.1"}
+
+
+def test_alert_passes_through():
+    alert = Alert("raw")
+    assert parse_alert(alert) is alert
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+ALERT = "[ALERT] 2025-11-29 10:00\nUnusual outbound traffic\nSource IP: 10.0.0.{n}\nTarget: db-01"
+
+
+def request(n):
+    return {"alert_text": ALERT.format(n=n), "model": "stub/x", "mode": "summarizer", "fast_path": False}
+
+
+def wait_for(client, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.1)
+
+
+def test_full_job_store_answers_429(load_api, monkeypatch):
+    api = load_api(SOC_JOB_MAX=1)
+    monkeypatch.setattr(api, "start_job", lambda *args, **kwargs: None)  # job stays queued
+    with TestClient(api.app) as client:
+        assert client.post("/jobs", json=request(1)).status_code == 202
+        assert client.post("/jobs", json=request(2)).status_code == 429
+        assert client.post("/ingest", json=request(3)).status_code == 429
+
+
+def test_jobs_finish_on_a_process_pool(load_api):
+    api = load_api(SOC_POOL_KIND="process", SOC_WORKERS=1, SOC_LLM_MEMO="off", SOC_STUB_LATENCY=0)
+    with TestClient(api.app) as client:
+        job_id = client.post("/jobs", json=request(4)).json()["job_id"]
+        job = wait_for(client, job_id)
+    assert job["status"] == "succeeded", job
+    assert job["result"]["engine"] == "summarizer" and job["result"]["report"]
+
+
+def test_job_intake_leaves_the_event_loop_with_remote_providers(load_api, monkeypatch):
+    api = load_api(SOC_AGG_WINDOW=0)
+    on_loop = []
+
+    def probe(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+
+    monkeypatch.setattr(api, "provider_client", lambda: object())
+    monkeypatch.setattr(api, "start_job", probe)
+    with TestClient(api.app) as client:
+        client.post("/jobs", json=request(5))
+        client.post("/ingest", json=request(6))
+        client.post("/ingest", json=request(6))  # closes the first group: dispatch from /ingest
+        time.sleep(1.5)  # and from the flush loop
+    assert on_loop and not any(on_loop)
@@ -0,0 +1,12 @@
+import pytest
+
+
+def test_unknown_default_mode_fails_at_startup(load_api):
+    with pytest.raises(ValueError, match="SOC_PIPELINE_MODE"):
+        load_api(SOC_PIPELINE_MODE="summariser")
+
+
+@pytest.mark.parametrize("mode", ["dag", "auto"])
+def test_default_mode_from_env(load_api, mode):
+    api = load_api(SOC_PIPELINE_MODE=mode)
+    assert api.AlertRequest(alert_text="x").mode == mode
@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+ALERT = "[ALERT] 2025-11-29 10:00\nUnusual outbound traffic\nSource IP: 10.0.0.{n}\nTarget: db-01"
+
+
+@pytest.fixture
+def api(tmp_path, load_api):
+    api = load_api(SOC_QUEUE_PATH=tmp_path / "queue.db", SOC_WORKERS=1, SOC_MAX_QUEUE=0, SOC_QUEUE_WORKERS=3,
+                   SOC_QUEUE_BACKOFF=0.1)
+    api.queue_workers.busy_wait = 0.05
+    return api
+
+
+def request(n):
+    return {"alert_text": ALERT.format(n=n), "model": "stub/x", "mode": "crew", "fast_path": False}
+
+
+def test_failed_analyze_alert_is_not_retried_in_background(api, monkeypatch):
+    calls = []
+
+    def failing(*args, **kwargs):
+        calls.append(1)
+        raise RuntimeError("llm down")
+
+    monkeypatch.setattr(api, "run_soc_crew_cached", failing)
+    with TestClient(api.app) as client:
+        assert client.post("/analyze_alert", json=request(1)).status_code == 500
+        time.sleep(0.5)
+        assert api.alert_queue.pending() == 0
+    assert len(calls) == 1
+
+
+def test_queued_jobs_stay_within_the_worker_pool(api, monkeypatch):
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def crew(alert, model_name, task_callback=None, crew=None, lookup=True, mode="crew", routed=False):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        return "report", False, {}
+
+    monkeypatch.setattr(api, "run_soc_crew_cached", crew)
+    with TestClient(api.app) as client:
+        ids = [client.post("/jobs", json=request(n)).json()["job_id"] for n in range(4)]
+        deadline = time.monotonic() + 10
+        while api.alert_queue.pending() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert [client.get(f"/jobs/{job_id}").json()["status"] for job_id in ids] == ["succeeded"] * 4
+    assert peak[0] == 1
@@ -0,0 +1,20 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+ALERT = "[ALERT] 2025-11-29 10:00\nUnusual outbound traffic\nSource IP: 10.0.0.{n}\nTarget: db-01"
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_stream_runs_on_either_pool_kind(load_api, kind):
+    api = load_api(SOC_POOL_KIND=kind, SOC_WORKERS=1, SOC_LLM_MEMO="off", SOC_STUB_LATENCY=0)
+    body = {"alert_text": ALERT.format(n=len(kind)), "model": "stub/x", "mode": "crew", "fast_path": False}
+    with TestClient(api.app) as client:
+        response = client.post("/analyze_alert/stream", params={"format": "ndjson"}, json=body)
+    events = [json.loads(line) for line in response.text.splitlines()]
+    names = [event["event"] for event in events]
+    assert response.status_code == 200
+    assert names[0] == "meta" and names[-1] == "report", events[-1]
+    assert "stage" in names
+    assert events[-1]["status"] == "success" and events[-1]["report"]
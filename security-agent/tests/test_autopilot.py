@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from autopilot import AutoPilot
+from work_queue import WorkQueue
+
+LINE = "Nov 29 19:57:01 srv-01 sshd[123]: Failed password for root from 45.12.34.7 port 22 ssh2"
+
+
+@pytest.mark.parametrize("queued", [False, True])
+def test_groups_carry_the_options_set_when_flushed(tmp_path, queued):
+    seen = []
+    queue = WorkQueue(str(tmp_path / "queue.db"), "autopilot") if queued else None
+    pilot = AutoPilot(str(tmp_path / "auth.log"), lambda text, options: seen.append(options) or "report",
+                      queue=queue)
+    pilot.options = {"model": "m1", "temperature": 0.2}
+    pilot._on_lines([LINE])
+    pilot.aggregator.flush_all()
+    pilot.options = {"model": "m2", "temperature": 0.7}
+    pilot.start()
+    deadline = time.monotonic() + 5
+    while not pilot.results and time.monotonic() < deadline:
+        time.sleep(0.02)
+    pilot.stop()
+    assert seen == [{"model": "m1", "temperature": 0.2}]
+    assert pilot.results[0]["report"] == "report"
+
+
+def test_only_security_lines_are_aggregated(tmp_path):
+    pilot = AutoPilot(str(tmp_path / "auth.log"), lambda text, options: "report")
+    pilot._on_lines([
+        "Nov 29 19:57:00 srv-01 CRON[99]: (root) CMD (run-parts /etc/cron.hourly)",
+        "Nov 29 19:57:00 srv-01 systemd[1]: Started Session 42 of user bob.",
+        "Nov 29 19:57:00 srv-01 kernel: [ 12.3] eth0: link up",
+        LINE,
+        "[ALERT] 2025-11-29 19:57 IST Port scan detected. Source IP: 203.0.113.9",
+    ])
+    stats = pilot.stats()
+    assert stats["lines_skipped"] == 3 and stats["aggregator"]["open_groups"] == 2
+    assert len(pilot.recent_lines) == 5
+
+
+def test_group_failing_every_attempt_is_dead_lettered(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), "autopilot", max_attempts=2, backoff=0.01)
+    calls = []
+
+    def analyze(text, options):
+        calls.append(text)
+        raise RuntimeError("provider down")
+
+    pilot = AutoPilot(str(tmp_path / "auth.log"), analyze, queue=queue)
+    pilot._on_lines([LINE])
+    pilot.aggregator.flush_all()
+    pilot.start()
+    deadline = time.monotonic() + 5
+    while queue.pending() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    pilot.stop()
+    assert len(calls) == 2
+    assert [letter["error"] for letter in queue.dead_letters()] == ["provider down"]
+    assert [result["error"] for result in pilot.results] == ["provider down"]
+    assert pilot.stats()["analyses_in_flight"] == 0
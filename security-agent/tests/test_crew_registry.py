@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from crew_registry import CrewRegistry
+
+
+def test_slow_build_does_not_block_other_keys():
+    registry = CrewRegistry()
+    registry.llm("stub/x", 0.2)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_build():
+        started.set()
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(1) as pool:
+        building = pool.submit(registry._get, "pipeline", registry._pipelines, ("slow",), slow_build)
+        assert started.wait(5)
+        # A hit and a build for another key both finish while "slow" builds.
+        assert registry.llm("stub/x", 0.2) is registry.llm("stub/x", 0.2)
+        assert registry._get("pipeline", registry._pipelines, ("fast",), object) is not None
+        assert not building.done()
+        release.set()
+        assert building.result(5) is not None
+    assert registry.stats()["builds"] == 3
+
+
+def test_concurrent_callers_share_one_build():
+    registry = CrewRegistry()
+    release = threading.Event()
+    builds = []
+
+    def build():
+        builds.append(1)
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(registry._get, "llm", registry._llms, ("k",), build) for _ in range(4)]
+        release.set()
+        values = {id(future.result(5)) for future in futures}
+    assert len(values) == 1 and len(builds) == 1
+
+
+def test_failed_build_is_retried():
+    registry = CrewRegistry()
+
+    def broken():
+        raise RuntimeError("no provider")
+
+    with pytest.raises(RuntimeError):
+        registry._get("llm", registry._llms, ("k",), broken)
+    assert registry._get("llm", registry._llms, ("k",), lambda: "client") == "client"
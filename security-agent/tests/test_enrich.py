@@ -0,0 +1,30 @@
+import reputation_cache
+from reputation_cache import ReputationCache, enrich_indicators
+
+
+def test_ips_go_through_the_shared_cache_and_backend(monkeypatch):
+    calls = []
+
+    def backend(ip):
+        calls.append(ip)
+        return {"ip": ip, "risk_score": 90, "status": "Malicious", "geolocation": "XX", "attack_history": ["ssh"],
+                "isp": "Example", "source": "abuseipdb", "providers": {"abuseipdb": "ok"}}
+
+    monkeypatch.delenv("SOC_REP_CACHE", raising=False)
+    monkeypatch.setattr(reputation_cache, "_cache", ReputationCache(backend))
+    results = enrich_indicators(["203.0.113.50", "d41d8cd98f00b204e9800998ecf8427e", "203.0.113.50"])
+    assert [r["type"] for r in results] == ["ipv4", "md5", "ipv4"]
+    assert results[0]["listed"] and results[0]["risk_score"] == 90 and results[0]["source"] == "abuseipdb"
+    assert results[0]["indicator"] == "203.0.113.50" and "ip" not in results[0]
+    assert not results[1]["listed"]
+
+    enrich_indicators(["203.0.113.50"])
+    assert calls == ["203.0.113.50"]  # the repeat and the second call were cache hits
+    assert reputation_cache.reputation_cache().stats()["hits"] == 1
+
+
+def test_unlisted_ip_without_providers(monkeypatch):
+    monkeypatch.setenv("SOC_REP_CACHE", "off")
+    monkeypatch.delenv("SOC_TI_PROVIDERS", raising=False)
+    result = enrich_indicators(["192.0.2.200"])[0]
+    assert result["type"] == "ipv4" and not result["listed"] and result["status"] == "Benign"
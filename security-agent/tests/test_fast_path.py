@@ -0,0 +1,50 @@
+import pytest
+
+from alert_model import parse_alert
+from fast_path import FastPath, classify_alert
+from router import AlertRouter
+
+BRUTE_FORCE = """[ALERT] 2025-11-29 19:57 IST
+Multiple failed SSH login attempts detected.
+Source IP: 45.12.34.7
+Target: Ubuntu-Prod-Server-04
+Attempts: 56
+Status: Blocked by Fail2Ban"""
+
+
+def classify(text):
+    alert = parse_alert(text)
+    return classify_alert(alert, alert.fields())
+
+
+def test_known_templates():
+    assert classify(BRUTE_FORCE) == "brute_force"
+    assert classify("[ALERT] 2025-11-29 10:00\nPort scan detected\nSource IP: 1.2.3.4\nTarget: web-01") == "port_scan"
+    assert classify("[ALERT] 2025-11-29 10:00\nRansomware: files encrypted\nTarget: fs-01") == "ransomware"
+
+
+@pytest.mark.parametrize("text", [
+    "[ALERT] C2 beacon to 8.8.8.8 Port: 443",
+    "[ALERT] 2025-11-29 10:00\nAntivirus scanning completed\nSource IP: 10.0.0.5\nTarget: ws-01",
+    "[ALERT] 2025-11-29 10:00\nSuccessful SSH login after brute force\nSource IP: 45.12.34.7\n"
+    "Target: srv-01\nStatus: Allowed",
+])
+def test_no_template_for_unrelated_or_successful_attacks(text):
+    assert classify(text) is None
+    assert FastPath().analyze(text) is None
+
+
+@pytest.mark.parametrize("status", ["Success", "Accepted", "allowed"])
+def test_no_template_when_status_says_it_got_through(status):
+    assert classify(BRUTE_FORCE.replace("Blocked by Fail2Ban", status)) is None
+
+
+def test_escalation_keywords_rule_out_templates():
+    assert classify(BRUTE_FORCE + "\nFollowed by lateral movement to db-01") is None
+    assert classify("[ALERT] 2025-11-29\nPort scan detected, ransom note dropped\nSource IP: 1.2.3.4") is None
+
+
+def test_router_never_templates_critical_alerts():
+    decision = AlertRouter().route("[ALERT] C2 beacon to 8.8.8.8 Port: 443")
+    assert decision.tier != "template"
+    assert AlertRouter().route(BRUTE_FORCE).tier == "template"
@@ -0,0 +1,99 @@
+import io
+import json
+
+import pytest
+
+from ingest import drain_queue, enqueue_records, iter_alert_blocks, iter_records, run_ingest, sniff_format
+from work_queue import WorkQueue
+
+
+def alerts(records):
+    return [record.alert for record in records]
+
+
+def test_alert_blocks_split_on_mid_line_headers():
+    lines = ["preamble\n", "[ALERT] 2025-11-29 19:57\n", "SSH brute force\n",
+             "Source IP: 45.12.34.7[ALERT] 2025-11-29 20:01\n", "Port scan\n"]
+    assert list(iter_alert_blocks(lines)) == [
+        "[ALERT] 2025-11-29 19:57\nSSH brute force\nSource IP: 45.12.34.7",
+        "[ALERT] 2025-11-29 20:01\nPort scan",
+    ]
+
+
+def test_jsonl_records():
+    lines = ['{"id": "a1", "alert_text": "SSH brute force"}\n', "\n",
+             '{"id": "a2", "source": {"ip": "1.2.3.4"}}\n', "not json\n", "[1, 2]\n"]
+    records = list(iter_records(lines, "jsonl"))
+    assert [(r.index, r.id) for r in records] == [(0, "a1"), (1, "a2"), (2, None), (3, None)]
+    assert records[0].alert == "SSH brute force"
+    assert json.loads(records[1].alert) == {"id": "a2", "source": {"ip": "1.2.3.4"}}
+    assert records[2].error.startswith("invalid JSON") and records[3].error == "expected a JSON object"
+
+
+def test_csv_records():
+    lines = ["id,alert_text,source_ip,target\n", "c1,Port scan from 1.2.3.4,,\n", "c2,,5.6.7.8,web01\n"]
+    records = list(iter_records(lines, "csv"))
+    assert [r.id for r in records] == ["c1", "c2"]
+    assert alerts(records) == ["Port scan from 1.2.3.4", {"source_ip": "5.6.7.8", "target": "web01"}]
+
+
+def test_lines_records_skip_blanks():
+    lines = ["CEF:0|Vendor|IDS|1|100|Port scan|5|src=1.2.3.4\r\n", "   \n", "sshd: Failed password\n"]
+    assert alerts(iter_records(lines, "lines")) == [
+        "CEF:0|Vendor|IDS|1|100|Port scan|5|src=1.2.3.4", "sshd: Failed password"]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        list(iter_records([], "xml"))
+
+
+@pytest.mark.parametrize("name, lines, expected", [
+    ("alerts.jsonl", ["[ALERT] looks like a block\n"], "jsonl"),
+    ("export.CSV", ["id,alert_text\n"], "csv"),
+    (None, ["header\n"] * 10 + ["[ALERT] 2025-11-29\n"], "alert"),
+    (None, ["\n", ' {"alert_text": "x"}\n'], "jsonl"),
+    ("syslog.txt", ["sshd: Failed password\n"], "lines"),
+])
+def test_sniff_format(name, lines, expected):
+    format, rest = sniff_format(iter(lines), name)
+    assert format == expected
+    assert list(rest) == lines
+
+
+def test_run_ingest_writes_a_line_per_record():
+    records = iter_records(["ok one\n", "boom\n", "ok two\n"], "lines")
+
+    def analyze(alert):
+        if alert == "boom":
+            raise RuntimeError("provider down")
+        return {"status": "success", "engine": "fast_path", "report": alert.upper()}
+
+    out = io.StringIO()
+    stats = run_ingest(records, analyze, out, concurrency=2)
+    results = sorted((json.loads(line) for line in out.getvalue().splitlines()), key=lambda r: r["index"])
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert results[0]["report"] == "OK ONE" and results[1]["error"] == "provider down"
+    assert stats.as_dict()["records"] == 3 and stats.errors == 1 and stats.engines == {"fast_path": 2}
+
+
+def test_durable_ingest_retries_then_dead_letters(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), "ingest", max_attempts=2, backoff=0.01)
+    calls = {"fine": 0, "flaky": 0, "boom": 0}
+
+    def analyze(payload):
+        calls[payload["alert"]] += 1
+        if payload["alert"] == "boom" or (payload["alert"], calls["flaky"]) == ("flaky", 1):
+            raise RuntimeError("provider down")
+        return {"status": "success", "engine": payload["mode"]}
+
+    records = iter_records(["fine\n", "flaky\n", "boom\n"], "lines")
+    assert enqueue_records(records, queue, {"mode": "crew"}, batch=2) == 3
+    out = io.StringIO()
+    stats = drain_queue(queue, analyze, out, concurrency=2)
+
+    results = {r["index"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert [results[i]["status"] for i in range(3)] == ["success", "success", "error"]
+    assert calls == {"fine": 1, "flaky": 2, "boom": 2}
+    assert stats.records == 3 and stats.errors == 1
+    assert queue.pending() == 0 and len(queue.dead_letters()) == 1
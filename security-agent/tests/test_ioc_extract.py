@@ -0,0 +1,54 @@
+from ioc_extract import extract_iocs, first_ip, refang, scan
+
+MD5 = "d41d8cd98f00b204e9800998ecf8427e"
+SHA1 = "da39a3ee5e6b4b0d3255bfef95601890afd80709"
+SHA256 = "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+
+
+def test_ipv4_validation():
+    found = extract_iocs("256.1.1.1 1.2.3.4.5 v1.2.3.4 10.0.0.300 192.168.1.10 and 8.8.8.8", ("ipv4",))
+    assert found == {"ipv4": ["192.168.1.10", "8.8.8.8"]}
+
+
+def test_ipv6_validation_and_endpoints():
+    text = "from 2001:db8::1, [2001:db8::2]:443, std::string, 1:2:3:4:5:6:7:8:9 and 10.0.0.1:8080 port 70000"
+    found = extract_iocs(text, ("ipv6", "endpoint"))
+    assert found["ipv6"] == ["2001:db8::1", "2001:db8::2"]
+    assert found["endpoint"] == ["10.0.0.1:8080", "[2001:db8::2]:443"]
+
+
+def test_defanged_alert_text():
+    text = "Beacon to hxxp://evil[.]com/gate.php from 45.12.34[.]7 (also hXXps://cdn(.)evil[.]com/x)"
+    assert refang("45.12.34[.]7") == "45.12.34.7"
+    found = extract_iocs(text, ("ipv4", "domain", "url"))
+    assert found == {"ipv4": ["45.12.34.7"], "domain": ["evil.com", "cdn.evil.com"],
+                     "url": ["http://evil.com/gate.php", "https://cdn.evil.com/x"]}
+
+
+def test_log_bytes_are_not_refanged():
+    assert scan(b"45.12.34[.]7 hxxp://evil[.]com", ("ipv4", "url")) == {"ipv4": {}, "url": {}}
+
+
+def test_hash_lengths():
+    text = f"{SHA256} {'a' * 33} {MD5} x{'b' * 32} {'1' * 32} {SHA1.upper()}"
+    found = extract_iocs(text, ("md5", "sha1", "sha256"))
+    assert found == {"md5": [MD5], "sha1": [SHA1], "sha256": [SHA256]}
+
+
+def test_file_names_and_type_names_are_not_domains():
+    found = extract_iocs("dropped update.exe and config.yaml, Trojan.Agent, then called Bad-Host.example.com "
+                         "and c2.example.org", ("domain",))
+    assert found == {"domain": ["c2.example.org"]}
+
+
+def test_dedupe_keeps_first_appearance_order():
+    text = "9.9.9.9 1.1.1.1 9.9.9.9 5.5.5.5 1.1.1.1"
+    assert extract_iocs(text, ("ipv4",)) == {"ipv4": ["9.9.9.9", "1.1.1.1", "5.5.5.5"]}
+    counts = scan(text.encode(), ("ipv4",))["ipv4"]
+    assert list(counts.items()) == [("9.9.9.9", 2), ("1.1.1.1", 2), ("5.5.5.5", 1)]
+
+
+def test_first_ip():
+    assert first_ip("bad 300.1.1.1 then 8.8.8.8 and 1.1.1.1") == "8.8.8.8"
+    assert first_ip("only fe80::1 here") == "fe80::1"
+    assert first_ip("nothing") is None
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from job_store import JobStore, JobStoreFull
+
+
+def test_lifecycle_and_stage_progress():
+    store = JobStore()
+    job = store.create()
+    store.mark_running(job.id)
+
+    class Output:
+        agent = "Security Alert Summarizer"
+
+    store.stage_callback(job.id)(Output())
+    store.succeed(job.id, {"report": "r"})
+    got = store.get(job.id)
+    assert got["status"] == "succeeded" and got["result"] == {"report": "r"}
+    assert got["progress"]["summarize"] == "done" and got["progress"]["report"] == "pending"
+
+
+def test_full_store_evicts_oldest_finished_job_only():
+    store = JobStore(max_jobs=3)
+    live = store.create()
+    done = store.create()
+    store.succeed(done.id, {})
+    running = store.create()
+    store.mark_running(running.id)
+
+    new = store.create()
+    assert store.get(done.id) is None
+    assert all(store.get(j.id) is not None for j in (live, running, new))
+    assert store.stats()["evicted"] == 1
+
+
+def test_full_store_of_live_jobs_rejects():
+    store = JobStore(max_jobs=2)
+    jobs = [store.create(), store.create(status="aggregating")]
+    with pytest.raises(JobStoreFull):
+        store.create()
+    assert all(store.get(j.id) is not None for j in jobs)
+    assert store.stats()["rejected"] == 1
+    store.fail(jobs[0].id, "boom")
+    store.create()  # the failed job makes room
+    assert store.get(jobs[0].id) is None
+
+
+def test_ttl_expires_finished_jobs_only():
+    store = JobStore(ttl=0.05)
+    queued, done = store.create(), store.create()
+    store.succeed(done.id, {})
+    time.sleep(0.1)
+    assert store.get(done.id) is None
+    assert store.get(queued.id)["status"] == "queued"
@@ -0,0 +1,60 @@
+from log_engine import analyze_log, parse_event
+
+SSH_FAILURE = [
+    "Nov 29 19:57:01 web01 sshd[4242]: pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 "
+    "tty=ssh ruser= rhost=45.12.34.7  user=root",
+    "Nov 29 19:57:03 web01 sshd[4242]: Failed password for root from 45.12.34.7 port 52311 ssh2",
+]
+SUDO_FAILURE = [
+    "Nov 29 20:01:10 web01 sudo[5001]: pam_unix(sudo:auth): authentication failure; logname=bob uid=1000 "
+    "euid=0 tty=/dev/pts/0 ruser=bob rhost=  user=bob",
+    "Nov 29 20:01:15 web01 sudo[5001]:      bob : 3 incorrect password attempts ; TTY=pts/0 ; PWD=/home/bob ; "
+    "USER=root ; COMMAND=/bin/cat /etc/shadow",
+]
+SU_FAILURE = [
+    "Nov 29 20:02:00 web01 su[5100]: pam_unix(su:auth): authentication failure; logname=bob uid=1000 euid=0 "
+    "tty=pts/0 ruser=bob rhost=  user=root",
+    "Nov 29 20:02:02 web01 su[5100]: FAILED SU (to root) bob on pts/0",
+]
+
+
+def kinds(lines):
+    return [event[0] for event in map(parse_event, lines) if event]
+
+
+def test_event_kinds():
+    event = parse_event(SSH_FAILURE[1])
+    assert (event[0], event[2], event[3]) == ("failed_login", "45.12.34.7", "root")
+    assert kinds(["Nov 29 19:58:00 web01 sshd[4300]: Invalid user admin from 45.12.34.7 port 40000",
+                  "Nov 29 19:59:00 web01 sshd[4301]: Accepted password for root from 45.12.34.7 port 40001 ssh2",
+                  "Nov 29 20:00:00 web01 sudo[4400]:      bob : TTY=pts/0 ; PWD=/home/bob ; USER=root ; "
+                  "COMMAND=/usr/bin/apt update",
+                  "Nov 29 20:00:05 web01 CRON[4500]: pam_unix(cron:session): session opened for user root"]) == [
+        "invalid_user", "accepted_login", "sudo"]
+
+
+def test_each_attempt_is_counted_once():
+    assert kinds(SSH_FAILURE) == ["failed_login"]
+    assert kinds(SUDO_FAILURE) == ["sudo_denied"]
+    assert kinds(SU_FAILURE) == ["su_failure"]
+    assert parse_event(SU_FAILURE[1])[3:] == ("bob", "root")
+
+
+def test_pam_line_counts_for_services_without_their_own():
+    event = parse_event("Nov 29 20:03:00 mail dovecot[6000]: pam_unix(dovecot:auth): authentication failure; "
+                        "logname= uid=0 euid=0 tty=dovecot ruser=eve rhost=198.51.100.9  user=eve")
+    assert event[0] == "failed_login" and event[2:4] == ("198.51.100.9", "eve")
+
+
+def test_analyze_log_findings(tmp_path):
+    path = tmp_path / "auth.log"
+    lines = SSH_FAILURE * 6 + SUDO_FAILURE + SU_FAILURE + [
+        "Nov 29 19:59:00 web01 sshd[4301]: Accepted password for root from 45.12.34.7 port 40001 ssh2"]
+    path.write_text("\n".join(lines) + "\n")
+    analysis = analyze_log(str(path))
+    assert analysis.lines == len(lines)
+    assert analysis.by_ip["45.12.34.7"].failures == 6
+    assert analysis.by_user["bob"].sudo_denied == 1 and analysis.by_user["bob"].su_failures == 1
+    findings = {row[0]: row[1:3] for row in analysis.findings()}
+    assert findings["Brute force → SUCCESS"] == ("45.12.34.7", 6)
+    assert findings["Unauthorized sudo/su"] == ("bob", 2)
@@ -0,0 +1,38 @@
+import pytest
+
+from log_stream import iter_chunks, iter_matching_lines, iter_security_lines
+
+
+def chunks(tmp_path, content, chunk_size, max_line=1024):
+    path = tmp_path / "auth.log"
+    path.write_bytes(content)
+    return list(iter_chunks(path, chunk_size, max_line))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_chunks_end_on_line_boundaries_with_file_offsets(tmp_path, chunk_size):
+    content = b"first line\nsecond\n\nthird line here\nno newline at end"
+    result = chunks(tmp_path, content, chunk_size)
+    assert all(chunk.endswith(b"\n") for _, chunk in result)
+    assert b"".join(chunk for _, chunk in result) == content + b"\n"
+    for offset, chunk in result:
+        assert content[offset:offset + len(chunk) - 1] == chunk[:-1]
+
+
+@pytest.mark.parametrize("chunk_size", [4, 16, 48])
+def test_overlong_lines_are_cut_and_the_rest_skipped(tmp_path, chunk_size):
+    line = b"Failed password for root from 1.2.3.4\n"
+    content = b"x" * 500 + b"\n" + line + b"\x00" * 300
+    result = chunks(tmp_path, content, chunk_size, max_line=64)
+    assert b"".join(chunk for _, chunk in result).splitlines() == [b"x" * 64, line[:-1], b"\x00" * 64]
+    assert max(len(chunk) for _, chunk in result) <= chunk_size + 64 + 1
+    assert [offset for offset, chunk in result if chunk.startswith(b"Failed")] == [content.index(line)]
+
+
+def test_security_lines(tmp_path):
+    path = tmp_path / "auth.log"
+    path.write_bytes(b"Nov 29 cron[1]: job\nNov 29 sshd[2]: Failed password for root from 1.2.3.4\n"
+                     b"Nov 29 sudo[3]: bob : user NOT in sudoers\n")
+    assert [(category, line.split(": ", 1)[1]) for _, category, line in iter_security_lines(path, 16)] == [
+        ("failed_login", "Failed password for root from 1.2.3.4"), ("privilege_escalation", "bob : user NOT in sudoers")]
+    assert list(iter_matching_lines(b"a\nsudo: x\nsudo[2]: y")) == [b"sudo: x", b"sudo[2]: y"]
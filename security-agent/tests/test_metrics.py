@@ -0,0 +1,15 @@
+from metrics import cache_stats, percentile_ms
+
+
+def test_percentile_ms():
+    assert percentile_ms([], 0.5) is None
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile_ms(values, 0.50) == 51.0
+    assert percentile_ms(values, 0.99) == 100.0
+    assert percentile_ms(values, 1.0) == 100.0
+
+
+def test_cache_stats():
+    assert cache_stats("memory", 3, 0, 0, 0)["hit_rate"] == 0.0
+    assert cache_stats("sqlite", 3, 3, 1, 2) == {
+        "backend": "sqlite", "entries": 3, "hits": 3, "misses": 1, "evictions": 2, "hit_rate": 0.75}
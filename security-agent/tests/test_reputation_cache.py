@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from reputation_cache import ReputationCache, classify_verdict
+
+RISK = {"203.0.113.1": 90, "203.0.113.2": 50, "203.0.113.3": 10}
+TTLS = {"malicious": 100, "suspicious": 50, "benign": 20, "negative": 10}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert condition()
+
+
+def backend(calls):
+    def lookup(ip):
+        calls.append(ip)
+        if ip not in RISK:
+            return {"ip": ip, "risk_score": 10, "status": "Benign", "attack_history": [], "source": None}
+        return {"ip": ip, "risk_score": RISK[ip], "status": "x", "attack_history": [], "source": "feed"}
+    return lookup
+
+
+def test_classify_verdict():
+    assert [classify_verdict(backend([])(ip)) for ip in (*RISK, "192.0.2.1")] == [
+        "malicious", "suspicious", "benign", "negative"]
+
+
+@pytest.mark.parametrize("ip, ttl", [("203.0.113.1", 100), ("203.0.113.2", 50), ("203.0.113.3", 20),
+                                     ("192.0.2.1", 10)])
+def test_each_verdict_expires_after_its_ttl(ip, ttl):
+    calls, clock = [], Clock()
+    cache = ReputationCache(backend(calls), ttls=TTLS, clock=clock)
+    cache.lookup(ip)
+    clock.now += ttl - 0.001
+    cache.lookup(ip)
+    assert len(calls) == 1
+    clock.now += 0.002
+    cache.lookup(ip)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["negative_hits"] == (1 if ip == "192.0.2.1" else 0)
+
+
+def test_expired_entry_is_served_when_the_backend_fails():
+    clock, failing = Clock(), [False]
+
+    def flaky(ip):
+        if failing[0]:
+            raise ConnectionError("provider down")
+        return backend([])(ip)
+
+    cache = ReputationCache(flaky, ttls=TTLS, clock=clock)
+    cache.lookup("203.0.113.3")
+    clock.now += 30
+    failing[0] = True
+    assert cache.lookup("203.0.113.3")["risk_score"] == 10
+    with pytest.raises(ConnectionError):
+        cache.lookup("203.0.113.9")
+    assert cache.stats()["stale_served"] == 1 and cache.stats()["backend_errors"] == 2
+
+
+def test_concurrent_lookups_are_coalesced():
+    calls, started, release = [], threading.Event(), threading.Event()
+
+    def slow(ip):
+        calls.append(ip)
+        started.set()
+        release.wait(5)
+        return backend([])(ip)
+
+    cache = ReputationCache(slow, ttls=TTLS)
+    with ThreadPoolExecutor(8) as pool:
+        leader = pool.submit(cache.lookup, "203.0.113.1")
+        assert started.wait(5)
+        followers = [pool.submit(cache.lookup, "IP: 203.0.113.1") for _ in range(7)]
+        wait_until(lambda: cache.stats()["coalesced"] == 7)
+        release.set()
+        results = [leader.result(5)] + [f.result(5) for f in followers]
+    assert calls == ["203.0.113.1"]
+    assert all(r == results[0] for r in results) and len({id(r) for r in results}) == 8
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_failure_reaches_every_coalesced_caller():
+    started, release = threading.Event(), threading.Event()
+
+    def broken(ip):
+        started.set()
+        release.wait(5)
+        raise ConnectionError("provider down")
+
+    cache = ReputationCache(broken)
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(cache.lookup, "203.0.113.1")]
+        assert started.wait(5)
+        futures += [pool.submit(cache.lookup, "203.0.113.1") for _ in range(2)]
+        wait_until(lambda: cache.stats()["coalesced"] == 2)
+        release.set()
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result(5)
@@ -0,0 +1,28 @@
+import json
+
+from soc_cli import AlertDaemon
+
+
+class Analyzer:
+    def __init__(self):
+        self.calls = []
+
+    def analyze(self, alert_text, model_name, mode, use_fast_path):
+        self.calls.append(mode)
+        return {"status": "success", "report": alert_text, "engine": mode}
+
+
+def test_daemon_rejects_unknown_modes():
+    analyzer = Analyzer()
+    daemon = AlertDaemon(analyzer, mode="dag", workers=1)
+    try:
+        bad = daemon.handle(json.dumps({"id": "a", "alert_text": "x", "mode": "summariser"}), 0)
+        unhashable = daemon.handle(json.dumps({"alert_text": "x", "mode": ["crew"]}), 1)
+        default = daemon.handle(json.dumps({"id": "b", "alert_text": "x"}), 2)
+        auto = daemon.handle(json.dumps({"alert_text": "x", "mode": "auto"}), 3)
+    finally:
+        daemon._pool.shutdown()
+    assert bad["id"] == "a" and bad["status"] == "error" and "mode must be one of" in bad["error"]
+    assert unhashable["status"] == "error" and unhashable["id"] == 1
+    assert (default["engine"], auto["engine"]) == ("dag", "auto")
+    assert analyzer.calls == ["dag", "auto"]
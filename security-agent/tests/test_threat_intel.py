@@ -0,0 +1,85 @@
+import pytest
+
+from threat_intel import UNLISTED, IocStore, enrich_indicators, lookup_ip_reputation
+from ti_providers import merge_verdicts
+
+
+def verdict(risk, status="Malicious"):
+    return {"risk_score": risk, "status": status, "attack_history": [], "source": "test"}
+
+
+@pytest.fixture
+def store():
+    store = IocStore()
+    store.add("10.0.0.0/8", verdict(40, "Suspicious"))
+    store.add("10.1.0.0/16", verdict(70))
+    store.add("10.1.2.3", verdict(95))
+    store.add("10.1.0.0/16", verdict(60))  # duplicate range: the worse verdict stays
+    store.add("192.0.2.0/30", verdict(50))
+    store.add("2001:db8::/32", verdict(80))
+    store.add("Evil.COM", verdict(90))
+    return store.freeze()
+
+
+def risk(store, ip):
+    found = store.lookup(ip)
+    return None if found is None else (found["risk_score"], found.get("matched"))
+
+
+def test_cidr_boundaries(store):
+    assert risk(store, "192.0.2.0") == (50, "192.0.2.0/30")
+    assert risk(store, "192.0.2.3") == (50, "192.0.2.0/30")
+    assert risk(store, "192.0.2.4") is None
+    assert risk(store, "192.0.1.255") is None
+    assert risk(store, "9.255.255.255") is None and risk(store, "11.0.0.0") is None
+
+
+def test_nested_ranges_resolve_to_the_most_specific(store):
+    assert risk(store, "10.1.2.3") == (95, "10.1.2.3")
+    assert risk(store, "10.1.2.2") == (70, "10.1.0.0/16")
+    assert risk(store, "10.1.2.4") == (70, "10.1.0.0/16")
+    assert risk(store, "10.1.255.255") == (70, "10.1.0.0/16")
+    assert risk(store, "10.2.0.0") == (40, "10.0.0.0/8")
+    assert risk(store, "10.0.255.255") == (40, "10.0.0.0/8")
+    assert risk(store, "10.255.255.255") == (40, "10.0.0.0/8")
+
+
+def test_ipv6_and_other_indicators(store):
+    assert risk(store, "2001:db8:ffff::1") == (80, "2001:db8::/32")
+    assert risk(store, "2001:db9::1") is None
+    assert store.lookup("evil.com")["risk_score"] == 90
+    assert store.lookup_many(["evil.com", "10.1.2.3", "x", "evil.com"])[3]["indicator"] == "evil.com"
+
+
+def test_fanout_table_matches_binary_search():
+    store = IocStore()
+    store.add_networks(4, 32, range(1 << 24, (1 << 24) + 2 * 8192, 2), verdict(60))
+    store.add("1.0.0.0/24", verdict(30))
+    store.freeze()
+    assert store._intervals[4].fanout is not None
+    assert risk(store, "1.0.0.2") == (60, "1.0.0.2")
+    assert risk(store, "1.0.0.3") == (30, "1.0.0.0/24")
+    assert risk(store, "1.0.1.0") == (60, "1.0.1.0")
+    assert risk(store, "1.0.1.1") is None
+
+
+def test_frozen_store_rejects_new_indicators(store):
+    with pytest.raises(RuntimeError):
+        store.add("203.0.113.1", verdict(10))
+
+
+def test_unlisted_ip_keeps_the_baseline_fields():
+    result = lookup_ip_reputation("IP: 203.0.113.77")
+    assert result == {"ip": "203.0.113.77", **UNLISTED}
+    assert (result["geolocation"], result["isp"]) == ("US", "Cloud Provider Inc.")
+    domain = enrich_indicators(["unknown-domain.example"])[0]
+    assert (domain["geolocation"], domain["isp"], domain["listed"]) == ("Unknown", "Unknown", False)
+
+
+def test_providers_replace_the_unlisted_placeholders():
+    answer = {"risk_score": 75, "attack_history": ["Scanning"], "isp": "Real ISP", "geolocation": "NL"}
+    merged = merge_verdicts(dict(UNLISTED, ip="203.0.113.77"), {"abuseipdb": answer})
+    assert (merged["isp"], merged["geolocation"], merged["status"]) == ("Real ISP", "NL", "Malicious")
+    listed = dict(verdict(85), isp="BadActor Networks Ltd.", geolocation="Unknown/Proxy")
+    merged = merge_verdicts(listed, {"abuseipdb": answer})
+    assert (merged["isp"], merged["geolocation"]) == ("BadActor Networks Ltd.", "Unknown/Proxy")
@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ti_providers import AbuseIPDB, CircuitBreaker, ProviderClient, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_its_rate():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket._take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket._take() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket._take() == 0.0
+    clock.now += 10  # refills to the burst, no further
+    assert [bucket._take() for _ in range(4)][-1] == pytest.approx(0.5)
+
+
+def test_token_bucket_gives_up_past_max_wait():
+    bucket = TokenBucket(rate=1, burst=1, clock=Clock())
+    assert asyncio.run(bucket.acquire(0))
+    assert not asyncio.run(bucket.acquire(0.5))
+
+
+def test_circuit_breaker_opens_half_opens_and_closes():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.failure()
+    assert breaker.allow() and breaker.state == "closed"
+    breaker.failure()
+    assert breaker.state == "open" and breaker.is_open() and not breaker.allow()
+    clock.now += 10
+    assert not breaker.is_open()
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # one probe at a time
+    breaker.failure()  # failed probe: open again for another reset_timeout
+    assert breaker.state == "open" and breaker.opens == 2 and breaker.is_open()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed" and breaker.failures == 0 and breaker.allow()
+
+
+@pytest.fixture
+def service():
+    state = {"status": 500, "requests": 0}
+
+    def handle(request):
+        state["requests"] += 1
+        if state["status"] != 200:
+            return httpx.Response(state["status"])
+        return httpx.Response(200, json={"data": {"abuseConfidenceScore": 90, "countryCode": "NL",
+                                                  "isp": "Example ISP", "totalReports": 12}})
+
+    state["transport"] = httpx.MockTransport(handle)
+    return state
+
+
+def client_for(service, clock, **provider_options):
+    provider = AbuseIPDB(base_url="http://ti.test", rate=0, failure_threshold=2, reset_timeout=10, clock=clock,
+                         **provider_options)
+    return ProviderClient([provider], max_wait=0, transport=service["transport"])
+
+
+def test_breaker_skips_a_failing_provider_until_the_probe_succeeds(service):
+    clock = Clock()
+    client = client_for(service, clock)
+    try:
+        statuses = [client.lookup("203.0.113.5")["providers"]["abuseipdb"] for _ in range(3)]
+        assert statuses == ["error", "error", "circuit_open"] and service["requests"] == 2
+        assert client.lookup("203.0.113.5")["degraded"]
+
+        clock.now += 10
+        service["status"] = 200
+        result = client.lookup("203.0.113.5")
+        assert result["providers"] == {"abuseipdb": "ok"} and "degraded" not in result
+        assert (result["risk_score"], result["isp"], result["status"]) == (90, "Example ISP", "Malicious")
+        stats = client.stats()["abuseipdb"]
+        assert (stats["breaker"], stats["breaker_opens"], stats["circuit_open"]) == ("closed", 1, 2)
+    finally:
+        client.close()
+
+
+def test_rate_limited_lookups_are_skipped(service):
+    service["status"] = 200
+    clock = Clock()
+    client = client_for(service, clock)
+    client.providers[0].bucket = TokenBucket(rate=1, burst=1, clock=clock)
+    try:
+        assert client.lookup("203.0.113.6")["providers"]["abuseipdb"] == "ok"
+        assert client.lookup("203.0.113.6")["providers"]["abuseipdb"] == "rate_limited"
+        clock.now += 1
+        assert client.lookup("203.0.113.6")["providers"]["abuseipdb"] == "ok"
+        assert service["requests"] == 2
+    finally:
+        client.close()
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import pytest
+
+from work_queue import QueueWorkers, WorkQueue, work_queue
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def test_enqueue_claim_ack(path):
+    queue = WorkQueue(path)
+    queue.enqueue({"n": 1})
+    queue.enqueue_many([{"n": 2}, {"n": 3}])
+    items = [queue.claim() for _ in range(3)]
+    assert [item.payload["n"] for item in items] == [1, 2, 3]
+    assert queue.claim() is None
+    assert all(queue.ack(item) for item in items)
+    assert queue.pending() == 0
+
+
+def test_named_queues_share_a_file(path):
+    WorkQueue(path, "a").enqueue({"n": 1})
+    assert WorkQueue(path, "b").claim() is None
+    assert WorkQueue(path, "a").claim().payload == {"n": 1}
+
+
+def test_unacked_item_is_redelivered_after_visibility_timeout(path):
+    queue = WorkQueue(path, visibility_timeout=0.2)
+    queue.enqueue({"n": 1})
+    first = queue.claim()
+    assert queue.claim() is None
+    time.sleep(0.25)
+    # A fresh instance, as after a crash and restart.
+    second = WorkQueue(path, visibility_timeout=0.2).claim()
+    assert second.id == first.id and second.attempts == 2
+    assert queue.ack(first) is False  # stale lease
+    assert queue.pending() == 1
+
+
+def test_fail_retries_with_backoff_then_dead_letters(path):
+    queue = WorkQueue(path, max_attempts=2, backoff=0.1)
+    queue.enqueue({"n": 1})
+    queue.fail(queue.claim(), "boom")
+    assert queue.claim() is None
+    assert queue.stats()["retry_wait"] == 1
+    item = queue.claim(wait=1.0)
+    assert item.attempts == 2 and queue.last_attempt(item)
+    queue.fail(item, "boom again")
+    assert queue.pending() == 0
+    dead = queue.dead_letters()
+    assert [(d["payload"], d["attempts"], d["error"]) for d in dead] == [({"n": 1}, 2, "boom again")]
+    assert queue.requeue_dead() == 1
+    assert queue.claim().attempts == 1
+
+
+def test_enqueue_claimed_and_release(path):
+    queue = WorkQueue(path)
+    item = queue.enqueue({"n": 1}, claim=True)
+    assert queue.claim() is None
+    queue.release(item)
+    again = queue.claim()
+    assert again.id == item.id and again.attempts == 1
+
+
+def test_workers_drain_and_fail(path):
+    queue = WorkQueue(path, max_attempts=1)
+    done = []
+    queue.enqueue_many([{"n": n} for n in range(20)])
+    queue.enqueue({"fail": True})
+
+    def handle(item):
+        if item.payload.get("fail"):
+            raise RuntimeError("bad")
+        done.append(item.payload["n"])
+
+    workers = QueueWorkers(queue, handle, workers=3).start()
+    deadline = time.monotonic() + 5
+    while queue.pending() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    workers.stop()
+    assert sorted(done) == list(range(20))
+    assert queue.stats()["dead_letters"] == 1
+
+
+def test_restart_after_stop_without_wait_does_not_add_threads(path):
+    workers = QueueWorkers(WorkQueue(path), lambda item: None, workers=2, name="restart-test")
+    workers.start()
+    workers.stop(wait=False)
+    workers.start()
+    time.sleep(0.7)  # old threads notice their stop event within one claim wait
+    alive = [t for t in threading.enumerate() if t.name.startswith("restart-test")]
+    workers.stop()
+    assert len(alive) == 2
+
+
+@pytest.mark.parametrize("cancelled", [CancelledError, asyncio.CancelledError])
+def test_cancelled_work_is_released_and_the_worker_exits(path, cancelled):
+    queue = WorkQueue(path, max_attempts=1)
+    queue.enqueue({"n": 1})
+    handled = threading.Event()
+
+    def handle(item):
+        handled.set()
+        raise cancelled()
+
+    workers = QueueWorkers(queue, handle, workers=1, name="cancel-test").start()
+    assert handled.wait(5)
+    thread = workers._threads[0]
+    thread.join(5)
+    assert not thread.is_alive()
+    workers.stop()
+    item = queue.claim()
+    assert item is not None and item.attempts == 1  # released: the cancelled run didn't count
+    assert queue.stats()["dead_letters"] == 0
+
+
+def test_pool_shutdown_does_not_burn_attempts(path):
+    queue = WorkQueue(path, max_attempts=1)
+    queue.enqueue_many([{"n": n} for n in range(3)])
+    pool = ThreadPoolExecutor(1)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def handle(item):
+        future = pool.submit(gate.wait, 5)
+        started.set()
+        future.result()
+
+    workers = QueueWorkers(queue, handle, workers=3).start()
+    assert started.wait(5)
+    time.sleep(0.2)  # every worker holds an item; two wait behind the gate
+    workers.stop(wait=False)
+    pool.shutdown(wait=False, cancel_futures=True)
+    gate.set()
+    workers.stop()
+    time.sleep(0.1)
+    assert queue.stats()["dead_letters"] == 0
+
+
+def test_work_queue_is_off_without_path(monkeypatch, path):
+    monkeypatch.delenv("SOC_QUEUE_PATH", raising=False)
+    assert work_queue("test") is None
+    monkeypatch.setenv("SOC_QUEUE_PATH", path)
+    assert work_queue("test") is work_queue("test")
@@ -0,0 +1,453 @@
+import csv
+import ipaddress
+import json
+import os
+import re
+import socket
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+# -------------------------------
+# 1) Indexed IOC store
+# -------------------------------
+# IP indicators (single addresses and CIDR ranges) are flattened, per
+# address family, into a sorted array of disjoint integer intervals:
+#
+#     starts[i] <= ip <= ends[i]  ->  verdict profiles[pids[i]]
+#
+# where nested ranges have already been resolved to the most specific one.
+# A lookup is then a single binary search, narrowed further by a fan-out
+# table indexed by the address's top 16 bits, and an IPv4 interval costs
+# 13 bytes. Verdicts (risk score, status, ISP, ...) are deduplicated into a
+# small profile table; feeds typically repeat a few hundred distinct ones.
+_PROFILE_BITS = 24
+_PROFILE_MASK = (1 << _PROFILE_BITS) - 1
+_FANOUT_BITS = 16
+_FANOUT_MIN = 4096
+_BITS = {4: 32, 6: 128}
+
+DEFAULT_FEED = Path(__file__).with_name("ioc_feed.json")
+
+# Verdict for addresses that no feed lists: the fields the agents have
+# always been given for an unknown IP.
+UNLISTED = {
+    "risk_score": 10,
+    "status": "Benign",
+    "geolocation": "US",
+    "attack_history": [],
+    "isp": "Cloud Provider Inc.",
+    "source": None,
+}
+# Verdict for other indicator types (domains, hashes, ...) no feed lists.
+NOT_LISTED = dict(UNLISTED, risk_score=0, status="Not listed", geolocation="Unknown", isp="Unknown")
+_PROFILE_FIELDS = ("risk_score", "status", "geolocation", "attack_history", "isp", "source")
+_IP_IN_TEXT = re.compile(r"[0-9A-Fa-f:.]*[.:][0-9A-Fa-f:.]+(?:/\d{1,3})?")
+
+
+def parse_ip(text):
+    """
+    (version, integer) for an IP address string, or None. inet_pton is
+    several times faster than ipaddress for the common IPv4 case.
+    """
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, text), "big")
+    except OSError:
+        pass
+    try:
+        addr = ipaddress.ip_address(text)
+    except ValueError:
+        return None
+    return addr.version, int(addr)
+
+
+class _Intervals:
+    """
+    Disjoint sorted intervals for one address family.
+    """
+    __slots__ = ("starts", "ends", "pids", "prefixes", "fanout", "shift")
+
+    def __init__(self, version):
+        if version == 4:
+            self.starts, self.ends, self.pids = array("I"), array("I"), array("I")
+        else:
+            self.starts, self.ends, self.pids = [], [], array("I")
+        self.prefixes = array("B")
+        self.fanout = None
+        self.shift = _BITS[version] - _FANOUT_BITS
+
+    def append(self, start, end, pid, prefix_len):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.pids.append(pid)
+        self.prefixes.append(prefix_len)
+
+    def build_fanout(self):
+        """
+        fanout[b] is the first interval starting in top-bits bucket b.
+        """
+        if len(self.starts) < _FANOUT_MIN:
+            return
+        fanout = array("I", bytes(4 * ((1 << _FANOUT_BITS) + 1)))
+        starts, shift = self.starts, self.shift
+        for b in range(1, (1 << _FANOUT_BITS) + 1):
+            fanout[b] = bisect_left(starts, b << shift, fanout[b - 1])
+        self.fanout = fanout
+
+    def find(self, value):
+        """
+        Index of the interval containing `value`, or -1.
+        """
+        starts = self.starts
+        if self.fanout is None:
+            i = bisect_right(starts, value) - 1
+        else:
+            # The containing interval starts in this bucket, or is the last
+            # one starting before it.
+            top = value >> self.shift
+            lo = self.fanout[top]
+            i = bisect_right(starts, value, lo, self.fanout[top + 1]) - 1
+        if i >= 0 and value <= self.ends[i]:
+            return i
+        return -1
+
+
+class IocStore:
+    """
+    Exact and CIDR IP lookups plus exact matches for other indicator types
+    (domains, URLs, hashes). Add indicators, then `freeze()` once; lookups
+    freeze implicitly. To reload feeds, build a new store and swap it in.
+    """
+
+    def __init__(self):
+        self._profiles = []
+        self._profile_ids = {}
+        # family (4/6) -> pending sort keys: start << 8 | prefix_len, then pid
+        self._pending = {4: [], 6: []}
+        self._intervals = {}
+        self._values = {}
+        self._frozen = False
+        self._lock = threading.Lock()
+        self.sources = []
+
+    # ---- building ----
+    def profile_id(self, profile):
+        """
+        Interns a verdict dict and returns its id.
+        """
+        key = json.dumps({f: profile.get(f) for f in _PROFILE_FIELDS}, sort_keys=True, default=str)
+        pid = self._profile_ids.get(key)
+        if pid is None:
+            pid = len(self._profiles)
+            if pid > _PROFILE_MASK:
+                raise ValueError("Too many distinct IOC verdicts")
+            self._profiles.append({f: profile.get(f) for f in _PROFILE_FIELDS})
+            self._profile_ids[key] = pid
+        return pid
+
+    def add_networks(self, version, prefix_len, networks, profile):
+        """
+        Bulk-adds integer network addresses (already masked to `prefix_len`)
+        sharing one verdict. Used by the feed loaders and the benchmark.
+        """
+        if self._frozen:
+            raise RuntimeError("IocStore is frozen; build a new store to reload feeds")
+        pid = self.profile_id(profile)
+        tail = (prefix_len << _PROFILE_BITS) | pid
+        shift = 8 + _PROFILE_BITS
+        self._pending[version].extend((net << shift) | tail for net in networks)
+
+    def add(self, indicator, profile):
+        """
+        Adds one indicator: an IP, a CIDR range, or any other string
+        (matched exactly, case-insensitively).
+        """
+        indicator = indicator.strip()
+        try:
+            net = ipaddress.ip_network(indicator, strict=False)
+        except ValueError:
+            self._values[indicator.lower()] = self.profile_id(profile)
+            return
+        self.add_networks(net.version, net.prefixlen, (int(net.network_address),), profile)
+
+    def freeze(self):
+        with self._lock:
+            if self._frozen:
+                return self
+            for version in (4, 6):
+                keys = self._pending[version]
+                keys.sort()
+                self._intervals[version] = self._flatten(version, keys)
+                self._pending[version] = []
+            self._frozen = True
+        return self
+
+    def _worse(self, a, b):
+        risk = lambda pid: self._profiles[pid].get("risk_score") or 0
+        return a if risk(a) >= risk(b) else b
+
+    def _flatten(self, version, keys):
+        """
+        Turns sorted (start, prefix_len, pid) keys into disjoint intervals.
+        Keys sort by start, then wider range first, so a range's nested
+        ranges follow it; a stack of open ranges tracks which one is
+        innermost. Identical ranges keep the worst verdict.
+        """
+        bits = _BITS[version]
+        out = _Intervals(version)
+        emit = out.append
+        stack = []  # [start, end, pid, prefix_len] of open ranges, innermost last
+        cursor = 0  # first address not yet emitted
+        key_shift = 8 + _PROFILE_BITS
+
+        for key in keys:
+            start = key >> key_shift
+            # Emit and pop open ranges that end before this one starts.
+            while stack and stack[-1][1] < start:
+                top = stack.pop()
+                if cursor <= top[1]:
+                    emit(cursor, top[1], top[2], top[3])
+                    cursor = top[1] + 1
+            pid = key & _PROFILE_MASK
+            prefix_len = (key >> _PROFILE_BITS) & 0xFF
+            if stack:
+                top = stack[-1]
+                if top[0] == start and top[3] == prefix_len:
+                    top[2] = self._worse(top[2], pid)
+                    continue
+                if cursor < start:
+                    emit(cursor, start - 1, top[2], top[3])
+            stack.append([start, start | ((1 << (bits - prefix_len)) - 1), pid, prefix_len])
+            cursor = start
+        while stack:
+            top = stack.pop()
+            if cursor <= top[1]:
+                emit(cursor, top[1], top[2], top[3])
+                cursor = top[1] + 1
+        out.build_fanout()
+        return out
+
+    # ---- lookups ----
+    def lookup(self, indicator):
+        """
+        Reputation dict for an indicator, or None if no feed lists it.
+        IPs match the most specific CIDR range containing them.
+        """
+        if not self._frozen:
+            self.freeze()
+        indicator = indicator.strip()
+        parsed = parse_ip(indicator)
+        if parsed is None:
+            pid = self._values.get(indicator.lower())
+            return None if pid is None else dict(self._profiles[pid], indicator=indicator)
+        version, value = parsed
+        return self._ip_result(indicator, version, value, self._intervals[version].find(value))
+
+    def _ip_result(self, indicator, version, value, i):
+        if i < 0:
+            return None
+        intervals = self._intervals[version]
+        prefix_len = intervals.prefixes[i]
+        if prefix_len == _BITS[version]:
+            match = indicator
+        else:
+            match = str(ipaddress.ip_network((value, prefix_len), strict=False))
+        return dict(self._profiles[intervals.pids[i]], indicator=indicator, matched=match)
+
+    def lookup_many(self, indicators):
+        """
+        lookup() for a batch, in input order; repeated indicators are
+        looked up once. The saving that matters is upstream: one tool call
+        instead of one LLM round trip per indicator.
+        """
+        if not self._frozen:
+            self.freeze()
+        cleaned = [i.strip() for i in indicators]
+        found = {}
+        for indicator in cleaned:
+            if indicator not in found:
+                found[indicator] = self.lookup(indicator)
+        return [None if found[i] is None else dict(found[i]) for i in cleaned]
+
+    def stats(self):
+        if not self._frozen:
+            self.freeze()
+        return {
+            "ip_intervals": sum(len(iv.starts) for iv in self._intervals.values()),
+            "other_indicators": len(self._values),
+            "profiles": len(self._profiles),
+            "sources": list(self.sources),
+        }
+
+
+# -------------------------------
+# 2) Feed loaders
+# -------------------------------
+_STIX_VALUE = re.compile(r"\[(?P<type>[\w-]+):(?P<prop>[\w.'-]+)\s*=\s*'(?P<value>[^']+)'\]")
+
+
+def _profile(record, source):
+    history = record.get("attack_history") or record.get("labels") or []
+    if isinstance(history, str):
+        history = [h.strip() for h in re.split(r"[;|]", history) if h.strip()]
+    risk = record.get("risk_score", record.get("confidence"))
+    return {
+        "risk_score": int(risk) if risk not in (None, "") else 50,
+        "status": record.get("status") or "Malicious",
+        "geolocation": record.get("geolocation") or record.get("country") or "Unknown",
+        "attack_history": list(history),
+        "isp": record.get("isp") or "Unknown",
+        "source": record.get("source") or source,
+    }
+
+
+def load_csv(store, path):
+    """
+    CSV with a header row; the indicator column is `indicator` (or `ip`,
+    `value`), other columns map onto the verdict fields. attack_history
+    may hold several entries separated by ';'.
+    """
+    count = 0
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            indicator = row.get("indicator") or row.get("ip") or row.get("value")
+            if indicator:
+                store.add(indicator, _profile(row, Path(path).name))
+                count += 1
+    return count
+
+
+def load_json(store, path):
+    """
+    A JSON list of records (or {"indicators": [...]}) in the CSV layout,
+    or a STIX 2 bundle whose indicator objects carry patterns like
+    [ipv4-addr:value = '203.0.113.0/24'].
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    source = Path(path).name
+    count = 0
+    if isinstance(data, dict) and data.get("type") == "bundle":
+        for obj in data.get("objects", []):
+            if obj.get("type") != "indicator":
+                continue
+            record = {
+                "risk_score": obj.get("x_risk_score", obj.get("confidence")),
+                "status": obj.get("x_status"),
+                "attack_history": obj.get("labels") or obj.get("indicator_types"),
+                "isp": obj.get("x_isp"),
+                "geolocation": obj.get("x_geolocation"),
+                "source": obj.get("created_by_ref") or source,
+            }
+            for match in _STIX_VALUE.finditer(obj.get("pattern", "")):
+                store.add(match.group("value"), _profile(record, source))
+                count += 1
+        return count
+    records = data.get("indicators", []) if isinstance(data, dict) else data
+    for record in records:
+        indicator = record.get("indicator") or record.get("ip") or record.get("value")
+        if indicator:
+            store.add(indicator, _profile(record, source))
+            count += 1
+    return count
+
+
+def load_feed(store, path):
+    loader = load_csv if str(path).lower().endswith(".csv") else load_json
+    count = loader(store, path)
+    store.sources.append({"path": str(path), "indicators": count})
+    return count
+
+
+# -------------------------------
+# 3) Shared store and lookup
+# -------------------------------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Process-wide store loaded from SOC_IOC_FEEDS (paths separated by
+    os.pathsep; default: ioc_feed.json next to this module).
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = IocStore()
+                feeds = os.getenv("SOC_IOC_FEEDS")
+                for path in feeds.split(os.pathsep) if feeds else [DEFAULT_FEED]:
+                    if path and Path(path).exists():
+                        load_feed(store, path)
+                _store = store.freeze()
+    return _store
+
+
+def normalize_ip(text):
+    """
+    The IP address in a tool argument such as "45.12.34.7" or
+    "IP: 45.12.34.7", or the stripped input when none is found.
+    """
+    text = text.strip()
+    for candidate in [text] + _IP_IN_TEXT.findall(text):
+        try:
+            return str(ipaddress.ip_address(candidate))
+        except ValueError:
+            continue
+    return text
+
+
+def lookup_ip_reputation(ip_address: str):
+    """
+    Reputation for one IP from the local IOC store, in the shape the agents
+    and report templates expect. Unlisted addresses get the UNLISTED verdict.
+    """
+    ip = normalize_ip(ip_address)
+    found = get_store().lookup(ip)
+    result = {"ip": ip}
+    result.update(found if found is not None else UNLISTED)
+    result.pop("indicator", None)
+    result["attack_history"] = list(result["attack_history"] or [])
+    return result
+
+
+_HASH_TYPES = {32: "md5", 40: "sha1", 64: "sha256"}
+_HEX = re.compile(r"[0-9a-fA-F]+")
+_DOMAIN = re.compile(r"(?=.{1,253}$)(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,63}")
+
+
+def indicator_type(value):
+    """
+    ipv4 / ipv6 / md5 / sha1 / sha256 / url / domain / unknown.
+    """
+    parsed = parse_ip(value)
+    if parsed:
+        return f"ipv{parsed[0]}"
+    if len(value) in _HASH_TYPES and _HEX.fullmatch(value):
+        return _HASH_TYPES[len(value)]
+    if "://" in value:
+        return "url"
+    if _DOMAIN.fullmatch(value):
+        return "domain"
+    return "unknown"
+
+
+def enrich_indicators(indicators):
+    """
+    Reputation for many IPs, domains or hashes in one pass over the store,
+    in input order. Each result names the indicator, its type and whether
+    a feed lists it; unlisted IPs get UNLISTED, anything else NOT_LISTED.
+    """
+    values = [str(i).strip() for i in indicators if str(i).strip()]
+    results = []
+    for value, found in zip(values, get_store().lookup_many(values)):
+        kind = indicator_type(value)
+        result = {"indicator": value, "type": kind, "listed": found is not None}
+        if found is None:
+            found = UNLISTED if kind.startswith("ipv") else NOT_LISTED
+        result.update({k: v for k, v in found.items() if k != "indicator"})
+        result["attack_history"] = list(result["attack_history"] or [])
+        results.append(result)
+    return results
@@ -0,0 +1,370 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+import threat_intel
+from metrics import percentile_ms
+
+# -------------------------------
+# Remote threat intel providers
+# -------------------------------
+# Enable with SOC_TI_PROVIDERS=abuseipdb,virustotal. Each provider reads
+# SOC_TI_<NAME>_URL / _KEY / _RATE (requests per second) / _BURST /
+# _CONCURRENCY; point the URLs at ti_stub_server.py to run offline.
+# All providers share one keep-alive connection pool on a background event
+# loop, so a tool call costs a pooled request instead of a TCP+TLS handshake.
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, up to `burst` saved. Only used from the
+    provider event loop, so it needs no lock. `clock` is injectable for tests.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.updated = clock()
+
+    def _take(self):
+        """
+        Takes a token and returns 0, or returns the seconds until one is due.
+        """
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self, max_wait):
+        """
+        Waits up to `max_wait` seconds for a token; False if none came.
+        """
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if wait > max_wait:
+                return False
+            max_wait -= wait
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single probe through
+    (half-open): success closes it, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+
+    def is_open(self):
+        return self.state == "open" and self.clock() - self.opened_at < self.reset_timeout
+
+    def allow(self):
+        if self.state == "closed":
+            return True
+        if self.state == "open" and not self.is_open():
+            self.state = "half_open"
+            return True
+        return False
+
+    def success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self.opened_at = self.clock()
+
+
+class Provider:
+    """
+    One reputation API. Subclasses build the request and map the response
+    to the verdict fields threat_intel uses (risk_score, geolocation, isp,
+    attack_history).
+    """
+
+    name = "provider"
+    default_url = ""
+    default_rate = 1.0
+
+    def __init__(self, base_url=None, api_key="", rate=None, burst=1, concurrency=4,
+                 timeout=5.0, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.base_url = (base_url or self.default_url).rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        rate = self.default_rate if rate is None else rate
+        self.bucket = TokenBucket(rate, burst, clock) if rate > 0 else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, clock)
+        self.concurrency = concurrency
+        self.semaphore = None  # created on the provider loop
+        self.counts = {"ok": 0, "not_found": 0, "error": 0, "rate_limited": 0, "circuit_open": 0}
+        self.latencies = deque(maxlen=10000)
+
+    @classmethod
+    def from_env(cls):
+        prefix = f"SOC_TI_{cls.name.upper()}_"
+        return cls(
+            base_url=os.getenv(prefix + "URL"),
+            api_key=os.getenv(prefix + "KEY", ""),
+            rate=float(os.getenv(prefix + "RATE", str(cls.default_rate))),
+            burst=int(os.getenv(prefix + "BURST", "1")),
+            concurrency=int(os.getenv(prefix + "CONCURRENCY", "4")),
+            timeout=float(os.getenv("SOC_TI_TIMEOUT", "5")),
+            failure_threshold=int(os.getenv("SOC_TI_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("SOC_TI_BREAKER_RESET", "30")),
+        )
+
+    def request(self, ip):
+        """
+        Returns (path, query params, headers) for one lookup.
+        """
+        raise NotImplementedError
+
+    def parse(self, payload):
+        raise NotImplementedError
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return dict(
+            self.counts,
+            breaker=self.breaker.state,
+            breaker_opens=self.breaker.opens,
+            p50_ms=percentile_ms(latencies, 0.50),
+            p99_ms=percentile_ms(latencies, 0.99),
+        )
+
+
+class AbuseIPDB(Provider):
+    name = "abuseipdb"
+    default_url = "https://api.abuseipdb.com"
+    default_rate = 1.0
+
+    def request(self, ip):
+        return "/api/v2/check", {"ipAddress": ip, "maxAgeInDays": 90}, {"Key": self.api_key, "Accept": "application/json"}
+
+    def parse(self, payload):
+        data = payload["data"]
+        reports = data.get("totalReports") or 0
+        return {
+            "risk_score": int(data.get("abuseConfidenceScore") or 0),
+            "geolocation": data.get("countryCode") or "Unknown",
+            "isp": data.get("isp") or "Unknown",
+            "attack_history": [f"{reports} AbuseIPDB reports"] if reports else [],
+        }
+
+
+class VirusTotal(Provider):
+    name = "virustotal"
+    default_url = "https://www.virustotal.com"
+    default_rate = 4 / 60  # public API quota: 4 requests per minute
+
+    def request(self, ip):
+        return f"/api/v3/ip_addresses/{ip}", None, {"x-apikey": self.api_key}
+
+    def parse(self, payload):
+        attributes = payload["data"]["attributes"]
+        stats = attributes.get("last_analysis_stats") or {}
+        malicious, suspicious = stats.get("malicious", 0), stats.get("suspicious", 0)
+        history = [f"flagged malicious by {malicious} VirusTotal engines"] if malicious else []
+        return {
+            # A handful of engines agreeing is already a strong signal.
+            "risk_score": min(100, 10 * malicious + 5 * suspicious),
+            "geolocation": attributes.get("country") or "Unknown",
+            "isp": attributes.get("as_owner") or "Unknown",
+            "attack_history": history + list(attributes.get("tags") or []),
+        }
+
+
+PROVIDERS = {cls.name: cls for cls in (AbuseIPDB, VirusTotal)}
+
+
+def merge_verdicts(local, answers):
+    """
+    Combines the local IOC store verdict with provider answers
+    ({name: fields}): highest risk wins, histories are concatenated and
+    the first known ISP / geolocation is kept. The placeholder ISP and
+    geolocation of an unlisted IP (no "source") never count as known.
+    """
+    result = dict(local)
+    result["attack_history"] = list(local.get("attack_history") or [])
+    sources = [local["source"]] if local.get("source") else []
+    placeholder = {"isp", "geolocation"} if not sources else set()
+    for name, fields in answers.items():
+        sources.append(name)
+        result["risk_score"] = max(result.get("risk_score") or 0, fields["risk_score"])
+        for key in ("isp", "geolocation"):
+            if key in placeholder or result.get(key) in (None, "Unknown"):
+                placeholder.discard(key)
+                result[key] = fields[key]
+        result["attack_history"] += [h for h in fields["attack_history"] if h not in result["attack_history"]]
+    if answers:
+        risk = result["risk_score"]
+        result["status"] = "Malicious" if risk >= 70 else "Suspicious" if risk >= 30 else "Benign"
+    result["source"] = ", ".join(sources) or None
+    return result
+
+
+class ProviderClient:
+    """
+    Fans one IP lookup out to every provider in parallel over a shared
+    httpx.AsyncClient (keep-alive pool) running on a background event loop.
+    Each provider has its own token bucket, concurrency limit and circuit
+    breaker; a provider that is rate limited for longer than `max_wait`,
+    has an open breaker or fails is skipped and reported under "providers".
+    If no provider answered the result is marked "degraded".
+
+    `lookup` is synchronous and thread-safe, for crew tools and worker
+    threads; async callers on another loop can await `alookup`. `transport`
+    (an httpx transport, e.g. httpx.MockTransport) replaces the network.
+    """
+
+    def __init__(self, providers, max_connections=32, max_wait=1.0, transport=None):
+        self.providers = list(providers)
+        self.max_connections = max_connections
+        self.max_wait = max_wait
+        self.transport = transport
+        self._client = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="soc-ti", daemon=True)
+        self._thread.start()
+        self._deadline = max_wait + max((p.timeout for p in self.providers), default=0) + 1.0
+
+    @classmethod
+    def from_env(cls):
+        names = [n.strip().lower() for n in os.getenv("SOC_TI_PROVIDERS", "").split(",") if n.strip()]
+        unknown = set(names) - set(PROVIDERS)
+        if unknown:
+            raise ValueError(f"Unknown SOC_TI_PROVIDERS {sorted(unknown)}; choose from {sorted(PROVIDERS)}")
+        return cls(
+            [PROVIDERS[name].from_env() for name in names],
+            max_connections=int(os.getenv("SOC_TI_MAX_CONNECTIONS", "32")),
+            max_wait=float(os.getenv("SOC_TI_MAX_WAIT", "1.0")),
+        )
+
+    def _ensure_client(self):
+        # httpx is imported with the first client so that processes with no
+        # providers configured (the default) never load it.
+        if self._client is None:
+            import httpx
+
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections, keepalive_expiry=60)
+            self._client = httpx.AsyncClient(limits=limits, transport=self.transport)
+            for provider in self.providers:
+                provider.semaphore = asyncio.Semaphore(provider.concurrency)
+        return self._client
+
+    async def _query(self, provider, ip):
+        """
+        Returns (status, fields or None) for one provider.
+        """
+        if provider.breaker.is_open():
+            provider.counts["circuit_open"] += 1
+            return "circuit_open", None
+        if provider.bucket and not await provider.bucket.acquire(self.max_wait):
+            provider.counts["rate_limited"] += 1
+            return "rate_limited", None
+        if not provider.breaker.allow():  # another half-open probe is in flight
+            provider.counts["circuit_open"] += 1
+            return "circuit_open", None
+
+        import httpx
+
+        path, params, headers = provider.request(ip)
+        async with provider.semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self._client.get(provider.base_url + path, params=params,
+                                                  headers=headers, timeout=provider.timeout)
+                if response.status_code == 404:
+                    fields = None
+                else:
+                    response.raise_for_status()
+                    fields = provider.parse(response.json())
+            except (httpx.HTTPError, ValueError, KeyError, TypeError):
+                provider.breaker.failure()
+                provider.counts["error"] += 1
+                return "error", None
+            provider.latencies.append(time.perf_counter() - start)
+        provider.breaker.success()
+        provider.counts["ok" if fields else "not_found"] += 1
+        return ("ok" if fields else "not_found"), fields
+
+    async def _lookup(self, ip):
+        self._ensure_client()
+        local = threat_intel.lookup_ip_reputation(ip)
+        ip = local["ip"]
+        outcomes = await asyncio.gather(*(self._query(p, ip) for p in self.providers))
+        answers = {p.name: fields for p, (_, fields) in zip(self.providers, outcomes) if fields}
+        result = merge_verdicts(local, answers)
+        result["providers"] = {p.name: status for p, (status, _) in zip(self.providers, outcomes)}
+        if self.providers and not any(status in ("ok", "not_found") for status, _ in outcomes):
+            result["degraded"] = True
+        return result
+
+    async def alookup(self, ip_address):
+        future = asyncio.run_coroutine_threadsafe(self._lookup(ip_address), self._loop)
+        return await asyncio.wait_for(asyncio.wrap_future(future), self._deadline)
+
+    def lookup(self, ip_address):
+        future = asyncio.run_coroutine_threadsafe(self._lookup(ip_address), self._loop)
+        return future.result(timeout=self._deadline)
+
+    def stats(self):
+        # Read the counters on the loop that updates them.
+        async def collect():
+            return {p.name: p.stats() for p in self.providers}
+        return asyncio.run_coroutine_threadsafe(collect(), self._loop).result(timeout=5)
+
+    def close(self):
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def provider_client():
+    """
+    Process-wide ProviderClient, or None when SOC_TI_PROVIDERS is unset.
+    """
+    global _client
+    if not os.getenv("SOC_TI_PROVIDERS"):
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ProviderClient.from_env()
+    return _client
+
+
+def reputation_backend():
+    """
+    The uncached reputation lookup: local feeds plus remote providers when
+    configured, local feeds only otherwise.
+    """
+    client = provider_client()
+    return client.lookup if client else threat_intel.lookup_ip_reputation
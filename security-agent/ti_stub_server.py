@@ -0,0 +1,135 @@
+import json
+import random
+import socket
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# -------------------------------
+# Local stand-in for AbuseIPDB / VirusTotal
+# -------------------------------
+# Usage: python ti_stub_server.py [port] [latency_ms] [error_rate]
+# Serves /api/v2/check (AbuseIPDB) and /api/v3/ip_addresses/<ip>
+# (VirusTotal) with deterministic verdicts derived from the IP, plus
+# GET /stats with request and connection counts. Point ti_providers at it:
+#   SOC_TI_PROVIDERS=abuseipdb,virustotal
+#   SOC_TI_ABUSEIPDB_URL=http://127.0.0.1:8765 SOC_TI_VIRUSTOTAL_URL=http://127.0.0.1:8765
+
+COUNTRIES = ("RU", "CN", "US", "NL", "BR", "IN", "DE", "VN")
+
+
+def verdict_for(ip):
+    """
+    Stable pseudo-verdict: about a third of addresses look malicious.
+    """
+    h = zlib.crc32(ip.encode())
+    score = h % 101 if h % 3 == 0 else h % 20
+    return {
+        "score": score,
+        "reports": score * 3,
+        "country": COUNTRIES[h % len(COUNTRIES)],
+        "isp": f"Stub Hosting AS{64512 + h % 1000}",
+    }
+
+
+def abuseipdb_body(ip):
+    v = verdict_for(ip)
+    return {"data": {
+        "ipAddress": ip,
+        "abuseConfidenceScore": v["score"],
+        "countryCode": v["country"],
+        "isp": v["isp"],
+        "totalReports": v["reports"],
+    }}
+
+
+def virustotal_body(ip):
+    v = verdict_for(ip)
+    malicious = v["score"] // 10
+    return {"data": {"id": ip, "type": "ip_address", "attributes": {
+        "country": v["country"],
+        "as_owner": v["isp"],
+        "last_analysis_stats": {"malicious": malicious, "suspicious": malicious // 2,
+                                "harmless": 60 - malicious, "undetected": 20},
+        "tags": ["scanner"] if malicious > 5 else [],
+    }}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client pooling is visible in /stats
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; without this, Nagle plus
+        # delayed ACKs adds ~40 ms to every keep-alive response.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.stats_lock:
+            self.server.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            with self.server.stats_lock:
+                return self._send(200, dict(self.server.stats))
+
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            with self.server.stats_lock:
+                self.server.stats["errors"] += 1
+            return self._send(503, {"errors": [{"detail": "stub failure"}]})
+
+        if url.path == "/api/v2/check":
+            ip = parse_qs(url.query).get("ipAddress", [""])[0]
+            return self._send(200, abuseipdb_body(ip))
+        if url.path.startswith("/api/v3/ip_addresses/"):
+            return self._send(200, virustotal_body(url.path.rsplit("/", 1)[-1]))
+        self._send(404, {"error": {"code": "NotFoundError"}})
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops SYNs under load
+
+
+def serve(host="127.0.0.1", port=8765, latency=0.0, error_rate=0.0):
+    """
+    Starts the stub on a daemon thread and returns the server; port 0
+    picks a free port (see server.server_address).
+    """
+    server = StubServer((host, port), StubHandler)
+    server.latency = latency
+    server.error_rate = error_rate
+    server.stats = {"requests": 0, "connections": 0, "errors": 0}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name="ti-stub", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    error_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    server = serve(port=port, latency=latency_ms / 1000, error_rate=error_rate)
+    print(f"Threat intel stub on http://127.0.0.1:{server.server_address[1]} "
+          f"(latency {latency_ms:.0f} ms, error rate {error_rate:.0%})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,18 +1,21 @@
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-import graphviz
-from gtts import gTTS
 import time
+import traceback
+from log_watcher import LogWatcher
+
+# reportlab, graphviz and gTTS are imported by the function that needs them:
+# the dashboard and CLI import this module for tail_log_file alone.
 
 def generate_pdf_report(report_text, filename="soc_report.pdf"):
     """
     Generates a PDF report from the given text.
     """
     try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
         doc = SimpleDocTemplate(filename, pagesize=letter)
         styles = getSampleStyleSheet()
         story = []
@@ -42,6 +45,8 @@ def create_threat_graph(source_ip, target, attack_type):
     Returns the graph object.
     """
     try:
+        import graphviz
+
         dot = graphviz.Digraph(comment='Threat Graph')
         dot.attr(rankdir='LR', bgcolor='#0E1117') # Dark background
         
@@ -67,6 +72,8 @@ def generate_audio_summary(text, filename="summary.mp3"):
     Generates an audio file from text using gTTS.
     """
     try:
+        from gtts import gTTS
+
         tts = gTTS(text=text, lang='en')
         tts.save(filename)
         return filename
@@ -74,18 +81,22 @@ def generate_audio_summary(text, filename="summary.mp3"):
         print(f"Error generating audio: {e}")
         return None
 
-def tail_log_file(filepath):
+def tail_log_file(filepath, state_path=None):
     """
     Generator that yields new lines from a log file.
+    Backed by LogWatcher: inotify-driven, rotation/truncation aware, and
+    resumes from `state_path` when given.
     """
     try:
-        with open(filepath, "r") as f:
-            f.seek(0, os.SEEK_END)
-            while True:
-                line = f.readline()
-                if not line:
-                    time.sleep(0.1)
-                    continue
-                yield line
+        yield from LogWatcher(filepath, state_path=state_path).iter_lines()
     except Exception as e:
         print(f"Error reading log file: {e}")
+
+def log_error(exc, path="error.log"):
+    """
+    Appends a timestamped entry with the traceback of `exc` to `path`.
+    Earlier entries are kept, so one failed run doesn't erase another's.
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Error: {exc}\n")
+        traceback.print_exception(exc, file=f)
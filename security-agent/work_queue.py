@@ -0,0 +1,373 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError
+
+# -------------------------------
+# Durable local work queue
+# -------------------------------
+# Alerts are written to SQLite (WAL) before analysis starts and deleted
+# only once it finished, so an alert whose process dies mid-kickoff is
+# analyzed again rather than lost (at-least-once; the result cache absorbs
+# most repeats). A claimed item is invisible to other workers for
+# `visibility_timeout` seconds; if it isn't acked by then it is handed out
+# again. Failures are retried with exponential backoff and, after
+# `max_attempts`, moved to the dead_letters table.
+#
+# One file can hold several named queues ("api", "autopilot", "ingest"), so
+# the API, the dashboard and the CLI can share SOC_QUEUE_PATH without
+# draining each other's work.
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS queue ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, queue TEXT NOT NULL, payload TEXT NOT NULL,"
+    " attempts INTEGER NOT NULL DEFAULT 0, available_at REAL NOT NULL, lease TEXT,"
+    " enqueued_at REAL NOT NULL, last_error TEXT)",
+    "CREATE INDEX IF NOT EXISTS queue_ready ON queue(queue, available_at)",
+    "CREATE TABLE IF NOT EXISTS dead_letters ("
+    " id INTEGER PRIMARY KEY, queue TEXT NOT NULL, payload TEXT NOT NULL, attempts INTEGER NOT NULL,"
+    " error TEXT, enqueued_at REAL NOT NULL, failed_at REAL NOT NULL)",
+)
+
+
+class QueueBusy(Exception):
+    """
+    Raised by a QueueWorkers handler that can't take an item right now
+    (e.g. the worker pool is full): the item goes back without counting an
+    attempt.
+    """
+
+
+class QueueItem:
+    """
+    A claimed item. `lease` identifies this claim: ack/fail/release from a
+    worker whose visibility timeout ran out (and whose item was handed to
+    someone else) are ignored.
+    """
+
+    __slots__ = ("id", "payload", "attempts", "lease")
+
+    def __init__(self, id, payload, attempts, lease):
+        self.id = id
+        self.payload = payload
+        self.attempts = attempts
+        self.lease = lease
+
+
+class WorkQueue:
+    """
+    Named queue in a SQLite file. Thread-safe; several processes may share
+    the file (claims run in an IMMEDIATE transaction).
+    """
+
+    def __init__(self, path, name="alerts", visibility_timeout=300.0, max_attempts=5, backoff=5.0,
+                 max_backoff=600.0):
+        self.path = path
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._counts = {"enqueued": 0, "acked": 0, "retried": 0, "dead": 0, "expired": 0}
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+
+    @classmethod
+    def from_env(cls, path, name="alerts"):
+        return cls(
+            path,
+            name=name,
+            visibility_timeout=float(os.getenv("SOC_QUEUE_VISIBILITY", "300")),
+            max_attempts=int(os.getenv("SOC_QUEUE_MAX_ATTEMPTS", "5")),
+            backoff=float(os.getenv("SOC_QUEUE_BACKOFF", "5")),
+        )
+
+    def enqueue(self, payload, claim=False):
+        """
+        Stores `payload` (JSON-serializable) and returns its id, or with
+        claim=True a QueueItem already claimed by the caller, for callers
+        that run the work themselves and only need it recovered if they die.
+        """
+        now = time.time()
+        lease = uuid.uuid4().hex if claim else None
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO queue (queue, payload, attempts, available_at, lease, enqueued_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self.name, json.dumps(payload), 1 if claim else 0,
+                 now + self.visibility_timeout if claim else now, lease, now),
+            )
+            self._counts["enqueued"] += 1
+            if not claim:
+                self._ready.notify()
+        if claim:
+            return QueueItem(cursor.lastrowid, payload, 1, lease)
+        return cursor.lastrowid
+
+    def enqueue_many(self, payloads):
+        """
+        Stores every payload in one transaction; returns how many.
+        """
+        now = time.time()
+        rows = [(self.name, json.dumps(p), now, now) for p in payloads]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT INTO queue (queue, payload, available_at, enqueued_at) VALUES (?, ?, ?, ?)", rows)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._counts["enqueued"] += len(rows)
+            self._ready.notify(len(rows))
+        return len(rows)
+
+    def claim(self, wait=0.0):
+        """
+        Claims the oldest available item, waiting up to `wait` seconds for
+        one; returns a QueueItem or None.
+        """
+        deadline = time.monotonic() + wait
+        with self._lock:
+            while True:
+                item = self._claim_locked()
+                remaining = deadline - time.monotonic()
+                if item is not None or remaining <= 0:
+                    return item
+                # Woken by enqueues in this process; items from other
+                # processes and retries coming due are found by polling.
+                self._ready.wait(min(remaining, 0.5))
+
+    def _claim_locked(self):
+        now = time.time()
+        lease = uuid.uuid4().hex
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT id, payload, attempts, lease FROM queue WHERE queue = ? AND available_at <= ?"
+                " ORDER BY available_at, id LIMIT 1",
+                (self.name, now),
+            ).fetchone()
+            if row is not None:
+                self._db.execute(
+                    "UPDATE queue SET attempts = attempts + 1, available_at = ?, lease = ? WHERE id = ?",
+                    (now + self.visibility_timeout, lease, row[0]),
+                )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        if row[3] is not None:
+            self._counts["expired"] += 1  # previous claim timed out
+        return QueueItem(row[0], json.loads(row[1]), row[2] + 1, lease)
+
+    def ack(self, item):
+        """
+        Removes a finished item. Returns False if the claim had expired and
+        the item was handed to another worker.
+        """
+        with self._lock:
+            done = self._db.execute("DELETE FROM queue WHERE id = ? AND lease = ?",
+                                    (item.id, item.lease)).rowcount == 1
+            if done:
+                self._counts["acked"] += 1
+            return done
+
+    def fail(self, item, error):
+        """
+        Schedules a retry after backoff * 2^(attempts - 1) seconds (capped
+        at max_backoff), or moves the item to dead_letters once it has been
+        tried max_attempts times.
+        """
+        now = time.time()
+        with self._lock:
+            if self.last_attempt(item):
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    moved = self._db.execute(
+                        "INSERT INTO dead_letters (id, queue, payload, attempts, error, enqueued_at, failed_at)"
+                        " SELECT id, queue, payload, attempts, ?, enqueued_at, ? FROM queue"
+                        " WHERE id = ? AND lease = ?",
+                        (str(error), now, item.id, item.lease),
+                    ).rowcount
+                    self._db.execute("DELETE FROM queue WHERE id = ? AND lease = ?", (item.id, item.lease))
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+                self._counts["dead"] += moved
+                return
+            delay = min(self.backoff * 2 ** (item.attempts - 1), self.max_backoff)
+            retried = self._db.execute(
+                "UPDATE queue SET available_at = ?, lease = NULL, last_error = ? WHERE id = ? AND lease = ?",
+                (now + delay, str(error), item.id, item.lease),
+            ).rowcount
+            self._counts["retried"] += retried
+
+    def last_attempt(self, item):
+        return item.attempts >= self.max_attempts
+
+    def release(self, item):
+        """
+        Gives a claimed item back without counting an attempt, e.g. when the
+        caller could not start the work.
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE queue SET available_at = ?, lease = NULL, attempts = attempts - 1"
+                " WHERE id = ? AND lease = ?",
+                (time.time(), item.id, item.lease),
+            )
+            self._ready.notify()
+
+    def pending(self):
+        """
+        Items not yet acked or dead-lettered: ready, claimed or waiting to
+        be retried.
+        """
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM queue WHERE queue = ?", (self.name,)).fetchone()[0]
+
+    def dead_letters(self, limit=100):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, payload, attempts, error, failed_at FROM dead_letters WHERE queue = ?"
+                " ORDER BY failed_at DESC LIMIT ?",
+                (self.name, limit),
+            ).fetchall()
+        return [{"id": r[0], "payload": json.loads(r[1]), "attempts": r[2], "error": r[3], "failed_at": r[4]}
+                for r in rows]
+
+    def requeue_dead(self):
+        """
+        Moves this queue's dead letters back for another max_attempts tries;
+        returns how many.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                moved = self._db.execute(
+                    "INSERT INTO queue (queue, payload, attempts, available_at, enqueued_at)"
+                    " SELECT queue, payload, 0, ?, enqueued_at FROM dead_letters WHERE queue = ?",
+                    (now, self.name),
+                ).rowcount
+                self._db.execute("DELETE FROM dead_letters WHERE queue = ?", (self.name,))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._ready.notify(moved)
+        return moved
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            ready, claimed, delayed = self._db.execute(
+                "SELECT COALESCE(SUM(available_at <= ?), 0),"
+                " COALESCE(SUM(available_at > ? AND lease IS NOT NULL), 0),"
+                " COALESCE(SUM(available_at > ? AND lease IS NULL), 0)"
+                " FROM queue WHERE queue = ?",
+                (now, now, now, self.name),
+            ).fetchone()
+            dead = self._db.execute("SELECT COUNT(*) FROM dead_letters WHERE queue = ?",
+                                    (self.name,)).fetchone()[0]
+            return {
+                "queue": self.name,
+                "ready": ready,
+                "in_flight": claimed,
+                "retry_wait": delayed,
+                "dead_letters": dead,
+                **self._counts,
+            }
+
+
+class QueueWorkers:
+    """
+    `workers` threads that claim items from `queue` and call handler(item).
+    An item is acked when the handler returns and failed (retried or
+    dead-lettered) when it raises; `queue.last_attempt(item)` tells the
+    handler which of the two a failure will be. On QueueBusy the item is
+    released and the thread waits `busy_wait` seconds before claiming again.
+    If the handler's work is cancelled (its executor shut down), the item
+    is released, not failed, and the thread exits.
+    """
+
+    def __init__(self, queue, handler, workers=2, name="soc-queue", busy_wait=1.0):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.name = name
+        self.busy_wait = busy_wait
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        # Each start gets its own stop event: threads from a previous
+        # stop(wait=False) finish their current item and exit instead of
+        # being revived alongside the new ones.
+        if not self._threads:
+            self._stop = threading.Event()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, args=(self._stop,), name=f"{self.name}-{i}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, wait=True):
+        self._stop.set()
+        threads, self._threads = self._threads, []
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _run(self, stop):
+        while not stop.is_set():
+            item = self.queue.claim(wait=0.5)
+            if item is None:
+                continue
+            try:
+                self.handler(item)
+            except QueueBusy:
+                self.queue.release(item)
+                stop.wait(self.busy_wait)
+            except (CancelledError, asyncio.CancelledError):
+                self.queue.release(item)
+                return
+            except Exception as e:
+                self.queue.fail(item, e)
+            else:
+                self.queue.ack(item)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def work_queue(name="alerts"):
+    """
+    Process-wide WorkQueue `name` in SOC_QUEUE_PATH, or None when
+    SOC_QUEUE_PATH is unset (alerts then go straight to analysis, as before).
+    SOC_QUEUE_VISIBILITY / _MAX_ATTEMPTS / _BACKOFF tune it.
+    """
+    path = os.getenv("SOC_QUEUE_PATH")
+    if not path:
+        return None
+    with _queues_lock:
+        if name not in _queues:
+            _queues[name] = WorkQueue.from_env(path, name)
+        return _queues[name]
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class CrewWorkerPool:
+    """
+    Runs blocking crew executions on a thread or process pool so the
+    FastAPI event loop stays free to serve other requests.
+
+    At most `max_workers` jobs run at once and at most `max_queue` more may
+    wait for a worker. Anything beyond that is rejected with PoolSaturated
+    so callers can answer 429 instead of piling up unbounded work.
+
+    Jobs that must stay in this process (callbacks into the event loop
+    can't be pickled) go through submit_local(), which shares the same
+    bound and, for kind="process", runs them on a thread pool.
+    """
+
+    def __init__(self, max_workers=4, max_queue=16, timeout=120.0, kind="thread"):
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="soc-crew")
+        self._local_executor = self._executor if kind != "process" else None
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_workers=int(os.getenv("SOC_WORKERS", "4")),
+            max_queue=int(os.getenv("SOC_MAX_QUEUE", "16")),
+            timeout=float(os.getenv("SOC_CREW_TIMEOUT", "120")),
+            kind=os.getenv("SOC_POOL_KIND", "thread"),
+        )
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedules fn on the pool and returns a concurrent.futures.Future.
+        Raises PoolSaturated if the in-flight limit would be exceeded.
+        """
+        return self._submit(self._executor, fn, *args, **kwargs)
+
+    def submit_local(self, fn, *args, **kwargs):
+        """
+        submit() for fn and arguments that can't leave this process.
+        """
+        with self._lock:
+            if self._local_executor is None:
+                self._local_executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                          thread_name_prefix="soc-crew")
+        return self._submit(self._local_executor, fn, *args, **kwargs)
+
+    def _submit(self, executor, fn, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PoolSaturated(
+                    f"{self._pending} alerts in flight (limit {self.max_workers + self.max_queue})"
+                )
+            self._pending += 1
+
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """
+        Awaitable wrapper around submit() with a per-call timeout.
+        A timed-out job keeps its slot until the worker actually finishes,
+        so the in-flight bound stays honest.
+        """
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise
+
+    def _on_done(self, future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        if self._local_executor is not None and self._local_executor is not self._executor:
+            self._local_executor.shutdown(wait=wait, cancel_futures=True)